@@ -0,0 +1,91 @@
+"""
+Benchmark of the parallel archive compressors across thread counts.
+
+Usage:
+    python benchmarks/bench_compression.py [--size-mb 64] [--level 6]
+"""
+
+import argparse
+import io
+import os
+import random
+import time
+from typing import Callable, Dict, List
+
+from projectpruner.core.compression import (
+    ParallelGzipWriter,
+    ParallelXZWriter,
+    default_threads,
+)
+
+WRITERS: Dict[str, Callable[..., object]] = {
+    "gz": ParallelGzipWriter,
+    "xz": ParallelXZWriter,
+}
+
+
+def make_payload(size: int, seed: int = 0) -> bytes:
+    """Build a deterministic, moderately compressible payload."""
+    rng = random.Random(seed)
+    words = [
+        "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10))
+        )
+        for _ in range(2000)
+    ]
+    chunks: List[bytes] = []
+    total = 0
+    while total < size:
+        line = (" ".join(rng.choices(words, k=12)) + "\n").encode()
+        chunks.append(line)
+        total += len(line)
+        if rng.random() < 0.01:
+            noise = os.urandom(256)
+            chunks.append(noise)
+            total += len(noise)
+    return b"".join(chunks)[:size]
+
+
+def thread_counts(limit: int) -> List[int]:
+    """Powers of two up to LIMIT, always including LIMIT itself."""
+    counts = []
+    count = 1
+    while count < limit:
+        counts.append(count)
+        count *= 2
+    counts.append(limit)
+    return counts
+
+
+def run(codec: str, payload: bytes, level: int, threads: int) -> float:
+    """Compress PAYLOAD once and return the throughput in MB/s."""
+    sink = io.BytesIO()
+    start = time.perf_counter()
+    with WRITERS[codec](sink, level, threads=threads) as writer:  # type: ignore
+        for offset in range(0, len(payload), 1 << 20):
+            writer.write(payload[offset : offset + (1 << 20)])
+    elapsed = time.perf_counter() - start
+    return len(payload) / elapsed / 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print MB/s per codec and thread count."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--level", type=int, default=6)
+    parser.add_argument("--max-threads", type=int, default=default_threads())
+    parser.add_argument("--codec", choices=sorted(WRITERS), action="append")
+    args = parser.parse_args()
+
+    payload = make_payload(args.size_mb * 1024 * 1024)
+    print(f"{'codec':<6}{'threads':>8}{'MB/s':>10}{'speedup':>9}")
+    for codec in args.codec or sorted(WRITERS):
+        baseline = None
+        for threads in thread_counts(args.max_threads):
+            rate = run(codec, payload, args.level, threads)
+            baseline = baseline or rate
+            print(f"{codec:<6}{threads:>8}{rate:>10.1f}{rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Startup-time benchmark for the command-line interface.
+
+Each scenario starts a fresh interpreter the way the console script does
+and times it until exit; the best of ``--repeat`` runs is reported next to
+the cost of starting a bare interpreter. A scenario slower than
+``--target-ms`` fails the run.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 10] [--target-ms 100]
+    python benchmarks/bench_startup.py --imports   # slowest imports of --help
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ENTRY_POINT = "from projectpruner.cli import cli; cli()"
+
+SCENARIOS: Dict[str, List[str]] = {
+    "--help": ["--help"],
+    "archive --help": ["archive", "--help"],
+    "init-config --help": ["init-config", "--help"],
+}
+
+
+def time_command(command: List[str], repeat: int) -> float:
+    """Best wall time of COMMAND over REPEAT runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def slowest_imports(args: List[str], count: int) -> List[Tuple[int, str]]:
+    """The COUNT imports with the highest cumulative time, in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", ENTRY_POINT, *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        imports.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main() -> None:
+    """Time every scenario and fail if one misses the target."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--imports", action="store_true", help="List the slowest imports of --help"
+    )
+    args = parser.parse_args()
+
+    if args.imports:
+        for cumulative, name in slowest_imports(["--help"], 25):
+            print(f"{cumulative / 1000:>8.1f} ms  {name}")
+        return
+
+    interpreter = time_command([sys.executable, "-c", "pass"], args.repeat)
+    print(f"{'scenario':<22}{'ms':>8}{'over python':>14}")
+    print(f"{'(bare interpreter)':<22}{interpreter * 1000:>8.1f}")
+    missed = []
+    for name, cli_args in SCENARIOS.items():
+        seconds = time_command(
+            [sys.executable, "-c", ENTRY_POINT, *cli_args], args.repeat
+        )
+        flag = "  SLOW" if seconds * 1000 > args.target_ms else ""
+        print(
+            f"{name:<22}{seconds * 1000:>8.1f}"
+            f"{(seconds - interpreter) * 1000:>+13.1f}{flag}"
+        )
+        if flag:
+            missed.append(name)
+
+    if missed:
+        print(f"\n{len(missed)} scenarios missed the {args.target_ms:.0f} ms target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Benchmark suite for scanning, planning, cleaning, archiving and restoring.
+
+Every scenario runs against the same synthetic tree (see treegen.py) and
+reports throughput in files/s and MB/s. Results can be saved as a baseline
+and later runs compared against it; a scenario that got slower than the
+threshold allows counts as a regression and fails the run.
+
+Usage:
+    python benchmarks/bench_suite.py [--scale small] [--save baseline.json]
+    python benchmarks/bench_suite.py --compare baseline.json [--threshold 0.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from treegen import SCALES, TreeStats, generate_tree
+
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.cleaner import Cleaner
+from projectpruner.models.config import ArchiveConfig, Config
+from projectpruner.models.project import Project
+
+# Prepares a scenario and returns the timed step plus the files and bytes it handles
+Setup = Callable[[], Tuple[Callable[[], object], int, int]]
+
+
+@dataclass
+class BenchResult:
+    """Best timing of one scenario."""
+
+    name: str
+    seconds: float
+    files: int
+    bytes: int
+
+    @property
+    def files_per_second(self) -> float:
+        """Files handled per second."""
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """Megabytes handled per second."""
+        return self.bytes / self.seconds / 1e6 if self.seconds else 0.0
+
+
+class Suite:
+    """Builds the scenarios for one generated tree."""
+
+    def __init__(self, workdir: Path, tree: Path, stats: TreeStats):
+        """Initialize the suite over TREE, using WORKDIR for scratch copies."""
+        self.workdir = workdir
+        self.tree = tree
+        self.stats = stats
+        self.config = Config()
+        self._copies = 0
+
+    def scenarios(self, codecs: List[str], levels: List[int]) -> Dict[str, Setup]:
+        """All scenarios by name, in the order they run."""
+        kept = self.stats.files - self.stats.artifact_files
+        kept_bytes = self.stats.bytes - self.stats.artifact_bytes
+        scenarios: Dict[str, Setup] = {
+            "scan": lambda: (
+                lambda: Project.from_path(self.tree),
+                self.stats.files,
+                self.stats.bytes,
+            ),
+            "plan": lambda: (
+                lambda: Cleaner(self.config).plan(self.tree),
+                self.stats.files,
+                self.stats.bytes,
+            ),
+            "clean": lambda: (
+                self._clean_step(self._copy()),
+                self.stats.artifact_files,
+                self.stats.artifact_bytes,
+            ),
+        }
+        for codec in codecs:
+            for level in levels:
+                scenarios[f"archive-{codec}-{level}"] = self._archive_setup(
+                    codec, level, kept, kept_bytes
+                )
+            scenarios[f"restore-{codec}"] = self._restore_setup(codec, kept, kept_bytes)
+        return scenarios
+
+    def _copy(self) -> Path:
+        """Fresh copy of the tree for a scenario that modifies it."""
+        self._copies += 1
+        copy = self.workdir / f"copy{self._copies}" / self.tree.name
+        shutil.copytree(self.tree, copy, symlinks=True)
+        return copy
+
+    def _clean_step(self, project: Path) -> Callable[[], object]:
+        """Timed step deleting a copy's artifacts."""
+        return lambda: Cleaner(self.config).clean(project)
+
+    def _archiver(self, level: int) -> Archiver:
+        """Archiver writing into a scratch directory of its own."""
+        self._copies += 1
+        archive_dir = self.workdir / f"archives{self._copies}"
+        return Archiver(
+            Config(
+                archive=ArchiveConfig(archive_dir=archive_dir, compression_level=level)
+            )
+        )
+
+    def _archive_setup(self, codec: str, level: int, files: int, size: int) -> Setup:
+        """Scenario archiving a cleaned copy with CODEC at LEVEL."""
+
+        def setup() -> Tuple[Callable[[], object], int, int]:
+            project = self._cleaned_copy()
+            archiver = self._archiver(level)
+
+            def step() -> Path:
+                return archiver.archive(project, compress=codec)  # type: ignore
+
+            return step, files, size
+
+        return setup
+
+    def _restore_setup(self, codec: str, files: int, size: int) -> Setup:
+        """Scenario restoring an archive written with CODEC."""
+
+        def setup() -> Tuple[Callable[[], object], int, int]:
+            archiver = self._archiver(1)
+            project = self._cleaned_copy()
+            archive_path = archiver.archive(project, compress=codec)  # type: ignore
+            destination = archiver.archive_dir / "restored"
+            return lambda: archiver.restore(archive_path, destination), files, size
+
+        return setup
+
+    def _cleaned_copy(self) -> Path:
+        """Copy of the tree with its artifacts already removed."""
+        project = self._copy()
+        Cleaner(self.config).clean(project)
+        return project
+
+
+def run(name: str, setup: Setup, repeat: int) -> BenchResult:
+    """Time a scenario REPEAT times, each with a fresh setup, and keep the best."""
+    best: Optional[BenchResult] = None
+    for _ in range(repeat):
+        step, files, size = setup()
+        start = time.perf_counter()
+        step()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best.seconds:
+            best = BenchResult(name, elapsed, files, size)
+    assert best is not None
+    return best
+
+
+def compare(
+    results: List[BenchResult], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """Names of the scenarios slower than their baseline by more than THRESHOLD."""
+    regressions = []
+    print(f"\n{'scenario':<18}{'baseline s':>12}{'now s':>10}{'change':>9}")
+    for result in results:
+        saved = baseline.get(result.name)
+        if saved is None:
+            continue
+        change = result.seconds / saved["seconds"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(
+            f"{result.name:<18}{saved['seconds']:>12.3f}{result.seconds:>10.3f}"
+            f"{change:>+8.0%}{flag}"
+        )
+        if change > threshold:
+            regressions.append(result.name)
+    return regressions
+
+
+def main() -> None:
+    """Run the suite, print a table and optionally save or compare a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--codec", choices=["xz", "gz"], action="append")
+    parser.add_argument("--level", type=int, action="append")
+    parser.add_argument(
+        "--only", action="append", help="Run scenarios with this prefix"
+    )
+    parser.add_argument("--workdir", type=Path, help="Scratch directory")
+    parser.add_argument("--save", type=Path, help="Write the results as a baseline")
+    parser.add_argument("--compare", type=Path, help="Baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="pruner-bench-", dir=args.workdir))
+    try:
+        tree = workdir / "project"
+        stats = generate_tree(tree, SCALES[args.scale], args.seed)
+        print(
+            f"{args.scale} tree: {stats.files} files, {stats.bytes / 1e6:.1f} MB "
+            f"({stats.artifact_files} artifact files)\n"
+        )
+        suite = Suite(workdir, tree, stats)
+        scenarios = suite.scenarios(args.codec or ["xz", "gz"], args.level or [1, 6])
+
+        results = []
+        print(f"{'scenario':<18}{'seconds':>10}{'files/s':>12}{'MB/s':>10}")
+        for name, setup in scenarios.items():
+            if args.only and not any(name.startswith(p) for p in args.only):
+                continue
+            result = run(name, setup, args.repeat)
+            results.append(result)
+            print(
+                f"{name:<18}{result.seconds:>10.3f}"
+                f"{result.files_per_second:>12.0f}{result.mb_per_second:>10.1f}"
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        data = {
+            "meta": {
+                "scale": args.scale,
+                "seed": args.seed,
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "results": {result.name: asdict(result) for result in results},
+        }
+        args.save.write_text(json.dumps(data, indent=2) + "\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        if not args.compare.exists():
+            print(f"\nNo baseline at {args.compare}; save one with --save")
+            return
+        baseline = json.loads(args.compare.read_text())
+        if baseline["meta"].get("scale") != args.scale:
+            print(f"\nBaseline was taken at scale {baseline['meta'].get('scale')}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} scenarios regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
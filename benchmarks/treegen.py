@@ -0,0 +1,196 @@
+"""
+Deterministic generator of synthetic project trees for benchmarks.
+
+Trees mimic what the pruner meets in practice: a deep ``node_modules``,
+many tiny source files, a few huge binaries and Python caches. The same
+spec and seed always produce the same names, contents and mtimes.
+
+Usage:
+    python benchmarks/treegen.py DEST [--scale small] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+# Fixed timestamp so scans and archives see identical metadata on every run
+BASE_MTIME = 1_600_000_000
+WORDS = [
+    "const",
+    "return",
+    "import",
+    "function",
+    "value",
+    "export",
+    "default",
+    "module",
+    "require",
+    "self",
+    "data",
+    "index",
+]
+
+
+@dataclass
+class TreeSpec:
+    """Shape of a generated project."""
+
+    packages: int = 40  # Top-level node_modules packages
+    depth: int = 3  # How deep node_modules nest inside packages
+    fanout: int = 2  # Dependencies per package at each level
+    package_files: int = 6  # Source files per package
+    source_files: int = 500  # Tiny files in the project's own source tree
+    binaries: int = 2  # Huge binaries (models, media, database dumps)
+    binary_size: int = 4 << 20
+    pycache_modules: int = 100  # Python modules, each with a cached .pyc
+
+
+SCALES: Dict[str, TreeSpec] = {
+    "small": TreeSpec(),
+    "medium": TreeSpec(
+        packages=150, source_files=3000, binary_size=32 << 20, pycache_modules=600
+    ),
+    "large": TreeSpec(
+        packages=400,
+        depth=4,
+        source_files=20000,
+        binaries=4,
+        binary_size=128 << 20,
+        pycache_modules=3000,
+    ),
+}
+
+
+@dataclass
+class TreeStats:
+    """What a generated tree contains."""
+
+    files: int = 0
+    dirs: int = 0
+    bytes: int = 0
+    # Files and bytes matched by the default clean patterns
+    artifact_files: int = 0
+    artifact_bytes: int = 0
+
+
+class TreeGenerator:
+    """Writes one tree from a spec and a seed."""
+
+    def __init__(self, spec: TreeSpec, seed: int = 0):
+        """Initialize the generator."""
+        self.spec = spec
+        self.rng = random.Random(seed)
+        self.stats = TreeStats()
+
+    def generate(self, root: Path) -> TreeStats:
+        """Create the tree below ROOT, which must not exist yet."""
+        self._mkdir(root)
+        self._write(root / "package.json", self._text(200))
+        self._write(root / "README.md", self._text(2000))
+
+        # Source tree of many tiny files, nested a few levels deep
+        for index in range(self.spec.source_files):
+            directory = root / "src" / f"mod{index % 20}" / f"part{index % 7}"
+            self._write(directory / f"file{index}.js", self._text(400))
+
+        # Python package with its bytecode caches
+        for index in range(self.spec.pycache_modules):
+            package = root / "app" / f"pkg{index % 10}"
+            self._write(package / f"module{index}.py", self._text(1500))
+            self._write(
+                package / "__pycache__" / f"module{index}.cpython-311.pyc",
+                self._binary(800),
+                artifact=True,
+            )
+
+        for index in range(self.spec.packages):
+            self._package(root / "node_modules" / f"package-{index}", 0)
+
+        for index in range(self.spec.binaries):
+            self._write(
+                root / "assets" / f"blob{index}.bin",
+                self._binary(self.spec.binary_size),
+            )
+
+        self._write(root / "dist" / "bundle.js", self._text(200_000), artifact=True)
+        self._stamp(root)
+        return self.stats
+
+    def _package(self, path: Path, level: int) -> None:
+        """Write an npm package and, below the depth limit, its dependencies."""
+        self._write(path / "package.json", self._text(300), artifact=True)
+        for index in range(self.spec.package_files):
+            self._write(path / "lib" / f"f{index}.js", self._text(1200), artifact=True)
+        if level + 1 < self.spec.depth:
+            for index in range(self.spec.fanout):
+                self._package(path / "node_modules" / f"dep-{level}-{index}", level + 1)
+
+    def _mkdir(self, path: Path) -> None:
+        """Create a directory and any missing parents, counting each."""
+        if not path.exists():
+            self._mkdir(path.parent)
+            path.mkdir()
+            self.stats.dirs += 1
+
+    def _write(self, path: Path, data: bytes, artifact: bool = False) -> None:
+        """Write a file and count it."""
+        self._mkdir(path.parent)
+        path.write_bytes(data)
+        self.stats.files += 1
+        self.stats.bytes += len(data)
+        if artifact:
+            self.stats.artifact_files += 1
+            self.stats.artifact_bytes += len(data)
+
+    def _text(self, mean_size: int) -> bytes:
+        """Compressible text of roughly MEAN_SIZE bytes."""
+        size = self.rng.randint(mean_size // 2, mean_size * 3 // 2)
+        words: List[str] = []
+        length = 0
+        while length < size:
+            word = self.rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words).encode()[:size]
+
+    def _binary(self, size: int) -> bytes:
+        """Incompressible bytes."""
+        return self.rng.getrandbits(size * 8).to_bytes(size, "little") if size else b""
+
+    def _stamp(self, root: Path) -> None:
+        """Give every path an mtime derived from its name, children first."""
+        for directory, dirnames, filenames in os.walk(root, topdown=False):
+            for name in filenames + dirnames:
+                path = os.path.join(directory, name)
+                age = zlib.crc32(os.path.relpath(path, root).encode()) % (365 * 86400)
+                os.utime(path, (BASE_MTIME - age, BASE_MTIME - age))
+        os.utime(root, (BASE_MTIME, BASE_MTIME))
+
+
+def generate_tree(root: Path, spec: TreeSpec, seed: int = 0) -> TreeStats:
+    """Create a synthetic project tree below ROOT."""
+    return TreeGenerator(spec, seed).generate(root)
+
+
+def main() -> None:
+    """Generate one tree and print what it contains."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("dest", type=Path)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stats = generate_tree(args.dest, SCALES[args.scale], args.seed)
+    print(
+        f"{stats.files} files, {stats.dirs} directories, "
+        f"{stats.bytes / 1e6:.1f} MB "
+        f"({stats.artifact_files} artifact files, {stats.artifact_bytes / 1e6:.1f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
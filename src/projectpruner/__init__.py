@@ -2,15 +2,29 @@
 Project Pruner - A tool for cleaning, archiving, and managing old software development projects.
 """
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
 __version__ = "0.1.0"
 
-# Import key modules for easier access
-from projectpruner.core.archiver import Archiver
-from projectpruner.core.cleaner import Cleaner
-from projectpruner.core.finder import ProjectFinder
-from projectpruner.models.project import Project
-from projectpruner.utils.config import ConfigManager
-from projectpruner.utils.logger import setup_logger
+# Key classes for easier access, imported on first use so that importing
+# the package (and the CLI inside it) stays fast
+_EXPORTS = {
+    "Archiver": "projectpruner.core.archiver",
+    "Cleaner": "projectpruner.core.cleaner",
+    "ProjectFinder": "projectpruner.core.finder",
+    "Project": "projectpruner.models.project",
+    "ConfigManager": "projectpruner.utils.config",
+    "setup_logger": "projectpruner.utils.logger",
+}
+
+if TYPE_CHECKING:
+    from projectpruner.core.archiver import Archiver
+    from projectpruner.core.cleaner import Cleaner
+    from projectpruner.core.finder import ProjectFinder
+    from projectpruner.models.project import Project
+    from projectpruner.utils.config import ConfigManager
+    from projectpruner.utils.logger import setup_logger
 
 __all__ = [
     "Archiver",
@@ -20,3 +34,18 @@ __all__ = [
     "ConfigManager",
     "setup_logger",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import an exported name the first time it is looked up."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the exported names along with the module's own."""
+    return sorted(set(globals()) | set(__all__))
@@ -2,31 +2,76 @@
 Command-line interface for Project Pruner.
 """
 
+import logging
 import os
-import shutil
+import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Literal, Optional
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
 
 import click
-from rich.console import Console
-from rich.traceback import install
-
-from projectpruner.core.archiver import Archiver
-from projectpruner.core.cleaner import Cleaner
-from projectpruner.core.finder import ProjectFinder
-from projectpruner.models.project import Project
-from projectpruner.utils.config import ConfigManager
+
 from projectpruner.utils.logger import setup_logger
-from projectpruner.utils.progress import create_progress, format_path
+
+# Everything else is imported by the commands that use it, so that --help
+# and small commands start without loading rich, yaml or the archive codecs
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from projectpruner.core.archiver import Archiver
+    from projectpruner.core.index import ScanIndex
+    from projectpruner.core.pipeline import PipelineResult
+    from projectpruner.core.remover import RemovalResult
+    from projectpruner.models.config import Config
+    from projectpruner.models.plan import SourceListing
+    from projectpruner.utils.metrics import RunMetrics
+    from projectpruner.utils.profiler import Profiler
+
+
+def _excepthook(
+    exc_type: Type[BaseException],
+    exc: BaseException,
+    tb: Optional[TracebackType],
+) -> None:
+    """Install the rich traceback handler on the first uncaught exception."""
+    from rich.traceback import install
+
+    install(show_locals=True)
+    sys.excepthook(exc_type, exc, tb)
+
+
+class _LazyConsole:
+    """Stands in for the rich console, which is created on first use."""
+
+    _console: Optional["Console"] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._console is None:
+            from rich.console import Console
+
+            _LazyConsole._console = Console()
+        return getattr(self._console, name)
+
 
 # Install rich traceback handler
-install(show_locals=True)
+sys.excepthook = _excepthook
 
 # Initialize console
-console = Console()
+console = cast("Console", _LazyConsole())
 
-# Initialize logger
-logger = setup_logger()
+# Initialize logger; its handlers are set up once a command runs
+logger = logging.getLogger("projectpruner")
 
 CONFIG_TEMPLATE = os.path.join(
     os.path.dirname(__file__), "config", "templates", "default_config.yaml"
@@ -34,6 +79,366 @@ CONFIG_TEMPLATE = os.path.join(
 USER_CONFIG_DIR = os.path.expanduser("~/.projectpruner")
 USER_CONFIG_PATH = os.path.join(USER_CONFIG_DIR, "config.yaml")
 
+# A project on its way through the archive pipeline: its path, and once
+# archived, the archive and the paths the archiving walk saw
+_ArchiveJob = Tuple[Path, Optional[Path], Optional["SourceListing"]]
+
+
+def _open_index(no_cache: bool, rebuild_index: bool) -> Optional["ScanIndex"]:
+    """Open the persistent scan index unless caching is disabled."""
+    from projectpruner.core.index import ScanIndex
+
+    if no_cache:
+        return None
+    try:
+        index = ScanIndex()
+        if rebuild_index:
+            index.clear()
+        return index
+    except Exception as e:
+        logger.warning(f"Scan index unavailable, scanning without it: {str(e)}")
+        return None
+
+
+def _select_projects(
+    config: "Config",
+    parent: Path,
+    until: str,
+    larger_than: Optional[str],
+    jobs: Optional[int],
+    no_cache: bool = False,
+    rebuild_index: bool = False,
+) -> List[Path]:
+    """Scan the projects under PARENT concurrently and apply the CLI filters."""
+    from projectpruner.core.finder import ProjectFinder
+
+    index = _open_index(no_cache, rebuild_index)
+    finder = ProjectFinder(config, index=index)
+    try:
+        projects = finder.scan_projects(
+            finder.list_candidates(parent),
+            jobs=jobs,
+            older_than=until,
+            larger_than=larger_than,
+        )
+    finally:
+        if index is not None:
+            index.close()
+
+    return [project.path for project in projects]
+
+
+def _report_removal(path: Path, result: "RemovalResult") -> None:
+    """Report the removal of an archived project directory and any leftovers."""
+    if result.ok:
+        console.print(f"[red]Removed original: {path}[/red]")
+        return
+    console.print(
+        f"[yellow]Partially removed original: {path} "
+        f"({len(result.errors)} errors)[/yellow]"
+    )
+
+
+def _archive_projects(
+    config: "Config",
+    parent: Path,
+    until: str,
+    larger_than: Optional[str],
+    jobs: Optional[int],
+    no_cache: bool = False,
+    rebuild_index: bool = False,
+    resume: bool = False,
+    verify: bool = False,
+    **options: Any,
+) -> List["PipelineResult"]:
+    """Scan, archive and remove the projects under PARENT as a staged pipeline.
+
+    Each project is scanned, archived without its artifacts, and removed by
+    its own stage, so one project can be compressed while the next is
+    scanned and the previous one removed. With JOBS, up to that many
+    projects are archived at once in worker processes, and the CPU budget
+    is split between them and their compression threads. ``options`` are
+    passed on to ``Archiver.archive``.
+
+    Every step is recorded in a journal under the archive directory. With
+    ``resume``, projects pick up from the last state the journal recorded
+    for them instead of starting over. With ``verify``, each archive is
+    checked against the checksum recorded while writing it before its
+    project is removed.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from projectpruner.core.archiver import Archiver, archive_project
+    from projectpruner.core.compression import split_cpu_budget
+    from projectpruner.core.finder import ProjectFinder
+    from projectpruner.core.journal import (
+        ARCHIVED,
+        ARCHIVING,
+        REMOVED,
+        SCANNED,
+        SKIPPED,
+        VERIFIED,
+        Journal,
+        journal_path,
+    )
+    from projectpruner.core.pipeline import Pipeline, PipelineResult, Stage
+    from projectpruner.core.remover import RemovalResult, Remover
+    from projectpruner.utils.profiler import phase
+    from projectpruner.utils.progress import create_progress, format_path
+
+    index = _open_index(no_cache, rebuild_index)
+    finder = ProjectFinder(config, index=index)
+    cutoff = finder._cutoff(until)
+    size_limit = finder._size_limit(larger_than) if larger_than else None
+    archiver = Archiver(config)
+    verify = verify or config.archive.verify
+    journal = Journal(journal_path(archiver.archive_dir, parent))
+    recorded = journal.entries()
+    # Unfinished projects are archived again, under today's date on a new day
+    for entry in recorded.values():
+        if not entry.done:
+            archiver.discard_unfinished(Path(entry.project))
+    previous = recorded if resume else {}
+    if not resume:
+        if any(not entry.done for entry in recorded.values()):
+            logger.warning(
+                f"Discarding the journal of an interrupted run over {parent}; "
+                "use --resume to continue it instead"
+            )
+        journal.reset()
+
+    def scan(path: Path) -> Optional[_ArchiveJob]:
+        entry = previous.get(os.path.abspath(path))
+        if entry is not None and entry.done:
+            return None
+        if entry is not None and entry.archive is not None:
+            return path, Path(entry.archive), None
+        if entry is not None and entry.state == ARCHIVING:
+            # The archive may have been finished before the journal said so
+            finished = archiver.find_archive(path, since=entry.time)
+            if finished is not None:
+                journal.record(path, ARCHIVED, finished)
+                return path, finished, None
+        if entry is None:
+            if finder._load_matching(path, cutoff, size_limit) is None:
+                journal.record(path, SKIPPED)
+                return None
+            journal.record(path, SCANNED)
+        return path, None, None
+
+    def archive(job: _ArchiveJob) -> _ArchiveJob:
+        path, archive_path, listing = job
+        if archive_path is None:
+            journal.record(path, ARCHIVING)
+            if pool is None:
+                archive_path, listing = archiver.archive_listed(path, **options)
+            else:
+                # Only wall time is seen here; the CPU is spent in the worker
+                with phase("archive", path) as record:
+                    archive_path, listing = pool.submit(
+                        archive_project, config, path, options
+                    ).result()
+                    record.files = len(listing.files)
+                    record.bytes = listing.bytes
+            journal.record(path, ARCHIVED, archive_path)
+        if not archiver.is_intact(archive_path):
+            raise RuntimeError(f"Archive is incomplete: {archive_path}")
+        if verify:
+            checked = archiver.verify_archive(archive_path)
+            if not checked.ok:
+                raise RuntimeError(
+                    f"Archive failed verification: {'; '.join(checked.errors)}"
+                )
+        journal.record(path, VERIFIED, archive_path)
+        return path, archive_path, listing
+
+    def remove(job: _ArchiveJob) -> Tuple[Optional[Path], RemovalResult]:
+        path, archive_path, listing = job
+        if listing is not None:
+            result = archiver.remove_listed(listing)
+        else:
+            # Resumed after archiving: the walk's listing was not kept
+            with phase("remove", path) as record, Remover() as remover:
+                result = remover.remove(path)
+                record.files = result.files_removed
+        if result.ok:
+            journal.record(path, REMOVED, archive_path)
+        return archive_path, result
+
+    archive_workers, options["threads"] = split_cpu_budget(
+        jobs or config.archive.archive_workers,
+        options.get("threads") or config.archive.threads,
+        config.archive.cpu_budget,
+    )
+    if (options.get("backend") or config.archive.backend) == "store":
+        # The chunk store index takes one writer at a time
+        archive_workers = 1
+
+    pool: Optional[ProcessPoolExecutor] = None
+    if jobs is not None and archive_workers > 1:
+        # Spawned workers: forking while pipeline threads run is unsafe
+        pool = ProcessPoolExecutor(
+            max_workers=archive_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    pipeline = Pipeline(
+        [
+            Stage("scan", scan, workers=config.archive.scan_workers),
+            Stage("archive", archive, workers=archive_workers),
+            Stage("remove", remove, workers=config.archive.remove_workers),
+        ],
+        queue_size=config.archive.queue_size,
+    )
+
+    try:
+        candidates = finder.list_candidates(parent)
+        with create_progress("Archiving projects") as progress:
+            task = progress.add_task("Archiving...", total=len(candidates))
+
+            def report(result: PipelineResult) -> None:
+                if result.ok:
+                    archive_path, removal = result.value
+                    console.print(f"[green]Archived to: {archive_path}[/green]")
+                    _report_removal(result.item, removal)
+                elif result.error is not None:
+                    console.print(
+                        f"[red]Error archiving {format_path(result.item)} "
+                        f"({result.stage}): {result.error}[/red]"
+                    )
+                progress.update(
+                    task, advance=1, description=f"Done {format_path(result.item)}"
+                )
+
+            results = pipeline.run(candidates, on_result=report)
+    finally:
+        journal.close()
+        if pool is not None:
+            pool.shutdown()
+        if index is not None:
+            index.close()
+
+    if all(entry.done for entry in journal.entries().values()):
+        journal.reset()
+    else:
+        console.print(
+            "[yellow]Some projects were not finished; "
+            "rerun with --resume to continue[/yellow]"
+        )
+    return results
+
+
+@contextmanager
+def _run_metrics(
+    config: "Config", command: str, dry_run: bool = False
+) -> Iterator["RunMetrics"]:
+    """Collect a run's metrics and write them to ``metrics_file`` when it ends.
+
+    Phase timings come from the active profiler; unless ``--profile`` set
+    one up, a quiet one is used for the run.
+    """
+    from projectpruner.utils.metrics import RunMetrics, write_textfile
+    from projectpruner.utils.profiler import Profiler, get_profiler, set_profiler
+
+    metrics = RunMetrics(command)
+    if config.metrics_file is None or dry_run:
+        yield metrics
+        return
+
+    profiler = get_profiler()
+    quiet = not profiler.enabled
+    if quiet:
+        profiler = set_profiler(Profiler(enabled=True))
+    try:
+        yield metrics
+    except BaseException:
+        metrics.failed = True
+        raise
+    finally:
+        if quiet:
+            set_profiler(None)
+        try:
+            write_textfile(Path(config.metrics_file), metrics, profiler)
+        except OSError as e:
+            logger.error(f"Error writing metrics: {str(e)}")
+
+
+def _record_archive_results(
+    archiver: "Archiver", results: List["PipelineResult"], metrics: "RunMetrics"
+) -> None:
+    """Count the outcome, freed space and compression of each archived project."""
+    for result in results:
+        if result.skipped:
+            metrics.project("skipped")
+            continue
+        if not result.ok:
+            metrics.project("failed")
+            continue
+        metrics.project("archived")
+        archive_path, removal = result.value
+        try:
+            info = archiver.get_archive_info(archive_path)
+        except (ValueError, RuntimeError):
+            metrics.removed(0, removal.files_removed)
+            continue
+        metrics.removed(info["total_size"], removal.files_removed)
+        metrics.archived(info["stored_size"], info["size"])
+
+
+def _start_background_reclaim(
+    jobs: Optional[int], config_path: Optional[Path] = None
+) -> None:
+    """Spawn a detached 'reclaim' process that deletes the trash."""
+    import subprocess
+
+    command = [sys.executable, "-m", "projectpruner.cli"]
+    if config_path is not None:
+        command += ["--config", os.path.abspath(config_path)]
+    command.append("reclaim")
+    if jobs is not None:
+        command += ["--jobs", str(jobs)]
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    console.print("[dim]Reclaiming trash in the background[/dim]")
+
+
+def _report_profile(
+    profiler: "Profiler", output: Path, stats_path: Optional[Path]
+) -> None:
+    """Print and save the profile of a finished command."""
+    from projectpruner.utils.profiler import set_profiler
+
+    set_profiler(None)
+    profiler.print_table(console)
+    try:
+        profiler.write_json(output)
+        console.print(f"[dim]Profile written to {output}[/dim]")
+        if stats_path is not None and profiler.dump_stats(stats_path):
+            console.print(f"[dim]cProfile stats written to {stats_path}[/dim]")
+    except OSError as e:
+        logger.error(f"Error writing profile: {str(e)}")
+
+
+def _config(ctx: click.Context) -> "Config":
+    """The configuration, loaded when a command first needs it."""
+    if "config" not in ctx.obj:
+        from projectpruner.utils.config import ConfigManager
+
+        config_path = ctx.obj.get("config_path")
+        ctx.obj["config"] = (
+            ConfigManager.load_config(config_path)
+            if config_path
+            else ConfigManager.load_config()
+        )
+    config: "Config" = ctx.obj["config"]
+    return config
+
 
 @click.group()
 @click.version_option()
@@ -47,10 +452,49 @@ USER_CONFIG_PATH = os.path.join(USER_CONFIG_DIR, "config.yaml")
     type=click.Path(exists=True, dir_okay=False),
     help="Path to config file",
 )
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report wall time, CPU time, bytes and files for every phase and project",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    default="projectpruner-profile.json",
+    show_default=True,
+    help="Where --profile writes its JSON report",
+)
+@click.option(
+    "--profile-stats",
+    type=click.Path(dir_okay=False),
+    help="With --profile, also run the hot phases under cProfile and dump pstats here",
+)
 @click.pass_context
-def main(ctx: click.Context, dry_run: bool, config: Optional[str] = None) -> None:
+def main(
+    ctx: click.Context,
+    dry_run: bool,
+    config: Optional[str] = None,
+    profile: bool = False,
+    profile_output: str = "projectpruner-profile.json",
+    profile_stats: Optional[str] = None,
+) -> None:
     """Project Pruner - Clean and archive old development projects."""
     ctx.ensure_object(dict)
+    if not logger.handlers:
+        setup_logger()
+    if profile:
+        from projectpruner.utils.profiler import Profiler, set_profiler
+
+        profiler = set_profiler(
+            Profiler(enabled=True, collect_stats=profile_stats is not None)
+        )
+        ctx.call_on_close(
+            lambda: _report_profile(
+                profiler,
+                Path(profile_output),
+                Path(profile_stats) if profile_stats else None,
+            )
+        )
     # Config resolution order: --config, ./config.yaml, ~/.projectpruner/config.yaml, or environment variables
     config_path = None
     if config:
@@ -59,11 +503,7 @@ def main(ctx: click.Context, dry_run: bool, config: Optional[str] = None) -> Non
         config_path = Path(os.path.abspath("config.yaml"))
     elif os.path.exists(os.path.expanduser("~/.projectpruner/config.yaml")):
         config_path = Path(os.path.expanduser("~/.projectpruner/config.yaml"))
-    ctx.obj["config"] = (
-        ConfigManager.load_config(config_path)
-        if config_path
-        else ConfigManager.load_config()
-    )
+    ctx.obj["config_path"] = config_path
     ctx.obj["dry_run"] = dry_run
 
 
@@ -80,6 +520,32 @@ def main(ctx: click.Context, dry_run: bool, config: Optional[str] = None) -> Non
     type=str,
     help="Only clean projects larger than specified size (e.g., 50MB, 1GB)",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of parallel workers for scanning and deleting (default: based on CPU count and disk type)",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Scan every project from scratch without using the scan index",
+)
+@click.option(
+    "--rebuild-index",
+    is_flag=True,
+    help="Discard the scan index and rebuild it from a full rescan",
+)
+@click.option(
+    "--trash",
+    is_flag=True,
+    help="Move artifacts to the trash and reclaim the space in the background",
+)
+@click.option(
+    "--keep-trash",
+    is_flag=True,
+    help="With --trash, skip the background reclaim (run 'reclaim' later)",
+)
 @click.option(
     "--dry-run",
     is_flag=True,
@@ -91,40 +557,58 @@ def clean(
     parent_dir: str,
     until: str,
     larger_than: str,
+    jobs: Optional[int],
+    no_cache: bool,
+    rebuild_index: bool,
+    trash: bool,
+    keep_trash: bool,
     dry_run: bool,
 ) -> None:
     """Clean up build artifacts in all project folders under PARENT_DIR older than UNTIL and optionally larger than LARGER_THAN."""
-    cleaner = Cleaner(ctx.obj["config"])
+    from projectpruner.core.cleaner import Cleaner
+    from projectpruner.core.trash import Trash
+    from projectpruner.utils.progress import create_progress, format_path
+
+    config = _config(ctx)
+    use_trash = (trash or config.clean.trash) and not dry_run
+    cleaner = Cleaner(config, jobs=jobs, trash=Trash() if use_trash else None)
     parent = Path(parent_dir).expanduser()
-    finder = ProjectFinder(ctx.obj["config"])
-    projects = []
-    for subdir in parent.iterdir():
-        if not subdir.is_dir():
-            continue
-        try:
-            project = Project.from_path(subdir)
-        except Exception:
-            continue
-        if not finder._is_older_than(project, until):
-            continue
-        if larger_than and not finder._is_larger_than(project, larger_than):
-            continue
-        projects.append(subdir)
-    if len(projects) > 1:
-        with create_progress("Cleaning projects") as progress:
-            task = progress.add_task("Cleaning...", total=len(projects))
-            for subdir in projects:
-                progress.update(task, description=f"Cleaning {format_path(subdir)}")
-                cleaner.clean(subdir, dry_run=dry_run)
-                if not dry_run:
-                    console.print(f"[green]Cleaned: {subdir}[/green]")
-                progress.advance(task)
-    else:
-        for subdir in projects:
-            console.print(f"[bold]Cleaning {subdir}...[/bold]")
-            cleaner.clean(subdir, dry_run=dry_run)
+    with _run_metrics(config, "clean", dry_run=dry_run) as metrics:
+        projects = _select_projects(
+            config,
+            parent,
+            until,
+            larger_than,
+            jobs,
+            no_cache=no_cache,
+            rebuild_index=rebuild_index,
+        )
+
+        def clean_project(subdir: Path) -> None:
+            plan = cleaner.clean(subdir, dry_run=dry_run)
             if not dry_run:
                 console.print(f"[green]Cleaned: {subdir}[/green]")
+                metrics.project("cleaned")
+                # Trashed entries are counted as freed by the reclaim that deletes them
+                metrics.trashed(plan.trashed_size)
+                metrics.removed(
+                    plan.total_size - plan.trashed_size,
+                    plan.file_count - plan.trashed_file_count,
+                )
+
+        if len(projects) > 1:
+            with create_progress("Cleaning projects") as progress:
+                task = progress.add_task("Cleaning...", total=len(projects))
+                for subdir in projects:
+                    progress.update(task, description=f"Cleaning {format_path(subdir)}")
+                    clean_project(subdir)
+                    progress.advance(task)
+        else:
+            for subdir in projects:
+                console.print(f"[bold]Cleaning {subdir}...[/bold]")
+                clean_project(subdir)
+    if use_trash and projects and not keep_trash:
+        _start_background_reclaim(jobs, ctx.obj.get("config_path"))
 
 
 @main.command()
@@ -146,6 +630,54 @@ def clean(
     default="xz",
     help="Compression algorithm to use (xz=best, gz=fastest)",
 )
+@click.option(
+    "--backend",
+    type=click.Choice(["tar", "store"]),
+    help="Archive format: one tarball per project, or the deduplicating chunk store (default: archive.backend)",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only store what changed since the project's previous archive",
+)
+@click.option(
+    "--hash",
+    "compare_hash",
+    is_flag=True,
+    help="With --incremental, also compare file hashes, not just size and mtime",
+)
+@click.option(
+    "--threads",
+    "-t",
+    type=click.IntRange(min=1),
+    help="Compression threads per archive, capped by its share of archive.cpu_budget (default: that share)",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of projects to archive at once in worker processes, sharing archive.cpu_budget with compression threads (default: archive.archive_workers, in-process)",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Scan every project from scratch without using the scan index",
+)
+@click.option(
+    "--rebuild-index",
+    is_flag=True,
+    help="Discard the scan index and rebuild it from a full rescan",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted run over PARENT_DIR where it stopped",
+)
+@click.option(
+    "--verify",
+    is_flag=True,
+    help="Verify each archive's checksum before removing its project (default: archive.verify)",
+)
 @click.option(
     "--dry-run",
     is_flag=True,
@@ -158,70 +690,58 @@ def archive(
     until: str,
     larger_than: str,
     compress: Literal["xz", "gz"],
+    backend: Optional[str],
+    incremental: bool,
+    compare_hash: bool,
+    threads: Optional[int],
+    jobs: Optional[int],
+    no_cache: bool,
+    rebuild_index: bool,
+    resume: bool,
+    verify: bool,
     dry_run: bool,
 ) -> None:
     """Clean, archive, and remove all project folders under PARENT_DIR older than UNTIL and optionally larger than LARGER_THAN."""
-    archiver = Archiver(ctx.obj["config"])
-    cleaner = Cleaner(ctx.obj["config"])
+    from projectpruner.core.archiver import Archiver
+    from projectpruner.core.cleaner import Cleaner
+
+    config = _config(ctx)
     parent = Path(parent_dir).expanduser()
-    finder = ProjectFinder(ctx.obj["config"])
-    projects = []
-    for subdir in parent.iterdir():
-        if not subdir.is_dir():
-            continue
-        try:
-            project = Project.from_path(subdir)
-        except Exception:
-            continue
-        if not finder._is_older_than(project, until):
-            continue
-        if larger_than and not finder._is_larger_than(project, larger_than):
-            continue
-        projects.append(subdir)
-    if len(projects) > 1:
-        with create_progress("Archiving projects") as progress:
-            task = progress.add_task("Archiving...", total=len(projects))
-            for subdir in projects:
-                progress.update(task, description=f"Archiving {format_path(subdir)}")
-                cleaner.clean(subdir, dry_run=dry_run)
-                if not dry_run:
-                    try:
-                        archive_path = archiver.archive(
-                            subdir,
-                            compress=compress,
-                            dry_run=dry_run,
-                        )
-                        console.print(f"[green]Archived to: {archive_path}[/green]")
-
-                        # Force remove the directory
-                        if subdir.exists():
-                            shutil.rmtree(subdir)
-                            console.print(f"[red]Removed original: {subdir}[/red]")
-                    except Exception as e:
-                        logger.error(f"Error during archive operation: {str(e)}")
-                        console.print(f"[red]Error: {str(e)}[/red]")
-                progress.advance(task)
-    else:
+    if dry_run:
+        cleaner = Cleaner(config, jobs=jobs)
+        projects = _select_projects(
+            config,
+            parent,
+            until,
+            larger_than,
+            jobs,
+            no_cache=no_cache,
+            rebuild_index=rebuild_index,
+        )
         for subdir in projects:
             console.print(f"[bold]Cleaning {subdir}...[/bold]")
-            cleaner.clean(subdir, dry_run=dry_run)
+            cleaner.clean(subdir, dry_run=True)
             console.print(f"[bold]Archiving {subdir}...[/bold]")
-            if not dry_run:
-                try:
-                    archive_path = archiver.archive(
-                        subdir,
-                        compress=compress,
-                        dry_run=dry_run,
-                    )
-                    console.print(f"[green]Archived to: {archive_path}[/green]")
+        return
 
-                    # Force remove the directory
-                    if subdir.exists():
-                        shutil.rmtree(subdir)
-                        console.print(f"[red]Removed original: {subdir}[/red]")
-                except Exception as e:
-                    logger.error(f"Error during archive operation: {str(e)}")
-                    console.print(f"[red]Error: {str(e)}[/red]")
+    with _run_metrics(config, "archive") as metrics:
+        results = _archive_projects(
+            config,
+            parent,
+            until,
+            larger_than,
+            jobs,
+            no_cache=no_cache,
+            rebuild_index=rebuild_index,
+            resume=resume,
+            verify=verify,
+            compress=compress,
+            threads=threads,
+            backend=backend,
+            incremental=incremental,
+            compare_hash=compare_hash,
+        )
+        _record_archive_results(Archiver(config), results, metrics)
 
 
 @main.command()
@@ -232,34 +752,187 @@ def archive(
     type=click.Path(),
     help="Destination path for restored project",
 )
+@click.option(
+    "--path",
+    "paths",
+    multiple=True,
+    help="Restore only members matching this glob (repeatable)",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of parallel file writers (default: based on the disk type)",
+)
 @click.pass_context
 def restore(
     ctx: click.Context,
     archive_path: str,
     destination: Optional[str],
+    paths: Tuple[str, ...],
+    jobs: Optional[int],
 ) -> None:
     """Restore an archived project."""
-    archiver = Archiver(ctx.obj["config"])
+    from projectpruner.core.archiver import Archiver
 
-    try:
-        restored_path = archiver.restore(
-            Path(archive_path),
-            destination=Path(destination) if destination else None,
-            dry_run=ctx.obj["dry_run"],
-        )
+    config = _config(ctx)
+    archiver = Archiver(config)
+
+    with _run_metrics(config, "restore", dry_run=ctx.obj["dry_run"]) as metrics:
+        try:
+            restored_path = archiver.restore(
+                Path(archive_path),
+                destination=Path(destination) if destination else None,
+                dry_run=ctx.obj["dry_run"],
+                paths=paths,
+                jobs=jobs,
+            )
+
+            if not ctx.obj["dry_run"]:
+                console.print(f"[green]Restored to: {restored_path}[/green]")
+                metrics.project("restored")
 
-        if not ctx.obj["dry_run"]:
-            console.print(f"[green]Restored to: {restored_path}[/green]")
+        except Exception as e:
+            logger.error(f"Error restoring {archive_path}: {str(e)}")
+            console.print(f"[red]Error: {str(e)}[/red]")
+            metrics.project("failed")
 
+
+@main.command()
+@click.pass_context
+def gc(ctx: click.Context) -> None:
+    """Delete chunk store data no longer referenced by any snapshot."""
+    from projectpruner.core.archiver import Archiver
+    from projectpruner.utils.filesystem import format_size
+
+    archiver = Archiver(_config(ctx))
+    try:
+        result = archiver.gc(dry_run=ctx.obj["dry_run"])
     except Exception as e:
-        logger.error(f"Error restoring {archive_path}: {str(e)}")
+        logger.error(f"Error collecting garbage: {str(e)}")
         console.print(f"[red]Error: {str(e)}[/red]")
+        ctx.exit(1)
+
+    verb = "Would reclaim" if ctx.obj["dry_run"] else "Reclaimed"
+    console.print(
+        f"[green]{verb} {format_size(result.bytes_reclaimed)} "
+        f"({result.chunks_removed} chunks, {result.packs_removed} packs removed, "
+        f"{result.packs_rewritten} packs compacted)[/green]"
+    )
+
+
+@main.command()
+@click.argument("archives", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Also decompress the archives and check every file's checksum",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of archives verified at once (default: based on the disk type)",
+)
+@click.pass_context
+def verify(
+    ctx: click.Context, archives: Tuple[str, ...], full: bool, jobs: Optional[int]
+) -> None:
+    """Verify ARCHIVES (default: every archive) against their recorded checksums."""
+    from projectpruner.core.archiver import Archiver
+    from projectpruner.utils.filesystem import format_size
+
+    archiver = Archiver(_config(ctx))
+    paths = [Path(archive) for archive in archives] or archiver.list_archives()
+    failed = 0
+    for result in archiver.verify(paths, full=full, jobs=jobs):
+        if result.ok:
+            console.print(
+                f"[green]OK {result.archive}[/green] "
+                f"[dim]{format_size(result.bytes)} in {result.seconds:.1f}s[/dim]"
+            )
+            continue
+        failed += 1
+        console.print(f"[red]FAILED {result.archive}[/red]")
+        for error in result.errors:
+            logger.error(f"{result.archive}: {error}")
+            console.print(f"  [red]{error}[/red]")
+    if failed:
+        console.print(f"[red]{failed} of {len(paths)} archives failed[/red]")
+        ctx.exit(1)
+
+
+@main.command()
+@click.option(
+    "--list",
+    "list_only",
+    is_flag=True,
+    help="List trashed items without deleting them",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of parallel deletion workers",
+)
+@click.pass_context
+def reclaim(ctx: click.Context, list_only: bool, jobs: Optional[int]) -> None:
+    """Permanently delete everything moved to the trash by 'clean --trash'."""
+    from projectpruner.core.remover import RemovalResult
+    from projectpruner.core.trash import Trash, TrashItem
+
+    trash = Trash()
+    items = trash.items()
+    if list_only:
+        for item in items:
+            state = " (reclaiming)" if item.reclaiming else ""
+            console.print(
+                f"{item.original} [dim]{item.file_count} files, "
+                f"{item.size} bytes{state}[/dim]"
+            )
+        return
+
+    with _run_metrics(_config(ctx), "reclaim") as metrics:
+
+        def on_reclaimed(item: TrashItem, result: RemovalResult) -> None:
+            # A partly deleted item is counted in full by the reclaim that ends it
+            metrics.removed(item.size if result.ok else 0, result.files_removed)
+
+        results = trash.reclaim(jobs=jobs, on_reclaimed=on_reclaimed)
+    files = sum(result.files_removed for result in results)
+    failed = [result for result in results if not result.ok]
+    console.print(f"[green]Reclaimed {len(results)} items ({files} files)[/green]")
+    if failed:
+        console.print(f"[red]{len(failed)} items could not be fully deleted[/red]")
+
+
+@main.command()
+@click.argument("paths", nargs=-1, type=click.Path())
+def untrash(paths: Tuple[str, ...]) -> None:
+    """Restore trashed items to their original locations (all if no PATHS)."""
+    from projectpruner.core.trash import Trash
+
+    trash = Trash()
+    wanted = [Path(os.path.abspath(p)) for p in paths]
+    for item in trash.items():
+        if wanted and not any(
+            item.original == path or path in item.original.parents for path in wanted
+        ):
+            continue
+        try:
+            trash.restore(item)
+            console.print(f"[green]Restored: {item.original}[/green]")
+        except Exception as e:
+            logger.error(f"Error restoring {item.original}: {str(e)}")
+            console.print(f"[red]Error: {str(e)}[/red]")
 
 
 @main.command("init-config")
 @click.argument("path", required=False, default="config.yaml")
 def init_config(path: str) -> None:
     """Create a starter configuration file (default: ./config.yaml)."""
+    import shutil
+
     dest = os.path.abspath(path)
     if os.path.exists(dest):
         console.print(f"[yellow]Config already exists at {dest}[/yellow]")
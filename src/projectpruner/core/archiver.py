@@ -2,17 +2,78 @@
 Project archiver module for compressing and managing project archives.
 """
 
+import dataclasses
+import hashlib
+import os
 import shutil
 import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Literal, Optional
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+)
 
+from projectpruner.core.compression import (
+    ParallelGzipWriter,
+    ParallelXZWriter,
+    XZBlockReader,
+    default_threads,
+)
+from projectpruner.core.extractor import Extractor, ExtractResult
+from projectpruner.core.manifest import (
+    MANIFEST_SUFFIX,
+    ManifestEntry,
+    ManifestSummary,
+    ManifestWriter,
+    iter_entries,
+    manifest_path,
+    read_summary,
+)
+from projectpruner.core.matcher import PatternMatcher
+from projectpruner.core.remover import RemovalResult, Remover
+from projectpruner.core.store import (
+    SNAPSHOT_SUFFIX,
+    STORE_CODEC,
+    ChunkStore,
+    GCResult,
+    read_snapshot,
+)
+from projectpruner.core.verifier import VerifyResult, verify_tar
 from projectpruner.models.config import Config
+from projectpruner.models.plan import SourceListing
+from projectpruner.utils import fsops
+from projectpruner.utils.filesystem import default_jobs, format_size, hash_file
 from projectpruner.utils.logger import get_logger
+from projectpruner.utils.profiler import phase
 
 logger = get_logger(__name__)
 
+# Larger reads keep per-chunk overhead low while members are hashed
+COPY_BUFSIZE = 1 << 20
+# Suffix of archives that are still being written
+PARTIAL_SUFFIX = ".part"
+# Files an interrupted run can leave behind: the partial archive and the
+# manifest (or snapshot) still being written
+UNFINISHED_SUFFIXES = (
+    PARTIAL_SUFFIX,
+    f"{MANIFEST_SUFFIX}.body.tmp",
+    f"{MANIFEST_SUFFIX}.tmp",
+    f"{SNAPSHOT_SUFFIX}.body.tmp",
+    f"{SNAPSHOT_SUFFIX}.tmp",
+)
+
 
 class Archiver:
     """Handles archiving operations for development projects."""
@@ -22,14 +83,46 @@ class Archiver:
         self.config = config
         self.archive_dir = Path(self.config.archive.archive_dir).expanduser()
         self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.store_dir = self.archive_dir / "store"
 
     def archive(
         self,
         project_path: Path,
         compress: Literal["xz", "gz"] = "xz",
         dry_run: bool = False,
+        threads: Optional[int] = None,
+        backend: Optional[str] = None,
+        incremental: bool = False,
+        compare_hash: bool = False,
+        exclude: Optional[PatternMatcher] = None,
+        listing: Optional[SourceListing] = None,
     ) -> Path:
-        """Archive a project directory."""
+        """Archive a project directory.
+
+        Both codecs compress on ``threads`` worker threads (default:
+        ``archive.threads`` from the config, or one per CPU): xz as
+        independent blocks, gz as pigz-style chunks joined into one member.
+        Both honor ``archive.compression_level``. A manifest sidecar listing
+        every member with its size, mode and SHA-256 is written alongside
+        the archive in the same pass.
+
+        With the ``store`` backend (default: ``archive.backend``), contents
+        go into the deduplicating chunk store instead and the returned path
+        is the project's ``.snapshot`` manifest; ``compress`` is ignored.
+
+        With ``incremental``, the project is compared against the manifest
+        of its most recent archive by type, mode, size and mtime (and
+        SHA-256 with ``compare_hash``). Only new and changed files plus all
+        directories are written; the manifest still describes the complete
+        tree, naming the earlier archive that holds each unchanged file, and
+        lists deleted paths. If nothing changed, no archive is written and
+        the previous archive is returned. Repeated runs on the same date get
+        numbered names (``name_date-2.tar.xz``).
+
+        Paths matching ``exclude`` are left out without being descended
+        into. When ``listing`` is given, it is filled with every path the
+        walk archived or excluded (see ``archive_and_remove``).
+        """
         if not project_path.exists():
             raise ValueError(f"Project path does not exist: {project_path}")
 
@@ -40,11 +133,33 @@ class Archiver:
         if compress not in ("xz", "gz"):
             raise ValueError(f"Unsupported compression: {compress}. Use 'xz' or 'gz'.")
 
+        level = self.config.archive.compression_level
+        if not 0 <= level <= 9:
+            raise ValueError(f"Invalid compression level: {level}. Use 0-9.")
+
+        backend = backend or self.config.archive.backend
+        if backend not in ("tar", "store"):
+            raise ValueError(f"Unsupported backend: {backend}. Use 'tar' or 'store'.")
+
+        if threads is None:
+            threads = self.config.archive.threads or default_threads()
+
         # Create archive path
         date_str = datetime.now().strftime(self.config.archive.date_format)
-        archive_name = f"{project_path.name}_{date_str}.tar.{compress}"
+        if backend == "store":
+            archive_name = f"{project_path.name}_{date_str}{SNAPSHOT_SUFFIX}"
+        else:
+            archive_name = f"{project_path.name}_{date_str}.tar.{compress}"
         archive_path = self.archive_dir / archive_name
 
+        # Incremental runs may repeat within a day; number the later ones
+        number = 1
+        while incremental and backend == "tar" and archive_path.exists():
+            number += 1
+            archive_path = self.archive_dir / archive_name.replace(
+                f"_{date_str}.", f"_{date_str}-{number}.", 1
+            )
+
         if archive_path.exists():
             raise ValueError(f"Archive already exists: {archive_path}")
 
@@ -54,27 +169,149 @@ class Archiver:
             logger.info("Dry run - no archive will be created")
             return archive_path
 
-        # Create archive
+        if backend == "store":
+            return self._archive_to_store(
+                project_path, archive_path, exclude=exclude, listing=listing
+            )
+
+        base_path = self._previous_archive(project_path) if incremental else None
+        base = _load_base(base_path) if base_path is not None else None
+        if incremental and base_path is None:
+            logger.info(f"No previous archive of {project_path}, archiving in full")
+        elif base_path is not None:
+            logger.info(f"Archiving changes since {base_path.name}")
+
+        # Create archive under a temporary name; it only gets its real name
+        # once complete, so an interrupted run never leaves a truncated
+        # archive that looks finished
+        partial = _partial_path(archive_path)
+        manifest = ManifestWriter(manifest_path(archive_path))
         try:
-            mode: Literal["w:gz", "w:xz"] = f"w:{compress}"  # type: ignore
-            with tarfile.open(str(archive_path), mode) as tar:
-                tar.add(project_path, arcname=project_path.name)
+            writer_class = ParallelXZWriter if compress == "xz" else ParallelGzipWriter
+            with open(partial, "wb") as raw:
+                hashing = _HashingWriter(raw)
+                with writer_class(
+                    hashing, level, threads=threads  # type: ignore[arg-type]
+                ) as compressed:
+                    with tarfile.open(  # type: ignore
+                        fileobj=compressed, mode="w|", copybufsize=COPY_BUFSIZE
+                    ) as tar:
+                        stored = _add_tree(
+                            tar,
+                            project_path,
+                            project_path.name,
+                            manifest,
+                            base=base,
+                            compare_hash=compare_hash,
+                            exclude=exclude,
+                            listing=listing,
+                        )
+                    uncompressed_size = compressed.tell()
+                raw.flush()
+                os.fsync(raw.fileno())
 
+            # Whatever is left of the base was not found in the project
+            deleted = sorted(base) if base is not None else []
+            if base_path is not None and not stored and not deleted:
+                manifest.abort()
+                partial.unlink()
+                logger.info(f"No changes since {base_path}, nothing archived")
+                return base_path
+
+            # The manifest goes first: an archive under its final name is
+            # always described, and a manifest alone is not an intact archive
+            manifest.commit(
+                archive_path,
+                project_path,
+                compress,
+                uncompressed_size,
+                compressed_size=partial.stat().st_size,
+                base=base_path.name if base_path is not None else None,
+                deleted=deleted,
+                sha256=hashing.hash.hexdigest(),
+            )
+            os.replace(partial, archive_path)
+            if base_path is not None:
+                logger.info(
+                    f"Stored {stored} new or changed files, "
+                    f"{len(deleted)} paths deleted"
+                )
             logger.info(f"Successfully created archive: {archive_path}")
             return archive_path
 
         except Exception as e:
-            if archive_path.exists():
-                archive_path.unlink()
+            manifest.abort()
+            for path in (partial, archive_path, manifest_path(archive_path)):
+                if path.exists():
+                    path.unlink()
             raise RuntimeError(f"Error creating archive: {str(e)}")
 
+    def archive_and_remove(
+        self,
+        project_path: Path,
+        jobs: Optional[int] = None,
+        **options: Any,
+    ) -> Tuple[Path, RemovalResult]:
+        """Clean, archive and remove a project with a single walk.
+
+        Paths matching the clean patterns are left out of the archive
+        instead of being deleted beforehand, and the project is then removed
+        from the list of paths the archiving walk produced: artifacts are
+        deleted once, and archived files are unlinked without another
+        traversal. ``options`` are passed on to ``archive``.
+        """
+        archive_path, listing = self.archive_listed(project_path, **options)
+        return archive_path, self.remove_listed(listing, jobs=jobs)
+
+    def archive_listed(
+        self, project_path: Path, **options: Any
+    ) -> Tuple[Path, SourceListing]:
+        """Archive a project without its artifacts and list what the walk saw."""
+        matcher = PatternMatcher(
+            self.config.clean.patterns, self.config.clean.exclude_patterns
+        )
+        listing = SourceListing(root=project_path)
+        with phase("archive", project_path) as record:
+            archive_path = self.archive(
+                project_path, exclude=matcher, listing=listing, **options
+            )
+            record.files = len(listing.files)
+            record.bytes = listing.bytes
+        return archive_path, listing
+
+    def remove_listed(
+        self, listing: SourceListing, jobs: Optional[int] = None
+    ) -> RemovalResult:
+        """Remove an archived project using the listing from ``archive_listed``."""
+        logger.info(
+            f"Removing {listing.root} ({len(listing.files)} files, "
+            f"{len(listing.artifacts)} artifacts)"
+        )
+        with phase("remove", listing.root) as record, Remover(jobs=jobs) as remover:
+            result = remover.remove_listed(listing)
+            record.files = result.files_removed
+            record.bytes = listing.bytes
+        for path, error in result.errors:
+            logger.error(f"Error removing {path}: {error}")
+        return result
+
     def restore(
         self,
         archive_path: Path,
         destination: Optional[Path] = None,
         dry_run: bool = False,
+        paths: Optional[Iterable[str]] = None,
+        jobs: Optional[int] = None,
     ) -> Path:
-        """Restore a project from an archive."""
+        """Restore a project from an archive.
+
+        A full restore decompresses the archive as a stream while ``jobs``
+        writer threads (default: automatic) create the files. With
+        ``paths``, only the members matching those glob patterns are
+        restored (see ``extract``) and the destination may already exist.
+        Incremental archives are restored by replaying their chain, taking
+        each file from the archive that holds its latest version.
+        """
         # Ensure archive_path is a Path object
         if isinstance(archive_path, str):
             archive_path = Path(archive_path)
@@ -92,7 +329,8 @@ class Archiver:
         else:
             destination = Path(destination)
 
-        if destination.exists():
+        patterns = list(paths or [])
+        if destination.exists() and not patterns:
             raise ValueError(f"Destination already exists: {destination}")
 
         logger.info(f"Restoring {archive_path} to {destination}")
@@ -101,11 +339,40 @@ class Archiver:
             logger.info("Dry run - no files will be extracted")
             return destination
 
+        if archive_path.suffix == SNAPSHOT_SUFFIX:
+            return self._restore_from_store(archive_path, destination, patterns)
+
+        if patterns:
+            self.extract(archive_path, patterns, destination)
+            logger.info(f"Successfully restored selected paths to: {destination}")
+            return destination
+
+        chain = _archive_chain(archive_path)
+
         # Extract archive
         try:
-            destination.mkdir(parents=True, exist_ok=True)
-            with tarfile.open(str(archive_path), "r:*") as tar:
-                tar.extractall(path=destination)
+            extractor = Extractor(jobs=jobs)
+            result = ExtractResult(destination=destination)
+            with phase("restore", archive_path) as record:
+                for part, names in chain:
+                    part_result = extractor.extract(
+                        part,
+                        destination,
+                        select=names.__contains__ if names is not None else None,
+                    )
+                    result.files += part_result.files
+                    result.dirs += part_result.dirs
+                    result.bytes += part_result.bytes
+                    result.seconds += part_result.seconds
+                record.files = result.files
+                record.bytes = result.bytes
+
+            logger.info(
+                f"Restored {result.files} files and {result.dirs} directories "
+                f"({format_size(result.bytes)}) in {result.seconds:.1f}s: "
+                f"{format_size(result.bytes_per_second)}/s, "
+                f"{result.files_per_second:.0f} files/s"
+            )
 
             logger.info(f"Successfully restored project to: {destination}")
             return destination
@@ -115,32 +382,686 @@ class Archiver:
                 shutil.rmtree(destination)
             raise RuntimeError(f"Error restoring archive: {str(e)}")
 
+    def extract(
+        self, archive_path: Path, patterns: Iterable[str], destination: Path
+    ) -> List[str]:
+        """Extract only the members matching glob PATTERNS into DESTINATION.
+
+        Patterns are matched against member paths both with and without the
+        leading project directory; a matching directory brings its whole
+        subtree. For ``.tar.xz`` archives with a manifest, only the xz
+        blocks holding the selected members are decompressed; other
+        archives are streamed once. Existing files are never overwritten.
+        Returns the names of the extracted members.
+        """
+        patterns = list(patterns)
+        matcher = PatternMatcher(patterns)
+
+        created = not destination.exists()
+        try:
+            chain = _archive_chain(archive_path)
+            destination.mkdir(parents=True, exist_ok=True)
+            names = []
+            for part, held in chain:
+
+                def select(name: str, held: Optional[Set[str]] = held) -> bool:
+                    return (held is None or name in held) and _is_selected(
+                        matcher, name
+                    )
+
+                names += _extract_selected(part, select, destination)
+            if not names:
+                raise ValueError(f"No archive members match: {', '.join(patterns)}")
+            return names
+
+        except Exception as e:
+            if created and destination.exists():
+                shutil.rmtree(destination)
+            if isinstance(e, ValueError):
+                raise
+            raise RuntimeError(f"Error extracting from archive: {str(e)}")
+
     def list_archives(self) -> List[Path]:
-        """List all available archives."""
-        return sorted(
-            path for path in self.archive_dir.glob("*.tar.*") if path.is_file()
+        """List all available archives, including chunk store snapshots."""
+        paths = [*self.archive_dir.glob("*.tar.*"), *self.snapshots()]
+        return sorted(path for path in paths if path.is_file())
+
+    def snapshots(self) -> List[Path]:
+        """List the snapshots of projects held in the chunk store."""
+        return sorted(self.archive_dir.glob(f"*{SNAPSHOT_SUFFIX}"))
+
+    def gc(self, dry_run: bool = False) -> GCResult:
+        """Drop chunk store data no longer referenced by any snapshot.
+
+        Delete a snapshot file to release its project; chunks shared with
+        other snapshots are kept.
+        """
+        with self._open_store() as store, store.locked(blocking=False):
+            # Snapshots are listed under the lock, so none is committed
+            # between reading their references and dropping chunks
+            referenced = set()
+            for snapshot in self.snapshots():
+                # An unreadable snapshot aborts the run rather than losing its data
+                for entry in iter_entries(snapshot):
+                    referenced.update(entry.chunks or [])
+            result = store.gc(referenced, dry_run=dry_run)
+        logger.info(
+            f"Garbage collection {'would reclaim' if dry_run else 'reclaimed'} "
+            f"{format_size(result.bytes_reclaimed)} "
+            f"({result.chunks_removed} chunks)"
         )
+        return result
+
+    def get_archive_info(self, archive_path: Path) -> Dict[str, Any]:
+        """Get information about an archive.
 
-    def get_archive_info(self, archive_path: Path) -> dict:
-        """Get information about an archive."""
+        The answer comes from the manifest sidecar when one matches the
+        archive; older archives without a manifest are streamed once
+        instead. ``compressed_size`` is kept for compatibility and holds the
+        total size of all members, like ``total_size``. ``stored_size`` is
+        the part of it whose data the archive holds itself: incremental
+        archives and snapshots leave unchanged data to earlier ones.
+        """
         if not archive_path.exists():
             raise ValueError(f"Archive does not exist: {archive_path}")
 
         if not archive_path.is_file():
             raise ValueError(f"Archive path is not a file: {archive_path}")
 
-        try:
-            with tarfile.open(str(archive_path), "r:*") as tar:
-                members = tar.getmembers()
-                total_size = sum(member.size for member in members)
-
-                return {
-                    "path": archive_path,
-                    "size": archive_path.stat().st_size,
-                    "compressed_size": total_size,
-                    "file_count": len(members),
-                    "created": datetime.fromtimestamp(archive_path.stat().st_mtime),
-                }
+        stat = archive_path.stat()
+        snapshot = read_snapshot(archive_path)
+        if snapshot is not None:
+            return {
+                "path": archive_path,
+                "size": snapshot.compressed_size,
+                "compressed_size": snapshot.total_size,
+                "total_size": snapshot.total_size,
+                "stored_size": _stored_size(archive_path, snapshot),
+                "uncompressed_size": snapshot.uncompressed_size,
+                "file_count": snapshot.member_count,
+                "codec": snapshot.codec,
+                "source": Path(snapshot.source),
+                "created": datetime.fromtimestamp(snapshot.created),
+            }
+
+        summary = read_summary(manifest_path(archive_path))
+        if summary is not None and summary.compressed_size == stat.st_size:
+            return {
+                "path": archive_path,
+                "size": stat.st_size,
+                "compressed_size": summary.total_size,
+                "total_size": summary.total_size,
+                "stored_size": _stored_size(manifest_path(archive_path), summary),
+                "uncompressed_size": summary.uncompressed_size,
+                "file_count": summary.member_count,
+                "codec": summary.codec,
+                "source": Path(summary.source),
+                "created": datetime.fromtimestamp(summary.created),
+            }
 
+        logger.debug(f"No manifest for {archive_path}, reading the archive")
+        try:
+            member_count, total_size, uncompressed_size = _scan_archive(archive_path)
         except Exception as e:
             raise RuntimeError(f"Error reading archive info: {str(e)}")
+
+        return {
+            "path": archive_path,
+            "size": stat.st_size,
+            "compressed_size": total_size,
+            "total_size": total_size,
+            "stored_size": total_size,
+            "uncompressed_size": uncompressed_size,
+            "file_count": member_count,
+            "codec": archive_path.suffix.lstrip("."),
+            "source": None,
+            "created": datetime.fromtimestamp(stat.st_mtime),
+        }
+
+    def verify_archive(self, archive_path: Path, full: bool = False) -> VerifyResult:
+        """Verify one archive against the checksums recorded when it was written.
+
+        Tar archives are checked by the SHA-256 of their compressed bytes,
+        snapshots by the presence of every chunk; ``full`` also checks the
+        contents of every file.
+        """
+        with phase("verify", archive_path) as record:
+            result = self._verify_archive(archive_path, full)
+            record.files = result.files
+            record.bytes = result.bytes
+        return result
+
+    def _verify_archive(self, archive_path: Path, full: bool) -> VerifyResult:
+        """Verify one tar archive or snapshot (see ``verify_archive``)."""
+        if not archive_path.name.endswith(SNAPSHOT_SUFFIX):
+            return verify_tar(archive_path, full=full)
+
+        result = VerifyResult(archive=archive_path)
+        started = time.monotonic()
+        summary = read_snapshot(archive_path)
+        if summary is None:
+            result.errors.append("Not a snapshot")
+            return result
+        with self._open_store() as store:
+            result.errors = store.verify(archive_path, full=full)
+        result.files = summary.file_count
+        result.bytes = summary.total_size if full else 0
+        result.seconds = time.monotonic() - started
+        return result
+
+    def verify(
+        self,
+        archive_paths: Iterable[Path],
+        full: bool = False,
+        jobs: Optional[int] = None,
+    ) -> List[VerifyResult]:
+        """Verify many archives concurrently, in the order given."""
+        archive_paths = list(archive_paths)
+        if not archive_paths:
+            return []
+        if jobs is None:
+            jobs = default_jobs(archive_paths[0])
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(jobs, len(archive_paths)))
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda path: self.verify_archive(path, full), archive_paths
+                )
+            )
+
+    def find_archive(
+        self,
+        project_path: Path,
+        since: float = 0.0,
+        codecs: Tuple[str, ...] = ("xz", "gz", STORE_CODEC),
+    ) -> Optional[Path]:
+        """Most recent intact archive of a project created at or after SINCE."""
+        source = os.path.abspath(project_path)
+        latest: Optional[Tuple[float, Path]] = None
+        candidates = list(self.archive_dir.glob(f"*{MANIFEST_SUFFIX}"))
+        candidates += self.archive_dir.glob(f"*{SNAPSHOT_SUFFIX}")
+        for path in candidates:
+            summary = read_summary(path)
+            if summary is None or summary.codec not in codecs:
+                continue
+            if summary.created < since:
+                continue
+            if os.path.abspath(summary.source) != source:
+                continue
+            archive = (
+                path
+                if summary.codec == STORE_CODEC
+                else (self.archive_dir / summary.archive)
+            )
+            if not self.is_intact(archive):
+                continue
+            if latest is None or summary.created > latest[0]:
+                latest = (summary.created, archive)
+        return latest[1] if latest is not None else None
+
+    def is_intact(self, archive_path: Path) -> bool:
+        """Check that an archive is complete and matches its manifest.
+
+        Tar archives must have the size their manifest recorded; snapshots
+        are only written once complete.
+        """
+        if archive_path.name.endswith(SNAPSHOT_SUFFIX):
+            return read_snapshot(archive_path) is not None
+        summary = read_summary(manifest_path(archive_path))
+        try:
+            size = archive_path.stat().st_size
+        except OSError:
+            return False
+        return summary is not None and size == summary.compressed_size
+
+    def discard_unfinished(self, project_path: Path) -> List[Path]:
+        """Delete the unfinished archive files of a project, from any day.
+
+        Only files named after the project and a date in ``date_format`` are
+        touched, so projects whose names share a prefix are left alone. No
+        run may be archiving the project meanwhile.
+        """
+        prefix = f"{Path(project_path).name}_"
+        removed: List[Path] = []
+        try:
+            paths = list(self.archive_dir.iterdir())
+        except OSError:
+            return removed
+        for path in paths:
+            name = path.name
+            suffix = next((s for s in UNFINISHED_SUFFIXES if name.endswith(s)), None)
+            if suffix is None or not name.startswith(prefix):
+                continue
+            stem = name[len(prefix) : -len(suffix)]
+            if suffix == PARTIAL_SUFFIX or suffix.startswith(MANIFEST_SUFFIX):
+                # name_date.xz.part: drop the codec
+                stem = stem.rpartition(".")[0]
+            if not _is_archive_date(stem, self.config.archive.date_format):
+                continue
+            try:
+                path.unlink()
+                removed.append(path)
+                logger.info(f"Removed unfinished archive file: {path}")
+            except OSError as e:
+                logger.error(f"Error removing {path}: {str(e)}")
+        return removed
+
+    def _previous_archive(self, project_path: Path) -> Optional[Path]:
+        """Most recent intact tar archive of the same project, if any."""
+        return self.find_archive(project_path, codecs=("xz", "gz"))
+
+    def _open_store(self) -> ChunkStore:
+        """Open the chunk store kept under the archive directory."""
+        return ChunkStore(self.store_dir, level=self.config.archive.compression_level)
+
+    def _archive_to_store(
+        self,
+        project_path: Path,
+        snapshot_path: Path,
+        exclude: Optional[PatternMatcher] = None,
+        listing: Optional[SourceListing] = None,
+    ) -> Path:
+        """Add a project to the chunk store and write its snapshot."""
+        try:
+            with self._open_store() as store:
+                result = store.add(
+                    project_path, snapshot_path, exclude=exclude, listing=listing
+                )
+        except Exception as e:
+            raise RuntimeError(f"Error creating archive: {str(e)}")
+
+        logger.info(
+            f"Stored {result.files} files ({format_size(result.bytes)}), "
+            f"{result.new_chunks} of {result.chunks} chunks new, "
+            f"{format_size(result.bytes_written)} written"
+        )
+        logger.info(f"Successfully created snapshot: {snapshot_path}")
+        return snapshot_path
+
+    def _restore_from_store(
+        self, snapshot_path: Path, destination: Path, patterns: List[str]
+    ) -> Path:
+        """Reassemble a snapshot from the chunk store."""
+        if read_snapshot(snapshot_path) is None:
+            raise ValueError(f"Not a chunk store snapshot: {snapshot_path}")
+
+        matcher = PatternMatcher(patterns)
+        created = not destination.exists()
+        try:
+            with self._open_store() as store:
+                names = store.restore(
+                    snapshot_path,
+                    destination,
+                    select=(
+                        (lambda name: _is_selected(matcher, name)) if patterns else None
+                    ),
+                )
+            if not names:
+                raise ValueError(f"No archive members match: {', '.join(patterns)}")
+        except Exception as e:
+            if created and destination.exists():
+                shutil.rmtree(destination)
+            if isinstance(e, ValueError):
+                raise
+            raise RuntimeError(f"Error restoring archive: {str(e)}")
+
+        logger.info(f"Successfully restored project to: {destination}")
+        return destination
+
+
+def archive_project(
+    config: Config, project_path: Path, options: Dict[str, Any]
+) -> Tuple[Path, SourceListing]:
+    """Archive one project in a worker process (see ``Archiver.archive_listed``)."""
+    return Archiver(config).archive_listed(project_path, **options)
+
+
+def _is_archive_date(text: str, date_format: str) -> bool:
+    """Whether TEXT is a date in DATE_FORMAT, possibly numbered (``-2``)."""
+    candidates = [text]
+    base, _, number = text.rpartition("-")
+    if number.isdigit():
+        candidates.append(base)
+    for candidate in candidates:
+        try:
+            datetime.strptime(candidate, date_format)
+            return True
+        except ValueError:
+            continue
+    return False
+
+
+def _partial_path(archive_path: Path) -> Path:
+    """Temporary name an archive is written under until it is complete.
+
+    Like manifests, ``name_date.tar.xz`` maps to ``name_date.xz.part`` so
+    that unfinished archives never match the ``*.tar.*`` pattern.
+    """
+    return manifest_path(archive_path).with_suffix(PARTIAL_SUFFIX)
+
+
+class _HashingReader:
+    """File wrapper that hashes everything read through it."""
+
+    def __init__(self, fileobj: IO[bytes]):
+        """Wrap a binary file object."""
+        self.fileobj = fileobj
+        self.hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the wrapped file and update the hash."""
+        data = self.fileobj.read(size)
+        self.hash.update(data)
+        return data
+
+
+class _HashingWriter:
+    """File wrapper that hashes everything written through it."""
+
+    def __init__(self, fileobj: IO[bytes]):
+        """Wrap a binary file object."""
+        self.fileobj = fileobj
+        self.hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        """Update the hash and write to the wrapped file."""
+        self.hash.update(data)
+        return self.fileobj.write(data)
+
+    def flush(self) -> None:
+        """Flush the wrapped file."""
+        self.fileobj.flush()
+
+
+def _member_type(tarinfo: tarfile.TarInfo) -> str:
+    """Short type name of a tar member as recorded in the manifest."""
+    if tarinfo.isreg():
+        return "file"
+    if tarinfo.isdir():
+        return "dir"
+    if tarinfo.issym():
+        return "symlink"
+    if tarinfo.islnk():
+        return "link"
+    return "other"
+
+
+def _add_tree(
+    tar: tarfile.TarFile,
+    root: Path,
+    arcname: str,
+    manifest: ManifestWriter,
+    base: Optional[Dict[str, ManifestEntry]] = None,
+    compare_hash: bool = False,
+    exclude: Optional[PatternMatcher] = None,
+    listing: Optional[SourceListing] = None,
+) -> int:
+    """Add a tree to TAR in ``TarFile.add`` order, recording each member.
+
+    Regular files are hashed while they are copied into the stream, so the
+    manifest costs no extra read of the source. With a BASE, unchanged
+    members are only recorded, and every member seen is removed from BASE.
+    Paths matching EXCLUDE are skipped without a stat. LISTING collects
+    the paths walked. Returns the number of non-directory members written.
+    """
+    stored = 0
+    prefix = len(arcname) + 1
+    stack: List[Tuple[str, str]] = [(os.fspath(root), arcname)]
+    while stack:
+        path, name = stack.pop()
+        if exclude is not None and name != arcname and exclude.matches(name[prefix:]):
+            if listing is not None:
+                listing.artifacts.append(path)
+            continue
+
+        fsops.count("stat")  # gettarinfo lstats the path
+        tarinfo = tar.gettarinfo(path, name)
+        if tarinfo is None:
+            logger.debug(f"Skipping unsupported file type: {path}")
+            continue
+        if listing is not None:
+            if tarinfo.isdir():
+                listing.directories.append(path)
+            else:
+                listing.files.append(path)
+                if tarinfo.isreg():
+                    listing.bytes += tarinfo.size
+
+        if base is not None:
+            if tarinfo.islnk():
+                # Its target may live in another archive of the chain
+                tarinfo.type = tarfile.REGTYPE
+                tarinfo.linkname = ""
+                tarinfo.size = fsops.lstat(path).st_size
+            previous = base.pop(tarinfo.name, None)
+            if previous is not None and _unchanged(
+                tarinfo, previous, path, compare_hash
+            ):
+                manifest.add(dataclasses.replace(previous, offset=None))
+                continue
+
+        sha256 = None
+        offset = tar.offset
+        if tarinfo.isreg():
+            fsops.count("open")
+            with open(path, "rb") as f:
+                reader = _HashingReader(f)
+                tar.addfile(tarinfo, reader)  # type: ignore[arg-type]
+            sha256 = reader.hash.hexdigest()
+        else:
+            tar.addfile(tarinfo)
+            if tarinfo.isdir():
+                children = sorted(fsops.listdir(path), reverse=True)
+                stack.extend(
+                    (os.path.join(path, child), f"{name}/{child}") for child in children
+                )
+        if not tarinfo.isdir():
+            stored += 1
+
+        manifest.add(
+            ManifestEntry(
+                name=tarinfo.name,
+                type=_member_type(tarinfo),
+                size=tarinfo.size,
+                mode=tarinfo.mode,
+                mtime=int(tarinfo.mtime),
+                sha256=sha256,
+                offset=offset,
+                linkname=tarinfo.linkname or None,
+            )
+        )
+    return stored
+
+
+def _unchanged(
+    tarinfo: tarfile.TarInfo, previous: ManifestEntry, path: str, compare_hash: bool
+) -> bool:
+    """Whether a non-directory member matches its entry in the previous archive."""
+    if tarinfo.isdir() or previous.type != _member_type(tarinfo):
+        return False
+    if previous.mode != tarinfo.mode:
+        return False
+    if tarinfo.issym():
+        return previous.linkname == tarinfo.linkname
+    if not tarinfo.isreg():
+        return False
+    if previous.size != tarinfo.size or previous.mtime != int(tarinfo.mtime):
+        return False
+    if compare_hash:
+        return (
+            previous.sha256 is not None
+            and hash_file(path, COPY_BUFSIZE) == previous.sha256
+        )
+    return True
+
+
+def _stored_size(manifest: Path, summary: ManifestSummary) -> int:
+    """Bytes of file data an archive holds itself, per its manifest."""
+    if summary.stored_size is not None:
+        return summary.stored_size
+    if summary.base is None:
+        return summary.total_size
+    return sum(
+        entry.size
+        for entry in iter_entries(manifest)
+        if entry.type == "file" and entry.archive is None
+    )
+
+
+def _load_base(archive_path: Path) -> Dict[str, ManifestEntry]:
+    """Entries of a previous archive, each naming the archive holding its data."""
+    base = {}
+    for entry in iter_entries(manifest_path(archive_path)):
+        if entry.archive is None:
+            entry.archive = archive_path.name
+        base[entry.name] = entry
+    return base
+
+
+def _archive_chain(archive_path: Path) -> List[Tuple[Path, Optional[Set[str]]]]:
+    """Archives to extract, oldest first, with the member names each holds.
+
+    A plain archive is its own chain and holds everything (None).
+    """
+    summary = read_summary(manifest_path(archive_path))
+    if summary is None or summary.base is None:
+        return [(archive_path, None)]
+
+    held: Dict[str, Set[str]] = {}
+    for entry in iter_entries(manifest_path(archive_path)):
+        held.setdefault(entry.archive or archive_path.name, set()).add(entry.name)
+
+    chain = [archive_path]
+    current: Optional[ManifestSummary] = summary
+    while current is not None and current.base is not None:
+        previous = archive_path.parent / current.base
+        if previous in chain:
+            raise ValueError(f"Archive chain loops at {previous}")
+        chain.append(previous)
+        current = read_summary(manifest_path(previous))
+
+    parts: List[Tuple[Path, Optional[Set[str]]]] = []
+    for part in reversed(chain):
+        if part.name not in held:
+            continue
+        if not part.is_file():
+            raise ValueError(f"Archive chain is incomplete, missing: {part}")
+        parts.append((part, held[part.name]))
+    return parts
+
+
+def _is_selected(matcher: PatternMatcher, name: str) -> bool:
+    """Whether a member or one of its parent directories matches a pattern."""
+    parts = name.split("/")
+    for candidate in (parts, parts[1:]):
+        for end in range(1, len(candidate) + 1):
+            if matcher.matches("/".join(candidate[:end])):
+                return True
+    return False
+
+
+def _indexed_entries(archive_path: Path) -> Optional[List[ManifestEntry]]:
+    """Manifest entries stored in the archive, if it supports seeking."""
+    path = manifest_path(archive_path)
+    summary = read_summary(path)
+    if summary is None or summary.codec != "xz":
+        return None
+    if summary.compressed_size != archive_path.stat().st_size:
+        return None
+    entries = [entry for entry in iter_entries(path) if entry.offset is not None]
+    return entries or None
+
+
+def _open_block_reader(raw: IO[bytes]) -> Optional[XZBlockReader]:
+    """Open a random-access reader, or None if the xz file has no usable index."""
+    try:
+        return XZBlockReader(raw)
+    except ValueError as e:
+        logger.debug(f"No random access, streaming instead: {str(e)}")
+        raw.seek(0)
+        return None
+
+
+def _extract_indexed(
+    reader: XZBlockReader, entries: List[ManifestEntry], destination: Path
+) -> List[str]:
+    """Extract members by seeking straight to their recorded offsets."""
+    if not entries:
+        return []
+
+    def members() -> Iterator[tarfile.TarInfo]:
+        for entry in entries:
+            reader.seek(entry.offset or 0)
+            member = tarfile.TarInfo.fromtarfile(tar)
+            if member.name != entry.name:
+                raise RuntimeError(f"Manifest does not match archive at {entry.name}")
+            yield member
+
+    reader.seek(entries[0].offset or 0)
+    with tarfile.TarFile(fileobj=reader) as tar:  # type: ignore[arg-type]
+        return _extract_members(tar, members(), destination)
+
+
+def _extract_selected(
+    archive_path: Path, select: Callable[[str], bool], destination: Path
+) -> List[str]:
+    """Extract the selected members of one archive, seeking when possible."""
+    entries = _indexed_entries(archive_path)
+    with open(archive_path, "rb") as raw:
+        reader = _open_block_reader(raw) if entries is not None else None
+        if entries is not None and reader is not None:
+            wanted = [entry for entry in entries if select(entry.name)]
+            names = _extract_indexed(reader, wanted, destination)
+            logger.debug(
+                f"Decompressed {reader.blocks_read} of "
+                f"{len(reader.blocks)} blocks of {archive_path}"
+            )
+            return names
+        with tarfile.open(fileobj=raw, mode="r|*") as tar:
+            return _extract_members(tar, _stream_selected(tar, select), destination)
+
+
+def _stream_selected(
+    tar: tarfile.TarFile, select: Callable[[str], bool]
+) -> Iterator[tarfile.TarInfo]:
+    """Yield the selected members of a streamed archive without keeping them."""
+    for member in tar:
+        if select(member.name):
+            yield member
+        tar.members = []  # type: ignore[attr-defined]
+
+
+def _extract_members(
+    tar: tarfile.TarFile, members: Iterable[tarfile.TarInfo], destination: Path
+) -> List[str]:
+    """Extract members, setting directory metadata once their contents exist."""
+    names = []
+    directories = []
+    for member in members:
+        target = destination / member.name
+        if not member.isdir() and os.path.lexists(target):
+            raise ValueError(f"Refusing to overwrite existing file: {target}")
+        tar.extract(member, path=destination, set_attrs=not member.isdir())
+        if member.isdir():
+            directories.append(member)
+        names.append(member.name)
+
+    for member in reversed(directories):
+        tar.extract(member, path=destination)
+    return names
+
+
+def _scan_archive(archive_path: Path) -> Tuple[int, int, int]:
+    """Stream an archive once, counting members without keeping them."""
+    member_count = 0
+    total_size = 0
+    with tarfile.open(str(archive_path), "r|*") as tar:
+        for member in tar:
+            member_count += 1
+            total_size += member.size
+            tar.members = []  # type: ignore[attr-defined]
+        # End-of-archive marker padded to a full record, as tar writes it
+        uncompressed_size = tar.offset + 2 * tarfile.BLOCKSIZE
+        uncompressed_size += -uncompressed_size % tarfile.RECORDSIZE
+    return member_count, total_size, uncompressed_size
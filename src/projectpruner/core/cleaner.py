@@ -2,12 +2,19 @@
 Project cleaner module for removing unnecessary files and directories.
 """
 
-import shutil
 from pathlib import Path
-from typing import Set
+from typing import List, Optional
 
+from projectpruner.core.matcher import PatternMatcher, walk_matches
+from projectpruner.core.remover import Remover
+from projectpruner.core.scanner import scan_directory
+from projectpruner.core.trash import Trash
 from projectpruner.models.config import Config
+from projectpruner.models.plan import CleanPlan, PlanEntry
+from projectpruner.utils import fsops
+from projectpruner.utils.filesystem import format_size
 from projectpruner.utils.logger import get_logger
+from projectpruner.utils.profiler import phase
 
 logger = get_logger(__name__)
 
@@ -15,11 +22,26 @@ logger = get_logger(__name__)
 class Cleaner:
     """Handles cleaning operations for development projects."""
 
-    def __init__(self, config: Config):
-        """Initialize the Cleaner with configuration."""
+    def __init__(
+        self,
+        config: Config,
+        jobs: Optional[int] = None,
+        trash: Optional[Trash] = None,
+    ):
+        """Initialize the Cleaner with configuration.
+
+        ``jobs`` sets the number of deletion workers. With a ``trash``,
+        matched paths are renamed into it instead of being deleted; paths
+        that cannot be staged on their filesystem are deleted as usual.
+        """
         self.config = config
+        self.jobs = jobs
+        self.trash = trash
+        self.matcher = PatternMatcher(
+            config.clean.patterns, config.clean.exclude_patterns
+        )
 
-    def clean(self, project_path: Path, dry_run: bool = False) -> None:
+    def clean(self, project_path: Path, dry_run: bool = False) -> CleanPlan:
         """Clean a project by removing unnecessary files and directories."""
         if not project_path.exists():
             raise ValueError(f"Project path does not exist: {project_path}")
@@ -27,86 +49,106 @@ class Cleaner:
         if not project_path.is_dir():
             raise ValueError(f"Path is not a directory: {project_path}")
 
-        # Find all matching paths
-        paths_to_remove = self._find_paths_to_remove(project_path)
+        # Find and size all matching paths in one walk
+        plan = self.plan(project_path)
 
-        if not paths_to_remove:
+        if not plan:
             logger.info(f"No files to clean in {project_path}")
-            return
-
-        # Calculate total size to be removed
-        total_size = sum(
-            path.stat().st_size if path.is_file() else self._get_dir_size(path)
-            for path in paths_to_remove
-        )
+            return plan
 
         logger.info(
-            f"Found {len(paths_to_remove)} items to clean "
-            f"({self._format_size(total_size)})"
+            f"Found {len(plan)} items to clean "
+            f"({plan.file_count} files, {self._format_size(plan.total_size)})"
         )
 
         if dry_run:
+            for entry in plan:
+                logger.info(f"  {entry.path} ({self._format_size(entry.size)})")
             logger.info("Dry run - no files will be removed")
-            return
-
-        # Remove paths
-        for path in paths_to_remove:
+            return plan
+
+        with phase("remove", project_path) as record:
+            record.files = plan.file_count
+            record.bytes = plan.total_size
+            to_delete = list(plan)
+            if self.trash is not None:
+                to_delete = self._move_to_trash(self.trash, plan)
+
+            # Remove paths, sharing one worker pool across all entries
+            with Remover(jobs=self.jobs) as remover:
+                for entry in to_delete:
+                    result = remover.remove(entry.path)
+                    for path, error in result.errors:
+                        logger.error(f"Error removing {path}: {error}")
+                    if result.ok:
+                        logger.debug(f"Removed: {entry.path}")
+
+        return plan
+
+    def _move_to_trash(self, trash: Trash, plan: CleanPlan) -> List[PlanEntry]:
+        """Rename plan entries into the trash, returning those left to delete."""
+        leftovers = []
+        for entry in plan:
             try:
-                if path.is_file():
-                    path.unlink()
-                elif path.is_dir():
-                    shutil.rmtree(path)
-                logger.debug(f"Removed: {path}")
-            except Exception as e:
-                logger.error(f"Error removing {path}: {str(e)}")
-
-    def _find_paths_to_remove(self, project_path: Path) -> Set[Path]:
-        """Find all paths that should be removed."""
-        paths_to_remove = set()
-
-        # Check each pattern
-        for pattern in self.config.clean.patterns:
-            # Use rglob to search recursively for patterns like "**/node_modules"
-            if pattern.startswith("**/"):
-                # Remove the leading "**/" to get the actual directory name
-                dir_name = pattern[3:]
-
-                # First, try direct match in the project directory
-                direct_match = project_path / dir_name
-                if direct_match.exists() and not any(
-                    direct_match.match(exclude)
-                    for exclude in self.config.clean.exclude_patterns
-                ):
-                    paths_to_remove.add(direct_match)
-
-                # Then find nested matches
-                for path in project_path.rglob(dir_name):
-                    if path.exists() and not any(
-                        path.match(exclude)
-                        for exclude in self.config.clean.exclude_patterns
-                    ):
-                        paths_to_remove.add(path)
+                item = trash.move(
+                    entry.path,
+                    device=entry.device,
+                    size=entry.size,
+                    file_count=entry.file_count,
+                )
+            except OSError as e:
+                logger.error(f"Error moving {entry.path} to trash: {str(e)}")
+                continue
+            if item is None:
+                leftovers.append(entry)
             else:
-                # Standard glob for non-recursive patterns
-                for path in project_path.glob(pattern):
-                    if not any(
-                        path.match(exclude)
-                        for exclude in self.config.clean.exclude_patterns
-                    ):
-                        paths_to_remove.add(path)
-
-        return paths_to_remove
+                entry.trashed = True
+                logger.debug(f"Trashed: {entry.path}")
+        return leftovers
+
+    def plan(self, project_path: Path) -> CleanPlan:
+        """Find and size everything that should be removed from a project.
+
+        Matching and sizing share a single pruned walk: each matched
+        directory is sized while it is visited, so nothing is walked twice.
+        """
+        plan = CleanPlan(project_path=project_path)
+        with phase("plan", project_path) as record:
+            for entry in walk_matches(project_path, self.matcher):
+                try:
+                    stat = fsops.entry_stat(entry)
+                    path = Path(entry.path)
+                    if entry.is_dir(follow_symlinks=False):
+                        scan = scan_directory(path)
+                        plan.entries.append(
+                            PlanEntry(
+                                path=path,
+                                is_dir=True,
+                                size=scan.size,
+                                file_count=scan.file_count,
+                                device=stat.st_dev,
+                            )
+                        )
+                    else:
+                        plan.entries.append(
+                            PlanEntry(
+                                path=path,
+                                is_dir=False,
+                                size=stat.st_size,
+                                file_count=1,
+                                device=stat.st_dev,
+                            )
+                        )
+                except OSError as e:
+                    logger.warning(f"Skipping {entry.path}: {str(e)}")
+            record.files = plan.file_count
+            record.bytes = plan.total_size
+        return plan
 
     def _get_dir_size(self, directory: Path) -> int:
         """Calculate the total size of a directory."""
-        return sum(
-            file.stat().st_size for file in directory.rglob("*") if file.is_file()
-        )
+        return scan_directory(directory).size
 
     def _format_size(self, size_bytes: float) -> str:
         """Format size in bytes to human-readable format."""
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size_bytes < 1024:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024
-        return f"{size_bytes:.1f} TB"
+        return format_size(size_bytes)
@@ -0,0 +1,508 @@
+"""
+Parallel compression writers for archive streams.
+"""
+
+import bisect
+import lzma
+import os
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import IO, Any, Callable, Deque, List, Optional, Tuple
+
+XZ_MAGIC = b"\xfd7zXZ\x00"
+XZ_FOOTER_MAGIC = b"YZ"
+XZ_CHECK_CRC32 = 0x01
+XZ_HEADER_SIZE = 12
+LZMA2_FILTER_ID = 0x21
+
+GZIP_CHUNK_SIZE = 128 * 1024
+GZIP_WINDOW_SIZE = 32 * 1024
+GZIP_OS_UNKNOWN = 255
+
+# Dictionary size used by each LZMA2 preset, as defined by liblzma
+PRESET_DICT_SIZES = [
+    256 * 1024,
+    1 << 20,
+    2 << 20,
+    4 << 20,
+    4 << 20,
+    8 << 20,
+    8 << 20,
+    16 << 20,
+    32 << 20,
+    64 << 20,
+]
+
+
+def default_threads() -> int:
+    """Number of compression threads to use when none is configured."""
+    return os.cpu_count() or 1
+
+
+def split_cpu_budget(
+    workers: int, threads: Optional[int] = None, budget: int = 0
+) -> Tuple[int, int]:
+    """Share a CPU budget between concurrent archives and their codec threads.
+
+    Returns how many archives may run at once and how many compression
+    threads each may use, so that together they never exceed BUDGET
+    (0 = one per CPU). An explicit THREADS is lowered when it does not fit.
+    """
+    budget = budget or default_threads()
+    workers = max(1, min(workers, budget))
+    share = max(1, budget // workers)
+    return workers, min(threads, share) if threads else share
+
+
+def encode_vli(value: int) -> bytes:
+    """Encode an integer as an xz variable-length integer."""
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _crc32(data: bytes) -> bytes:
+    """CRC32 as the four little-endian bytes used throughout the xz format."""
+    return zlib.crc32(data).to_bytes(4, "little")
+
+
+def _pad4(length: int) -> bytes:
+    """Zero padding that rounds LENGTH up to a multiple of four."""
+    return b"\x00" * (-length % 4)
+
+
+def _lzma2_dict_byte(dict_size: int) -> int:
+    """Encode an LZMA2 dictionary size as its one-byte filter property."""
+    for value in range(40):
+        if dict_size <= (2 | (value & 1)) << (value // 2 + 11):
+            return value
+    return 40
+
+
+def _compress_xz_block(data: bytes, preset: int) -> Tuple[bytes, int, int]:
+    """Compress one independent xz block.
+
+    Returns the encoded block together with its unpadded size and
+    uncompressed size, which are what the stream index records.
+    """
+    compressed = lzma.compress(
+        data,
+        format=lzma.FORMAT_RAW,
+        filters=[{"id": lzma.FILTER_LZMA2, "preset": preset}],
+    )
+
+    # Block flags: one filter, compressed and uncompressed sizes present
+    body = (
+        bytes([0xC0])
+        + encode_vli(len(compressed))
+        + encode_vli(len(data))
+        + encode_vli(LZMA2_FILTER_ID)
+        + encode_vli(1)
+        + bytes([_lzma2_dict_byte(PRESET_DICT_SIZES[preset])])
+    )
+    header_size = 1 + len(body) + 4
+    header_size += -header_size % 4
+    header = bytes([header_size // 4 - 1]) + body
+    header += _pad4(len(header))
+    header += _crc32(header)
+
+    block = header + compressed + _pad4(len(compressed)) + _crc32(data)
+    unpadded_size = len(header) + len(compressed) + 4
+    return block, unpadded_size, len(data)
+
+
+def _xz_index_and_footer(blocks: List[Tuple[int, int]], check: int) -> bytes:
+    """Encode the stream index for BLOCKS followed by the stream footer."""
+    index = bytearray(b"\x00")
+    index += encode_vli(len(blocks))
+    for unpadded_size, uncompressed_size in blocks:
+        index += encode_vli(unpadded_size)
+        index += encode_vli(uncompressed_size)
+    index += _pad4(len(index))
+    index += _crc32(bytes(index))
+
+    footer = (len(index) // 4 - 1).to_bytes(4, "little") + bytes([0x00, check])
+    return bytes(index) + _crc32(footer) + footer + XZ_FOOTER_MAGIC
+
+
+def _decode_vli(data: bytes, position: int) -> Tuple[int, int]:
+    """Decode an xz variable-length integer, returning it and the next position."""
+    value = 0
+    for shift in range(0, 63, 7):
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+    raise ValueError("Invalid xz variable-length integer")
+
+
+def _compress_gzip_chunk(
+    data: bytes, dictionary: bytes, level: int, last: bool
+) -> bytes:
+    """Compress one chunk as raw deflate primed with the previous chunk's tail.
+
+    Non-final chunks end with a sync flush so that they sit on a byte
+    boundary and can be concatenated into a single deflate stream.
+    """
+    if dictionary:
+        compressor = zlib.compressobj(
+            level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary
+        )
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(
+        zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+    )
+
+
+class _ParallelWriter:
+    """Write-only file object that compresses fixed-size blocks concurrently.
+
+    Subclasses provide the container format: ``_compress`` turns a block
+    into a callable run on the thread pool, and ``_write_block`` and
+    ``_finish`` write the results in order.
+    """
+
+    def __init__(self, fileobj: IO[bytes], threads: Optional[int], block_size: int):
+        """Initialize the writer on top of a binary file object."""
+        self.fileobj = fileobj
+        self.threads = threads if threads is not None else default_threads()
+        self.block_size = block_size
+        self.closed = False
+
+        self._buffer = bytearray()
+        self._position = 0
+        self._pending: Deque["Future[Any]"] = deque()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.threads) if self.threads > 1 else None
+        )
+
+    def write(self, data: bytes) -> int:
+        """Buffer data and compress every completed block."""
+        if self.closed:
+            raise ValueError("write to closed file")
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[: self.block_size])
+            del self._buffer[: self.block_size]
+            self._submit(block, last=False)
+        return len(data)
+
+    def tell(self) -> int:
+        """Number of uncompressed bytes written so far."""
+        return self._position
+
+    def flush(self) -> None:
+        """Flush the underlying file object (blocks are only written whole)."""
+        self.fileobj.flush()
+
+    def close(self) -> None:
+        """Compress the final block and finish the container."""
+        if self.closed:
+            return
+        try:
+            self._submit(bytes(self._buffer), last=True)
+            self._buffer.clear()
+            while self._pending:
+                self._drain()
+            self._finish()
+        finally:
+            self.closed = True
+            if self._executor is not None:
+                self._executor.shutdown()
+
+    def __enter__(self) -> "_ParallelWriter":
+        """Use the writer as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Finish the stream when leaving the context."""
+        self.close()
+
+    def _submit(self, block: bytes, last: bool) -> None:
+        """Queue a block for compression, bounding the work in flight."""
+        task = self._compress(block, last)
+        if task is None:
+            return
+        if self._executor is None:
+            self._write_block(task())
+            return
+        self._pending.append(self._executor.submit(task))
+        while len(self._pending) > self.threads * 2:
+            self._drain()
+
+    def _drain(self) -> None:
+        """Write out the oldest queued block once it is compressed."""
+        self._write_block(self._pending.popleft().result())
+
+    def _compress(self, block: bytes, last: bool) -> Optional[Callable[[], Any]]:
+        """Return the work that compresses BLOCK, or None to skip it."""
+        raise NotImplementedError
+
+    def _write_block(self, result: Any) -> None:
+        """Write one compressed block."""
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        """Write the container trailer after the last block."""
+        raise NotImplementedError
+
+
+class ParallelXZWriter(_ParallelWriter):
+    """Write-only file object producing a multi-block ``.xz`` stream.
+
+    Input is cut into fixed-size blocks that are compressed independently on
+    a thread pool (``lzma`` releases the GIL) and written in order. The
+    result is a single standard xz stream with one block per chunk and a
+    full index, readable by ``xz -d`` and Python's ``lzma`` module.
+    """
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        preset: int = 6,
+        threads: Optional[int] = None,
+        block_size: Optional[int] = None,
+    ):
+        """Initialize the writer and write the stream header."""
+        if not 0 <= preset <= 9:
+            raise ValueError(f"Invalid xz compression level: {preset}")
+
+        # Same default as xz --threads: three times the dictionary size
+        super().__init__(fileobj, threads, block_size or 3 * PRESET_DICT_SIZES[preset])
+        self.preset = preset
+        self.blocks: List[Tuple[int, int]] = []
+
+        stream_flags = bytes([0x00, XZ_CHECK_CRC32])
+        self.fileobj.write(XZ_MAGIC + stream_flags + _crc32(stream_flags))
+
+    def __enter__(self) -> "ParallelXZWriter":
+        """Use the writer as a context manager."""
+        return self
+
+    def _compress(self, block: bytes, last: bool) -> Optional[Callable[[], Any]]:
+        """Compress each non-empty block independently."""
+        if not block:
+            return None
+        return partial(_compress_xz_block, block, self.preset)
+
+    def _write_block(self, result: Tuple[bytes, int, int]) -> None:
+        """Write an encoded block and remember it for the index."""
+        block, unpadded_size, uncompressed_size = result
+        self.fileobj.write(block)
+        self.blocks.append((unpadded_size, uncompressed_size))
+
+    def _finish(self) -> None:
+        """Write the stream index and footer."""
+        self.fileobj.write(_xz_index_and_footer(self.blocks, XZ_CHECK_CRC32))
+
+
+class ParallelGzipWriter(_ParallelWriter):
+    """Write-only file object producing a single-member gzip stream, pigz-style.
+
+    Input is cut into fixed-size chunks that are deflated concurrently, each
+    primed with the last 32 KiB of the previous chunk as its dictionary so
+    the ratio stays close to single-threaded gzip. The chunks are joined
+    into one deflate stream inside one gzip member; the CRC is computed as
+    data arrives.
+    """
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        level: int = 6,
+        threads: Optional[int] = None,
+        block_size: int = GZIP_CHUNK_SIZE,
+        mtime: Optional[float] = None,
+    ):
+        """Initialize the writer and write the gzip member header."""
+        if not 0 <= level <= 9:
+            raise ValueError(f"Invalid gzip compression level: {level}")
+
+        super().__init__(fileobj, threads, block_size)
+        self.level = level
+        self._crc = 0
+        self._dictionary = b""
+
+        extra_flags = 2 if level == 9 else 4 if level == 1 else 0
+        timestamp = int(time.time() if mtime is None else mtime) & 0xFFFFFFFF
+        self.fileobj.write(
+            b"\x1f\x8b\x08\x00"
+            + timestamp.to_bytes(4, "little")
+            + bytes([extra_flags, GZIP_OS_UNKNOWN])
+        )
+
+    def __enter__(self) -> "ParallelGzipWriter":
+        """Use the writer as a context manager."""
+        return self
+
+    def _compress(self, block: bytes, last: bool) -> Optional[Callable[[], Any]]:
+        """Deflate a chunk primed with the tail of the previous one."""
+        self._crc = zlib.crc32(block, self._crc)
+        dictionary = self._dictionary
+        self._dictionary = block[-GZIP_WINDOW_SIZE:] if block else dictionary
+        return partial(_compress_gzip_chunk, block, dictionary, self.level, last)
+
+    def _write_block(self, result: bytes) -> None:
+        """Write a deflated chunk."""
+        self.fileobj.write(result)
+
+    def _finish(self) -> None:
+        """Write the gzip trailer."""
+        self.fileobj.write(
+            (self._crc & 0xFFFFFFFF).to_bytes(4, "little")
+            + (self._position & 0xFFFFFFFF).to_bytes(4, "little")
+        )
+
+
+@dataclass
+class XZBlock:
+    """Location of one block inside a single-stream ``.xz`` file."""
+
+    compressed_offset: int
+    uncompressed_offset: int
+    unpadded_size: int
+    uncompressed_size: int
+
+    @property
+    def compressed_size(self) -> int:
+        """Size of the block in the file, including its padding."""
+        return self.unpadded_size + (-self.unpadded_size % 4)
+
+
+def read_xz_index(fileobj: IO[bytes]) -> Tuple[bytes, List[XZBlock]]:
+    """Read the stream flags and block index of a single-stream ``.xz`` file.
+
+    Raises ValueError when the file is not a single xz stream, which
+    callers treat as "no random access available".
+    """
+    fileobj.seek(0)
+    header = fileobj.read(XZ_HEADER_SIZE)
+    if len(header) != XZ_HEADER_SIZE or not header.startswith(XZ_MAGIC):
+        raise ValueError("Not an xz file")
+    stream_flags = header[6:8]
+
+    # Skip stream padding, which is made of null bytes in multiples of four
+    end = fileobj.seek(0, os.SEEK_END)
+    while end >= XZ_HEADER_SIZE * 2:
+        fileobj.seek(end - 4)
+        if fileobj.read(4) != b"\x00" * 4:
+            break
+        end -= 4
+
+    fileobj.seek(end - XZ_HEADER_SIZE)
+    footer = fileobj.read(XZ_HEADER_SIZE)
+    if footer[-2:] != XZ_FOOTER_MAGIC or footer[8:10] != stream_flags:
+        raise ValueError("Invalid xz stream footer")
+    if _crc32(footer[4:10]) != footer[:4]:
+        raise ValueError("Corrupt xz stream footer")
+
+    index_size = (int.from_bytes(footer[4:8], "little") + 1) * 4
+    index_start = end - XZ_HEADER_SIZE - index_size
+    fileobj.seek(index_start)
+    index = fileobj.read(index_size)
+    if index[:1] != b"\x00" or _crc32(index[:-4]) != index[-4:]:
+        raise ValueError("Corrupt xz stream index")
+
+    count, position = _decode_vli(index, 1)
+    blocks: List[XZBlock] = []
+    compressed_offset = XZ_HEADER_SIZE
+    uncompressed_offset = 0
+    for _ in range(count):
+        unpadded_size, position = _decode_vli(index, position)
+        uncompressed_size, position = _decode_vli(index, position)
+        block = XZBlock(
+            compressed_offset, uncompressed_offset, unpadded_size, uncompressed_size
+        )
+        blocks.append(block)
+        compressed_offset += block.compressed_size
+        uncompressed_offset += uncompressed_size
+
+    # Blocks must fill the file exactly up to the index, or there are more streams
+    if compressed_offset != index_start:
+        raise ValueError("xz file has more than one stream")
+    return stream_flags, blocks
+
+
+class XZBlockReader:
+    """Read-only, seekable file object over a multi-block ``.xz`` file.
+
+    Only the blocks covering the requested ranges are decompressed, using
+    the block index at the end of the stream. Each block is decoded on its
+    own by wrapping it in a one-block stream, so every filter chain and
+    check type that ``lzma`` supports works.
+    """
+
+    def __init__(self, fileobj: IO[bytes]):
+        """Read the stream index of FILEOBJ."""
+        self.fileobj = fileobj
+        self.stream_flags, self.blocks = read_xz_index(fileobj)
+        self.size = sum(block.uncompressed_size for block in self.blocks)
+        self.blocks_read = 0
+        self._starts = [block.uncompressed_offset for block in self.blocks]
+        self._position = 0
+        self._cached: Optional[Tuple[int, bytes]] = None
+
+    def seekable(self) -> bool:
+        """The reader supports random access."""
+        return True
+
+    def tell(self) -> int:
+        """Current position in the uncompressed data."""
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Move to a position in the uncompressed data."""
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f"Negative seek position: {offset}")
+        self._position = offset
+        return offset
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to SIZE uncompressed bytes from the current position."""
+        end = self.size if size < 0 else min(self.size, self._position + size)
+        chunks = []
+        while self._position < end:
+            index = bisect.bisect_right(self._starts, self._position) - 1
+            block = self.blocks[index]
+            data = self._block_data(index)
+            start = self._position - block.uncompressed_offset
+            chunk = data[start : start + end - self._position]
+            chunks.append(chunk)
+            self._position += len(chunk)
+        return b"".join(chunks)
+
+    def _block_data(self, index: int) -> bytes:
+        """Decompress one block, keeping the most recent one cached."""
+        if self._cached is not None and self._cached[0] == index:
+            return self._cached[1]
+
+        block = self.blocks[index]
+        self.fileobj.seek(block.compressed_offset)
+        encoded = self.fileobj.read(block.compressed_size)
+        stream = (
+            XZ_MAGIC
+            + self.stream_flags
+            + _crc32(self.stream_flags)
+            + encoded
+            + _xz_index_and_footer(
+                [(block.unpadded_size, block.uncompressed_size)], self.stream_flags[1]
+            )
+        )
+        data = lzma.decompress(stream, format=lzma.FORMAT_XZ)
+        self.blocks_read += 1
+        self._cached = (index, data)
+        return data
@@ -0,0 +1,255 @@
+"""
+Parallel extraction engine for restoring archives.
+"""
+
+import os
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Deque, List, Optional, Set, Tuple, Union
+
+from projectpruner.utils.filesystem import default_jobs
+
+# Files up to this size are read by the decompression stage and handed to a
+# writer; larger ones are streamed to disk directly to bound memory use
+INLINE_FILE_SIZE = 4 << 20
+# Upper bound on file contents held in memory while waiting for writers
+MAX_PENDING_BYTES = 64 << 20
+
+# Ownership is only restored when running as root, as tarfile does
+RESTORE_OWNER = hasattr(os, "geteuid") and os.geteuid() == 0
+
+OPEN_FLAGS = (
+    os.O_WRONLY
+    | os.O_CREAT
+    | os.O_EXCL
+    | getattr(os, "O_NOFOLLOW", 0)
+    | getattr(os, "O_CLOEXEC", 0)
+    | getattr(os, "O_BINARY", 0)
+)
+
+
+@dataclass
+class ExtractResult:
+    """Outcome of extracting an archive."""
+
+    destination: Path
+    files: int = 0
+    dirs: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Throughput of file contents written."""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """Rate of files and directories created."""
+        return (self.files + self.dirs) / self.seconds if self.seconds else 0.0
+
+
+class Extractor:
+    """Extracts tar archives with overlapped decompression and file creation.
+
+    The calling thread reads the archive as a stream and creates
+    directories, so parents always exist before their contents. File
+    contents are handed to a pool of writer threads that create, fill and
+    stamp each file through its descriptor. Directory modes and mtimes are
+    applied in a final pass, deepest first, once nothing else will touch
+    them. Members that would land outside the destination are rejected.
+    """
+
+    def __init__(self, jobs: Optional[int] = None):
+        """Initialize the Extractor with a writer count (default: automatic)."""
+        self.jobs = jobs
+
+    def extract(
+        self,
+        archive_path: Path,
+        destination: Path,
+        select: Optional[Callable[[str], bool]] = None,
+    ) -> ExtractResult:
+        """Extract the members of ARCHIVE_PATH below DESTINATION.
+
+        Only members accepted by ``select`` are extracted when it is given.
+        """
+        result = ExtractResult(destination=Path(destination))
+        started = time.monotonic()
+        root = os.fspath(destination)
+        os.makedirs(root, exist_ok=True)
+
+        jobs = self.jobs if self.jobs is not None else default_jobs(destination)
+        directories: List[Tuple[str, tarfile.TarInfo]] = []
+        symlinks: Set[str] = set()
+        pending: Deque[Tuple["Future[None]", int]] = deque()
+        pending_bytes = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+
+            def drain(limit: int) -> None:
+                nonlocal pending_bytes
+                while pending and (pending_bytes > limit or limit < 0):
+                    future, size = pending.popleft()
+                    future.result()
+                    pending_bytes -= size
+
+            # Buffered (not stream) mode: tarfile's stream reader is far slower
+            with tarfile.open(archive_path, "r:*") as tar:
+                while True:
+                    member = tar.next()
+                    if member is None:
+                        break
+                    # Members are not kept, so memory stays flat for huge archives
+                    tar.members = []  # type: ignore[attr-defined]
+                    if select is not None and not select(member.name):
+                        continue
+                    target = _target_path(root, member.name, symlinks)
+
+                    if member.isdir():
+                        _make_directory(target)
+                        directories.append((target, member))
+                        result.dirs += 1
+                    elif member.isreg():
+                        source = tar.extractfile(member)
+                        if source is None:
+                            continue
+                        if member.size > INLINE_FILE_SIZE:
+                            _write_file(target, member, source)
+                        else:
+                            data = source.read()
+                            pending.append(
+                                (
+                                    executor.submit(_write_file, target, member, data),
+                                    len(data),
+                                )
+                            )
+                            pending_bytes += len(data)
+                            drain(MAX_PENDING_BYTES)
+                        result.files += 1
+                        result.bytes += member.size
+                    elif member.issym():
+                        pending.append(
+                            (executor.submit(_make_symlink, target, member), 0)
+                        )
+                        symlinks.add(os.path.normpath(target))
+                        result.files += 1
+                    elif member.islnk():
+                        # The link target has to be written before it can be linked
+                        drain(-1)
+                        source_path = _target_path(root, member.linkname, symlinks)
+                        _make_parent(target)
+                        os.link(source_path, target, follow_symlinks=False)
+                        result.files += 1
+                    elif member.isfifo():
+                        _make_parent(target)
+                        os.mkfifo(target, member.mode & 0o7777)
+                        result.files += 1
+                    else:
+                        raise ValueError(f"Unsupported member type: {member.name}")
+
+            drain(-1)
+
+        # Directories last and deepest first, so creating their entries no
+        # longer changes their mtimes
+        for target, member in reversed(directories):
+            if RESTORE_OWNER:
+                os.chown(target, member.uid, member.gid)
+            os.chmod(target, member.mode & 0o7777)
+            os.utime(target, (member.mtime, member.mtime))
+
+        result.seconds = time.monotonic() - started
+        return result
+
+
+def _target_path(root: str, name: str, symlinks: Set[str]) -> str:
+    """Resolve a member name below ROOT, rejecting paths that would escape it."""
+    parts = name.replace("\\", "/").split("/")
+    if name.startswith("/") or os.path.isabs(name) or ".." in parts:
+        raise ValueError(f"Refusing to extract outside the destination: {name}")
+    target = os.path.normpath(os.path.join(root, *[part for part in parts if part]))
+
+    # A member below an extracted symlink could be redirected anywhere
+    parent = os.path.dirname(target)
+    while len(parent) > len(root):
+        if parent in symlinks:
+            raise ValueError(f"Refusing to extract through a symlink: {name}")
+        parent = os.path.dirname(parent)
+    return target
+
+
+def _make_parent(path: str) -> None:
+    """Create the parent directory of PATH for archives without directory entries."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+
+def _make_directory(path: str) -> None:
+    """Create a directory that stays writable until its metadata is applied."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        if not os.path.isdir(path) or os.path.islink(path):
+            raise
+    except FileNotFoundError:
+        os.makedirs(path, 0o700)
+
+
+def _write_file(
+    path: str, member: tarfile.TarInfo, source: Union[bytes, IO[bytes]]
+) -> None:
+    """Create a file from bytes or a readable object and apply its metadata."""
+    try:
+        fd = os.open(path, OPEN_FLAGS, 0o600)
+    except FileNotFoundError:
+        _make_parent(path)
+        fd = os.open(path, OPEN_FLAGS, 0o600)
+
+    try:
+        if isinstance(source, bytes):
+            view = memoryview(source)
+            while view:
+                view = view[os.write(fd, view) :]
+        else:
+            while True:
+                chunk = source.read(1 << 20)
+                if not chunk:
+                    break
+                view = memoryview(chunk)
+                while view:
+                    view = view[os.write(fd, view) :]
+        if RESTORE_OWNER:
+            os.chown(fd, member.uid, member.gid)
+        if os.chmod in os.supports_fd:
+            os.chmod(fd, member.mode & 0o7777)
+        else:
+            os.chmod(path, member.mode & 0o7777)
+        if os.utime in os.supports_fd:
+            os.utime(fd, (member.mtime, member.mtime))
+        else:
+            os.utime(path, (member.mtime, member.mtime))
+    finally:
+        os.close(fd)
+
+
+def _make_symlink(path: str, member: tarfile.TarInfo) -> None:
+    """Create a symlink and, where supported, set its own mtime."""
+    try:
+        os.symlink(member.linkname, path)
+    except FileNotFoundError:
+        _make_parent(path)
+        os.symlink(member.linkname, path)
+    if RESTORE_OWNER:
+        os.chown(path, member.uid, member.gid, follow_symlinks=False)
+    if os.utime in os.supports_follow_symlinks:
+        os.utime(path, (member.mtime, member.mtime), follow_symlinks=False)
+
+
+def extract_archive(
+    archive_path: Path, destination: Path, jobs: Optional[int] = None
+) -> ExtractResult:
+    """Extract an archive with a temporary writer pool."""
+    return Extractor(jobs=jobs).extract(archive_path, destination)
@@ -3,12 +3,18 @@ Project finder module for locating development projects.
 """
 
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
 from projectpruner.models.config import Config
 from projectpruner.models.project import Project
+from projectpruner.utils.filesystem import default_jobs
+from projectpruner.utils.profiler import phase
+
+if TYPE_CHECKING:
+    from projectpruner.core.index import ScanIndex
 
 
 def is_relative_to(path: Path, other: Path) -> bool:
@@ -22,74 +28,143 @@ def is_relative_to(path: Path, other: Path) -> bool:
 class ProjectFinder:
     """Finds development projects based on various criteria."""
 
-    def __init__(self, config: Config):
-        """Initialize the ProjectFinder with configuration."""
+    def __init__(self, config: Config, index: Optional["ScanIndex"] = None):
+        """Initialize the ProjectFinder with configuration.
+
+        An optional scan index lets repeat runs skip unchanged directories.
+        """
         self.config = config
+        self.index = index
 
     def find(
         self,
         older_than: Optional[str] = None,
         larger_than: Optional[str] = None,
         pattern: Optional[str] = None,
+        jobs: Optional[int] = None,
     ) -> List[Project]:
         """Find projects matching the specified criteria."""
-        projects = []
-
         search_paths = [Path(p).expanduser() for p in self.config.search_paths]
         exclude_paths = [Path(p).expanduser() for p in self.config.exclude_paths]
 
+        candidates: List[Path] = []
         for search_path in search_paths:
             if not search_path.exists():
                 continue
 
-            for path in search_path.iterdir():
-                if not path.is_dir():
-                    continue
-
+            for path in self.list_candidates(search_path):
                 # Ensure exclude paths are absolute and expanded
                 if any(
                     is_relative_to(path.resolve(), exclude.resolve())
                     for exclude in exclude_paths
                 ):
                     continue
+                candidates.append(path)
 
-                try:
-                    project = Project.from_path(path)
+        if pattern:
+            # The pattern only looks at the path, so it is checked before scanning
+            candidates = [
+                path for path in candidates if self._matches_pattern(path, pattern)
+            ]
 
-                    if self._matches_criteria(
-                        project,
-                        older_than=older_than,
-                        larger_than=larger_than,
-                        pattern=pattern,
-                    ):
-                        projects.append(project)
+        if jobs is None and search_paths:
+            jobs = default_jobs(search_paths[0])
 
-                except ValueError:
-                    continue
+        return self.scan_projects(
+            candidates, jobs=jobs, older_than=older_than, larger_than=larger_than
+        )
 
-        return projects
+    def list_candidates(self, parent: Path) -> List[Path]:
+        """List the subdirectories of a parent directory in a stable order."""
+        return sorted(path for path in parent.iterdir() if path.is_dir())
 
-    def _matches_criteria(
+    def scan_projects(
         self,
-        project: Project,
+        paths: Iterable[Path],
+        jobs: Optional[int] = None,
         older_than: Optional[str] = None,
         larger_than: Optional[str] = None,
-        pattern: Optional[str] = None,
-    ) -> bool:
-        """Check if a project matches the specified criteria."""
-        if older_than and not self._is_older_than(project, older_than):
-            return False
+    ) -> List[Project]:
+        """Scan many project directories concurrently.
 
-        if larger_than and not self._is_larger_than(project, larger_than):
-            return False
+        Results keep the order of ``paths``; paths that cannot be loaded as a
+        project, or that do not match ``older_than`` and ``larger_than``, are
+        skipped.
+        """
+        paths = list(paths)
+        if not paths:
+            return []
 
-        if pattern and not self._matches_pattern(project, pattern):
-            return False
+        cutoff = self._cutoff(older_than) if older_than else None
+        size_limit = self._size_limit(larger_than) if larger_than else None
 
-        return True
+        def load(path: Path) -> Optional[Project]:
+            return self._load_matching(path, cutoff, size_limit)
+
+        if jobs is None:
+            jobs = default_jobs(paths[0])
+        jobs = max(1, min(jobs, len(paths)))
+
+        if jobs == 1:
+            results = [load(path) for path in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(load, paths))
 
-    def _is_older_than(self, project: Project, duration: str) -> bool:
-        """Check if a project is older than the specified duration."""
+        return [project for project in results if project is not None]
+
+    def _load_project(
+        self,
+        path: Path,
+        cutoff: Optional[datetime] = None,
+        use_index: bool = True,
+    ) -> Optional[Project]:
+        """Load a project, returning None if the path is not a valid project.
+
+        With a ``cutoff``, the scan stops at the first file modified since
+        then, as the project is too recent whatever else it holds, and the
+        returned project is marked incomplete.
+        """
+        stop_newer_than = cutoff.timestamp() if cutoff is not None else None
+        with phase("scan", path) as record:
+            try:
+                project = Project.from_path(
+                    path,
+                    index=self.index if use_index else None,
+                    stop_newer_than=stop_newer_than,
+                )
+            except (ValueError, OSError):
+                return None
+            record.files = project.file_count
+            record.bytes = project.size
+        return project
+
+    def _load_matching(
+        self, path: Path, cutoff: Optional[datetime], size_limit: Optional[int]
+    ) -> Optional[Project]:
+        """Load a project only if it matches the age and size criteria.
+
+        It must be last modified before ``cutoff`` and be larger than
+        ``size_limit`` bytes. The scan stops at the first file newer than the
+        cutoff; projects that are selected have been scanned in full.
+
+        The scan index misses files rewritten in place, so it is not used
+        when selecting by age: a stale index must never select a project for
+        removal.
+        """
+        project = self._load_project(path, cutoff, use_index=cutoff is None)
+        if project is None:
+            return None
+        if cutoff is not None and (
+            not project.complete or project.last_modified >= cutoff
+        ):
+            return None
+        if size_limit is not None and project.size <= size_limit:
+            return None
+        return project
+
+    def _cutoff(self, duration: str) -> datetime:
+        """Point in time the specified duration ago."""
         now = datetime.now()
 
         # Parse duration string (e.g., "6months", "1year", "1y", "6m")
@@ -112,10 +187,10 @@ class ProjectFinder:
         else:
             raise ValueError(f"Unsupported time unit: {unit}")
 
-        return project.last_modified < (now - delta)
+        return now - delta
 
-    def _is_larger_than(self, project: Project, size: str) -> bool:
-        """Check if a project is larger than the specified size."""
+    def _size_limit(self, size: str) -> int:
+        """Number of bytes in the specified size."""
         # Parse size string (e.g., "1GB", "500MB")
         match = re.match(r"(\d+)([A-Za-z]+)", size)
         if not match:
@@ -126,19 +201,17 @@ class ProjectFinder:
 
         # Convert to bytes
         if unit.upper() == "GB":
-            size_bytes = amount * 1024 * 1024 * 1024
+            return amount * 1024 * 1024 * 1024
         elif unit.upper() == "MB":
-            size_bytes = amount * 1024 * 1024
+            return amount * 1024 * 1024
         elif unit.upper() == "KB":
-            size_bytes = amount * 1024
+            return amount * 1024
         else:
             raise ValueError(f"Unsupported size unit: {unit}")
 
-        return project.size > size_bytes
-
-    def _matches_pattern(self, project: Project, pattern: str) -> bool:
-        """Check if a project matches the specified pattern."""
+    def _matches_pattern(self, path: Path, pattern: str) -> bool:
+        """Check if a project path matches the specified pattern."""
         try:
-            return bool(re.search(pattern, str(project.path)))
+            return bool(re.search(pattern, str(path)))
         except re.error:
             raise ValueError(f"Invalid pattern: {pattern}")
@@ -0,0 +1,132 @@
+"""
+Persistent scan index for skipping unchanged projects between runs.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from projectpruner.core.scanner import DirectoryRecord, ScanResult
+from projectpruner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    root TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    newest_mtime REAL,
+    file_count INTEGER NOT NULL,
+    dir_count INTEGER NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    root TEXT NOT NULL,
+    rel TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    newest_mtime REAL,
+    file_count INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    PRIMARY KEY (root, rel)
+);
+"""
+
+
+class ScanIndex:
+    """SQLite-backed store of per-project totals and directory signatures.
+
+    A directory whose mtime and inode still match its stored signature has
+    not gained, lost or renamed entries, so its recorded totals are reused
+    instead of listing it again. Files rewritten in place without touching
+    their directory are not noticed; use ``clear`` to force a full rescan.
+    """
+
+    DEFAULT_PATH = Path.home() / ".projectpruner" / "scan_index.sqlite"
+
+    def __init__(self, path: Optional[Path] = None):
+        """Open (and create if needed) the index database."""
+        self.path = Path(path) if path is not None else self.DEFAULT_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def load(self, root: str) -> Dict[str, DirectoryRecord]:
+        """Load the directory records stored for a project root."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rel, mtime_ns, inode, size, newest_mtime, file_count, subdirs "
+                "FROM directories WHERE root = ?",
+                (root,),
+            ).fetchall()
+
+        return {
+            rel: DirectoryRecord(
+                mtime_ns=mtime_ns,
+                inode=inode,
+                size=size,
+                newest_mtime=newest_mtime,
+                file_count=file_count,
+                subdirs=json.loads(subdirs),
+            )
+            for rel, mtime_ns, inode, size, newest_mtime, file_count, subdirs in rows
+        }
+
+    def store(
+        self, root: str, result: ScanResult, records: Dict[str, DirectoryRecord]
+    ) -> None:
+        """Replace everything stored for a project root with a fresh scan."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM directories WHERE root = ?", (root,))
+            self._conn.executemany(
+                "INSERT INTO directories VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        root,
+                        rel,
+                        record.mtime_ns,
+                        record.inode,
+                        record.size,
+                        record.newest_mtime,
+                        record.file_count,
+                        json.dumps(record.subdirs),
+                    )
+                    for rel, record in records.items()
+                ),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    root,
+                    result.size,
+                    result.newest_mtime,
+                    result.file_count,
+                    result.dir_count,
+                    time.time(),
+                ),
+            )
+
+    def clear(self) -> None:
+        """Drop all stored records so the next scans start from scratch."""
+        logger.info(f"Rebuilding scan index at {self.path}")
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM directories")
+            self._conn.execute("DELETE FROM projects")
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ScanIndex":
+        """Use the index as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the index when leaving the context."""
+        self.close()
@@ -0,0 +1,126 @@
+"""
+Write-ahead journal of a bulk archive run, used to resume it after a crash.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Dict, Optional
+
+from projectpruner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Project states, in the order a project goes through them
+SCANNED = "scanned"
+ARCHIVING = "archiving"
+ARCHIVED = "archived"
+VERIFIED = "verified"
+REMOVED = "removed"
+# Scanned, but not selected for archiving
+SKIPPED = "skipped"
+
+JOURNAL_SUFFIX = ".journal"
+
+
+@dataclass
+class JournalEntry:
+    """The state a project reached, as recorded in the journal."""
+
+    project: str
+    state: str
+    time: float
+    archive: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether nothing is left to do for the project."""
+        return self.state in (REMOVED, SKIPPED)
+
+
+class Journal:
+    """Append-only log of per-project progress through an archive run.
+
+    Every state change is appended as one JSON line and flushed to disk
+    before the run moves on, so after an interruption the last line per
+    project says exactly how far it got. A torn final line from a crash is
+    ignored when the journal is read back.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the Journal stored at PATH."""
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+
+    def entries(self) -> Dict[str, JournalEntry]:
+        """Latest entry per project, keyed by absolute project path."""
+        entries: Dict[str, JournalEntry] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = JournalEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        continue
+                    entries[entry.project] = entry
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def record(
+        self, project: Path, state: str, archive: Optional[Path] = None
+    ) -> JournalEntry:
+        """Durably append a project's new state."""
+        entry = JournalEntry(
+            project=os.path.abspath(project),
+            state=state,
+            time=time.time(),
+            archive=os.fspath(archive) if archive is not None else None,
+        )
+        line = json.dumps(asdict(entry), separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return entry
+
+    def reset(self) -> None:
+        """Forget every recorded state, and the journal directory once empty."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+        try:
+            self.path.parent.rmdir()
+        except OSError:
+            # Journals of runs over other directories are still in it
+            pass
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "Journal":
+        """Use the journal as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the journal when leaving the context."""
+        self.close()
+
+
+def journal_path(archive_dir: Path, parent: Path) -> Path:
+    """Location of the journal for archive runs over PARENT."""
+    source = os.path.abspath(parent)
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    return archive_dir / "journal" / f"{Path(source).name}-{digest}{JOURNAL_SUFFIX}"
@@ -0,0 +1,209 @@
+"""
+Manifest sidecars describing the contents of an archive.
+
+A manifest is a JSON-lines file written next to its archive. The first line
+is a summary with the totals, so archive metadata can be answered by reading
+a single line; every following line is one archive member stored as a row
+whose columns are named by the summary's ``fields``.
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest"
+ENTRY_FIELDS = [
+    "name",
+    "type",
+    "size",
+    "mode",
+    "mtime",
+    "sha256",
+    "offset",
+    "linkname",
+    "chunks",
+    "archive",
+]
+
+
+@dataclass
+class ManifestEntry:
+    """A single archive member."""
+
+    name: str
+    type: str
+    size: int
+    mode: int
+    mtime: int
+    sha256: Optional[str] = None
+    # Position of the member's header in the uncompressed tar stream
+    offset: Optional[int] = None
+    # Target of a symbolic or hard link
+    linkname: Optional[str] = None
+    # Content hashes of the file's chunks in a chunk store
+    chunks: Optional[List[str]] = None
+    # Earlier archive holding the member's data, for incremental archives
+    archive: Optional[str] = None
+
+    def to_row(self) -> List[Any]:
+        """Serialize the entry in ``ENTRY_FIELDS`` order."""
+        return [getattr(self, name) for name in ENTRY_FIELDS]
+
+    @classmethod
+    def from_row(cls, fields: List[str], row: List[Any]) -> "ManifestEntry":
+        """Load an entry from a row, ignoring columns this version does not know."""
+        values = dict(zip(fields, row))
+        known: Dict[str, Any] = {name: values.get(name) for name in ENTRY_FIELDS}
+        return cls(**known)
+
+
+@dataclass
+class ManifestSummary:
+    """Totals stored on the first line of a manifest."""
+
+    archive: str
+    source: str
+    codec: str
+    created: float
+    member_count: int
+    file_count: int
+    total_size: int
+    uncompressed_size: int
+    compressed_size: int
+    version: int = MANIFEST_VERSION
+    fields: List[str] = field(default_factory=lambda: list(ENTRY_FIELDS))
+    # Previous archive an incremental archive builds on, and the paths
+    # removed since then
+    base: Optional[str] = None
+    deleted: List[str] = field(default_factory=list)
+    # SHA-256 of the compressed archive, computed while it was written
+    sha256: Optional[str] = None
+    # Bytes of file data held by this archive itself rather than by the
+    # archives it builds on; None in manifests written before it was recorded
+    stored_size: Optional[int] = None
+
+
+def manifest_path(archive_path: Path) -> Path:
+    """Location of the manifest sidecar for an archive.
+
+    ``name_date.tar.xz`` maps to ``name_date.xz.manifest`` so that sidecars
+    never match the ``*.tar.*`` pattern used to find archives.
+    """
+    name = archive_path.name
+    if ".tar." in name:
+        base, codec = name.rsplit(".tar.", 1)
+        name = f"{base}.{codec}"
+    return archive_path.with_name(name + MANIFEST_SUFFIX)
+
+
+class ManifestWriter:
+    """Streams manifest entries to disk while an archive is being written.
+
+    Entries go to a temporary body file as they arrive, so memory use does
+    not grow with the number of members. ``commit`` prepends the summary
+    and atomically moves the finished manifest into place.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the writer for the manifest at PATH."""
+        self.path = Path(path)
+        self.member_count = 0
+        self.file_count = 0
+        self.total_size = 0
+        self.stored_size = 0
+        self._body_path = self.path.with_name(self.path.name + ".body.tmp")
+        self._body = open(self._body_path, "w", encoding="utf-8")
+
+    def add(self, entry: ManifestEntry) -> None:
+        """Record one archive member."""
+        self._body.write(json.dumps(entry.to_row(), separators=(",", ":")) + "\n")
+        self.member_count += 1
+        if entry.type == "file":
+            self.file_count += 1
+            self.total_size += entry.size
+            if entry.archive is None:
+                self.stored_size += entry.size
+
+    def commit(
+        self,
+        archive_path: Path,
+        source: Path,
+        codec: str,
+        uncompressed_size: int,
+        compressed_size: Optional[int] = None,
+        base: Optional[str] = None,
+        deleted: Optional[List[str]] = None,
+        sha256: Optional[str] = None,
+        stored_size: Optional[int] = None,
+    ) -> ManifestSummary:
+        """Write the summary and move the finished manifest into place.
+
+        ``compressed_size`` defaults to the size of the archive on disk, and
+        ``stored_size`` to the size of the files not held by a base archive.
+        """
+        self._body.close()
+        summary = ManifestSummary(
+            archive=archive_path.name,
+            source=os.path.abspath(source),
+            codec=codec,
+            created=time.time(),
+            member_count=self.member_count,
+            file_count=self.file_count,
+            total_size=self.total_size,
+            uncompressed_size=uncompressed_size,
+            compressed_size=(
+                archive_path.stat().st_size
+                if compressed_size is None
+                else compressed_size
+            ),
+            base=base,
+            deleted=deleted or [],
+            sha256=sha256,
+            stored_size=self.stored_size if stored_size is None else stored_size,
+        )
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as out, open(
+                self._body_path, encoding="utf-8"
+            ) as body:
+                out.write(json.dumps(asdict(summary), separators=(",", ":")) + "\n")
+                for line in body:
+                    out.write(line)
+            os.replace(tmp_path, self.path)
+        finally:
+            for path in (tmp_path, self._body_path):
+                if path.exists():
+                    path.unlink()
+        return summary
+
+    def abort(self) -> None:
+        """Discard everything written so far."""
+        self._body.close()
+        if self._body_path.exists():
+            self._body_path.unlink()
+
+
+def read_summary(path: Path) -> Optional[ManifestSummary]:
+    """Read the summary line of a manifest, or None if it is missing or invalid."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            header: Dict[str, Any] = json.loads(f.readline())
+        if header.get("version", 0) > MANIFEST_VERSION:
+            return None
+        return ManifestSummary(**header)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def iter_entries(path: Path) -> Iterator[ManifestEntry]:
+    """Iterate over the members recorded in a manifest."""
+    with open(path, encoding="utf-8") as f:
+        fields = json.loads(f.readline()).get("fields", ENTRY_FIELDS)
+        for line in f:
+            if line.strip():
+                yield ManifestEntry.from_row(fields, json.loads(line))
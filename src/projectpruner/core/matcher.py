@@ -0,0 +1,112 @@
+"""
+Compiled glob matcher for clean and exclude patterns.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from projectpruner.utils import fsops
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a glob pattern into a regular expression body.
+
+    ``*`` and ``?`` never cross a ``/``, while a ``**`` component matches any
+    number of directories, including none.
+    """
+    parts = pattern.strip("/").split("/")
+    regex = ""
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == "**":
+            regex += ".*" if last else "(?:.*/)?"
+            continue
+        regex += _translate_component(part)
+        if not last:
+            regex += "/"
+    return regex
+
+
+def _translate_component(part: str) -> str:
+    """Translate a single path component of a glob pattern."""
+    regex = ""
+    i = 0
+    while i < len(part):
+        char = part[i]
+        i += 1
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = part.find("]", i + 1 if part[i : i + 1] in ("!", "]") else i)
+            if end == -1:
+                regex += re.escape(char)
+                continue
+            body = part[i:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            regex += f"[{body}]"
+            i = end + 1
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+def _compile(patterns: Iterable[str], anchored: bool) -> Optional[Pattern[str]]:
+    """Compile many glob patterns into one alternation."""
+    bodies = [f"(?:{translate_glob(pattern)})" for pattern in patterns if pattern]
+    if not bodies:
+        return None
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(f"{prefix}(?:{'|'.join(bodies)})\\Z", re.DOTALL)
+
+
+class PatternMatcher:
+    """Evaluates clean and exclude patterns against project-relative paths.
+
+    Clean patterns are anchored at the project root like ``Path.glob``;
+    exclude patterns match from the right like ``Path.match``. All patterns
+    are compiled once into a single regular expression per kind.
+    """
+
+    def __init__(
+        self, patterns: Iterable[str], exclude_patterns: Iterable[str] = ()
+    ) -> None:
+        """Compile the clean and exclude patterns."""
+        self._include = _compile(patterns, anchored=True)
+        self._exclude = _compile(exclude_patterns, anchored=False)
+
+    def matches(self, rel_path: str) -> bool:
+        """Check whether a ``/``-separated relative path should be removed."""
+        if self._include is None or not self._include.match(rel_path):
+            return False
+        return self._exclude is None or not self._exclude.match(rel_path)
+
+
+def walk_matches(root: Path, matcher: PatternMatcher) -> Iterator[os.DirEntry]:
+    """Walk a tree top-down once and yield every entry the matcher selects.
+
+    Matched directories are not descended into, so nothing below an artifact
+    that is already scheduled for removal is visited. Symbolic links are
+    matched by name but never followed.
+    """
+    stack: List[Tuple[str, str]] = [("", os.fspath(root))]
+    while stack:
+        rel, current = stack.pop()
+        try:
+            with fsops.scandir(current) as entries:
+                for entry in entries:
+                    entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+                    if matcher.matches(entry_rel):
+                        yield entry
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry_rel, entry.path))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
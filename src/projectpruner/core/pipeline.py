@@ -0,0 +1,157 @@
+"""
+Staged pipeline running many projects through a sequence of steps at once.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from projectpruner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One step of a pipeline.
+
+    ``func`` receives the value produced by the previous stage (the item
+    itself for the first stage) and returns the value for the next one.
+    Returning None drops the item from the rest of the pipeline.
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of one item's trip through a pipeline."""
+
+    item: Any
+    value: Any = None
+    # Stage that dropped the item or raised for it
+    stage: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item went through every stage."""
+        return self.stage is None
+
+    @property
+    def skipped(self) -> bool:
+        """Whether a stage dropped the item without an error."""
+        return self.stage is not None and self.error is None
+
+
+class Pipeline:
+    """Runs items through stages connected by bounded queues.
+
+    Every stage has its own pool of worker threads, so different items
+    occupy different stages at the same time: one project can be scanned
+    while another is compressed and a third removed. The queues between
+    stages hold at most ``queue_size`` items, which keeps a fast stage from
+    running far ahead of a slow one. An exception only fails the item it
+    was raised for; the other items keep flowing.
+    """
+
+    def __init__(self, stages: Sequence[Stage], queue_size: int = 1):
+        """Initialize the Pipeline with its stages and the queue bound."""
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+
+    def run(
+        self,
+        items: Iterable[Any],
+        on_result: Optional[Callable[[PipelineResult], None]] = None,
+    ) -> List[PipelineResult]:
+        """Run ITEMS through every stage and return the results in input order.
+
+        ``on_result`` is called from the calling thread as soon as an item
+        leaves the pipeline.
+        """
+        inboxes: List["queue.Queue[Any]"] = [
+            queue.Queue(maxsize=self.queue_size) for _ in self.stages
+        ]
+        results: "queue.Queue[Any]" = queue.Queue()
+        remaining = [max(1, stage.workers) for stage in self.stages]
+        lock = threading.Lock()
+
+        def finish(index: int) -> None:
+            # The last worker of a stage closes the next stage's input
+            with lock:
+                remaining[index] -= 1
+                if remaining[index]:
+                    return
+            if index + 1 < len(self.stages):
+                for _ in range(remaining[index + 1]):
+                    inboxes[index + 1].put(_DONE)
+            else:
+                results.put(_DONE)
+
+        def work(index: int) -> None:
+            stage = self.stages[index]
+            while True:
+                entry = inboxes[index].get()
+                if entry is _DONE:
+                    break
+                position, item, value = entry
+                try:
+                    value = stage.func(value)
+                except Exception as e:
+                    logger.error(f"{stage.name} failed for {item}: {str(e)}")
+                    results.put(
+                        (position, PipelineResult(item, stage=stage.name, error=str(e)))
+                    )
+                    continue
+                if value is None:
+                    results.put((position, PipelineResult(item, stage=stage.name)))
+                elif index + 1 < len(self.stages):
+                    inboxes[index + 1].put((position, item, value))
+                else:
+                    results.put((position, PipelineResult(item, value)))
+            finish(index)
+
+        def feed() -> None:
+            try:
+                for position, item in enumerate(items):
+                    inboxes[0].put((position, item, item))
+            finally:
+                for _ in range(remaining[0]):
+                    inboxes[0].put(_DONE)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(
+                    target=work,
+                    args=(index,),
+                    name=f"pipeline-{stage.name}",
+                    daemon=True,
+                )
+                for _ in range(remaining[index])
+            )
+        for thread in threads:
+            thread.start()
+
+        collected: Dict[int, PipelineResult] = {}
+        while True:
+            entry: Tuple[int, PipelineResult] = results.get()
+            if entry is _DONE:
+                break
+            position, result = entry
+            collected[position] = result
+            if on_result is not None:
+                on_result(result)
+
+        for thread in threads:
+            thread.join()
+        return [collected[position] for position in sorted(collected)]
@@ -0,0 +1,428 @@
+"""
+Parallel deletion engine for removing large directory trees.
+"""
+
+import errno
+import os
+import shutil
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from projectpruner.models.plan import SourceListing
+from projectpruner.utils import fsops
+from projectpruner.utils.filesystem import default_jobs
+
+# dir-fd-relative unlink and fd-based scandir are POSIX-only
+FD_SUPPORTED = (
+    os.unlink in os.supports_dir_fd
+    and os.scandir in os.supports_fd
+    and hasattr(os, "O_DIRECTORY")
+)
+
+_DIRECTORY_FLAGS = (
+    os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_NOFOLLOW", 0)
+)
+
+# Top levels are cleared one at a time until there are this many
+# subdirectories, which are then removed by the workers in parallel
+SPLIT_SUBTREES = 64
+
+ProgressCallback = Callable[["RemovalResult"], None]
+
+# A subdirectory to remove: its parent's descriptor, its name, its path and
+# whether only the entries listed for it may be deleted
+_Subdirectory = Tuple[int, str, str, bool]
+
+# Listed entries per directory path, for removing a walked project
+_ListedTree = Dict[str, "_ListedDirectory"]
+
+# What clearing a directory left to do: subdirectories, files removed, errors
+_Cleared = Tuple[List[_Subdirectory], int, List[Tuple[Path, str]]]
+
+
+@dataclass
+class RemovalResult:
+    """Outcome of removing a single tree."""
+
+    path: Path
+    files_removed: int = 0
+    dirs_removed: int = 0
+    errors: List[Tuple[Path, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the whole tree was removed without errors."""
+        return not self.errors
+
+
+class Remover:
+    """Removes directory trees with a bounded pool of worker threads.
+
+    Each directory is opened relative to its parent's descriptor and its
+    files are unlinked relative to its own, so the walk never leaves the
+    tree. The top levels are cleared level by level in parallel, then the
+    subtrees below them are removed by the workers. Failures are collected
+    per path instead of aborting the whole removal.
+    """
+
+    def __init__(self, jobs: Optional[int] = None):
+        """Initialize the Remover with a worker count (default: automatic)."""
+        self.jobs = jobs
+        self._shared = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> "Remover":
+        """Keep one worker pool alive across several removals."""
+        self._shared = True
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Shut down the shared worker pool."""
+        self._shared = False
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def remove(
+        self, path: Path, on_progress: Optional[ProgressCallback] = None
+    ) -> RemovalResult:
+        """Remove a file, symlink or directory tree."""
+        result = RemovalResult(path=Path(path))
+        try:
+            if not os.path.isdir(path) or os.path.islink(path):
+                fsops.unlink(os.fspath(path))
+                result.files_removed += 1
+                return result
+        except OSError as e:
+            result.errors.append((Path(path), e.strerror or str(e)))
+            return result
+
+        if not FD_SUPPORTED:
+            self._remove_fallback(result)
+        elif self._shared:
+            if self._executor is None:
+                self._executor = self._create_executor(path)
+            self._remove_tree(self._executor, result, on_progress)
+        else:
+            with self._create_executor(path) as executor:
+                self._remove_tree(executor, result, on_progress)
+
+        if on_progress is not None:
+            on_progress(result)
+        return result
+
+    def remove_listed(self, listing: SourceListing) -> RemovalResult:
+        """Remove a project whose contents were already listed by a walk.
+
+        The project is walked like any other tree, but only listed entries
+        are deleted: listed files are unlinked, listed directories are
+        entered and removed once emptied, and artifact trees are removed
+        whole. Nothing that is not in the listing is deleted, so a directory
+        that gained entries after the walk is left in place and reported.
+        """
+        result = RemovalResult(path=listing.root)
+        if not FD_SUPPORTED:
+            self._remove_listed_fallback(listing, result)
+            return result
+
+        tree = _listed_tree(listing)
+        if self._shared:
+            if self._executor is None:
+                self._executor = self._create_executor(listing.root)
+            self._remove_tree(self._executor, result, None, tree)
+        else:
+            with self._create_executor(listing.root) as executor:
+                self._remove_tree(executor, result, None, tree)
+        return result
+
+    def _create_executor(self, path: Path) -> ThreadPoolExecutor:
+        """Create the worker pool used for a removal."""
+        jobs = self.jobs if self.jobs is not None else default_jobs(path)
+        return ThreadPoolExecutor(max_workers=max(1, jobs))
+
+    def _remove_tree(
+        self,
+        executor: ThreadPoolExecutor,
+        result: RemovalResult,
+        on_progress: Optional[ProgressCallback],
+        tree: Optional[_ListedTree] = None,
+    ) -> None:
+        """Clear the top levels in parallel, then remove subtrees in parallel.
+
+        Levels are cleared one at a time until there are ``SPLIT_SUBTREES``
+        subdirectories left, which workers then remove depth first. Every
+        directory is opened relative to its parent's descriptor, so a path
+        component swapped for a symlink mid-walk is never followed. With a
+        ``tree``, only the entries it lists are removed.
+        """
+        root = os.fspath(result.path)
+        try:
+            root_fd = fsops.open_fd(root, _DIRECTORY_FLAGS)
+        except OSError as e:
+            result.errors.append((result.path, e.strerror or str(e)))
+            return
+
+        def clear(directory: Tuple[int, str, bool]) -> _Cleared:
+            return _clear_directory(directory, tree)
+
+        def remove(subtree: _Subdirectory) -> Tuple[int, int, List[Tuple[Path, str]]]:
+            return _remove_subtree(subtree, tree)
+
+        # Directories held open while their subtrees are removed, top first
+        opened: List[Tuple[Optional[int], str, str, int]] = [
+            (None, root, root, root_fd)
+        ]
+        try:
+            level: List[Tuple[int, str, bool]] = [(root_fd, root, tree is not None)]
+            subtrees: List[_Subdirectory] = []
+            while level:
+                subtrees = []
+                for subdirs, removed, errors in executor.map(clear, level):
+                    subtrees.extend(subdirs)
+                    result.files_removed += removed
+                    result.errors.extend(errors)
+                if on_progress is not None:
+                    on_progress(result)
+                if len(subtrees) >= SPLIT_SUBTREES:
+                    break
+                level = []
+                for parent_fd, name, path, listed in subtrees:
+                    try:
+                        fd = _open_directory(parent_fd, name)
+                    except OSError as e:
+                        result.errors.append((Path(path), e.strerror or str(e)))
+                        continue
+                    opened.append((parent_fd, name, path, fd))
+                    level.append((fd, path, listed))
+                subtrees = []
+
+            for files, dirs, errors in executor.map(remove, subtrees):
+                result.files_removed += files
+                result.dirs_removed += dirs
+                result.errors.extend(errors)
+                if on_progress is not None:
+                    on_progress(result)
+        finally:
+            for dir_fd, name, path, fd in reversed(opened):
+                os.close(fd)
+                try:
+                    fsops.rmdir(name, dir_fd=dir_fd)
+                    result.dirs_removed += 1
+                except OSError as e:
+                    result.errors.append((Path(path), e.strerror or str(e)))
+
+    def _remove_listed_fallback(
+        self, listing: SourceListing, result: RemovalResult
+    ) -> None:
+        """Remove listed paths by name on platforms without fd-relative calls."""
+        for artifact in listing.artifacts:
+            removed = self.remove(Path(artifact))
+            result.files_removed += removed.files_removed
+            result.dirs_removed += removed.dirs_removed
+            result.errors.extend(removed.errors)
+        for file in listing.files:
+            error = _unlink(file)
+            if error is None:
+                result.files_removed += 1
+            else:
+                result.errors.append(error)
+        for directory in reversed(listing.directories):
+            error = _remove_directory(directory)
+            if error is None:
+                result.dirs_removed += 1
+            else:
+                result.errors.append(error)
+
+    def _remove_fallback(self, result: RemovalResult) -> None:
+        """Remove a tree with shutil on platforms without fd-relative calls."""
+
+        def onexc(function: Any, path: str, error: BaseException) -> None:
+            result.errors.append((Path(path), str(error)))
+
+        if sys.version_info >= (3, 12):
+            shutil.rmtree(result.path, onexc=onexc)
+        else:
+            shutil.rmtree(
+                result.path,
+                onerror=lambda function, path, exc_info: onexc(
+                    function, path, exc_info[1]
+                ),
+            )
+
+
+@dataclass
+class _ListedDirectory:
+    """The entries of one directory that a listing allows to be removed."""
+
+    files: List[str] = field(default_factory=list)
+    directories: List[str] = field(default_factory=list)
+    artifacts: List[str] = field(default_factory=list)
+
+
+def _listed_tree(listing: SourceListing) -> _ListedTree:
+    """Group a listing's paths by the directory that holds them."""
+    tree: _ListedTree = {
+        directory: _ListedDirectory() for directory in listing.directories
+    }
+    root = os.fspath(listing.root)
+    tree.setdefault(root, _ListedDirectory())
+    for directory in listing.directories:
+        if directory != root:
+            parent, name = os.path.split(directory)
+            tree.setdefault(parent, _ListedDirectory()).directories.append(name)
+    for file in listing.files:
+        parent, name = os.path.split(file)
+        tree.setdefault(parent, _ListedDirectory()).files.append(name)
+    for artifact in listing.artifacts:
+        parent, name = os.path.split(artifact)
+        tree.setdefault(parent, _ListedDirectory()).artifacts.append(name)
+    return tree
+
+
+def _open_directory(parent_fd: int, name: str) -> int:
+    """Open a subdirectory relative to its parent's descriptor.
+
+    A directory replaced by a symlink fails to open, and one replaced by
+    another directory is caught by comparing device and inode numbers.
+    """
+    expected = fsops.lstat(name, dir_fd=parent_fd)
+    fd = fsops.open_fd(name, _DIRECTORY_FLAGS, dir_fd=parent_fd)
+    try:
+        if not os.path.samestat(expected, fsops.fstat(fd)):
+            raise OSError(errno.ENOTDIR, "Directory changed during removal")
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _clear_directory(
+    directory: Tuple[int, str, bool], tree: Optional[_ListedTree] = None
+) -> _Cleared:
+    """Unlink the non-directory entries of an open directory.
+
+    A listed directory only loses the files its ``tree`` entry names; its
+    listed subdirectories are returned to be walked, and its artifacts are
+    unlinked or returned to be removed whole.
+    """
+    fd, path, listed = directory
+    subdirs: List[_Subdirectory] = []
+    errors: List[Tuple[Path, str]] = []
+    removed = 0
+    if listed and tree is not None:
+        entry = tree.get(path, _ListedDirectory())
+        for name in entry.files:
+            try:
+                fsops.unlink(name, dir_fd=fd)
+                removed += 1
+            except OSError as e:
+                errors.append((Path(path) / name, e.strerror or str(e)))
+        for name in entry.directories:
+            subdirs.append((fd, name, os.path.join(path, name), True))
+        for name in entry.artifacts:
+            try:
+                if stat.S_ISDIR(fsops.lstat(name, dir_fd=fd).st_mode):
+                    subdirs.append((fd, name, os.path.join(path, name), False))
+                    continue
+                fsops.unlink(name, dir_fd=fd)
+                removed += 1
+            except OSError as e:
+                errors.append((Path(path) / name, e.strerror or str(e)))
+        return subdirs, removed, errors
+
+    try:
+        with fsops.scandir(fd) as entries:
+            listing = list(entries)
+        for dir_entry in listing:
+            try:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    subdirs.append(
+                        (fd, dir_entry.name, os.path.join(path, dir_entry.name), False)
+                    )
+                    continue
+                fsops.unlink(dir_entry.name, dir_fd=fd)
+                removed += 1
+            except OSError as e:
+                errors.append((Path(path) / dir_entry.name, e.strerror or str(e)))
+    except OSError as e:
+        errors.append((Path(path), e.strerror or str(e)))
+    return subdirs, removed, errors
+
+
+def _remove_subtree(
+    subtree: _Subdirectory, tree: Optional[_ListedTree] = None
+) -> Tuple[int, int, List[Tuple[Path, str]]]:
+    """Remove a directory tree depth first, one descriptor per level.
+
+    Returns the files and directories removed and the errors met.
+    """
+    parent_fd, name, path, listed = subtree
+    files = dirs = 0
+    errors: List[Tuple[Path, str]] = []
+    try:
+        fd = _open_directory(parent_fd, name)
+    except OSError as e:
+        return files, dirs, [(Path(path), e.strerror or str(e))]
+
+    # Each frame: parent descriptor, name, path, descriptor, subdirs left
+    stack: List[Tuple[int, str, str, int, List[_Subdirectory]]] = []
+    subdirs, removed, cleared = _clear_directory((fd, path, listed), tree)
+    files += removed
+    errors.extend(cleared)
+    stack.append((parent_fd, name, path, fd, subdirs))
+    while stack:
+        parent_fd, name, path, fd, subdirs = stack[-1]
+        if subdirs:
+            child_parent, child, child_path, child_listed = subdirs.pop()
+            try:
+                child_fd = _open_directory(child_parent, child)
+            except OSError as e:
+                errors.append((Path(child_path), e.strerror or str(e)))
+                continue
+            child_subdirs, removed, cleared = _clear_directory(
+                (child_fd, child_path, child_listed), tree
+            )
+            files += removed
+            errors.extend(cleared)
+            stack.append((child_parent, child, child_path, child_fd, child_subdirs))
+            continue
+
+        stack.pop()
+        os.close(fd)
+        try:
+            fsops.rmdir(name, dir_fd=parent_fd)
+            dirs += 1
+        except OSError as e:
+            errors.append((Path(path), e.strerror or str(e)))
+    return files, dirs, errors
+
+
+def _unlink(path: str) -> Optional[Tuple[Path, str]]:
+    """Unlink a file, returning the error if it fails."""
+    try:
+        fsops.unlink(path)
+        return None
+    except OSError as e:
+        return Path(path), e.strerror or str(e)
+
+
+def _remove_directory(path: str) -> Optional[Tuple[Path, str]]:
+    """Remove an emptied directory, returning the error if it fails."""
+    try:
+        fsops.rmdir(path)
+        return None
+    except OSError as e:
+        return Path(path), e.strerror or str(e)
+
+
+def remove_tree(
+    path: Path,
+    jobs: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> RemovalResult:
+    """Remove a single file or directory tree with a temporary worker pool."""
+    return Remover(jobs=jobs).remove(path, on_progress=on_progress)
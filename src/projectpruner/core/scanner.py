@@ -0,0 +1,187 @@
+"""
+Scan engine for collecting directory statistics in a single traversal.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from projectpruner.utils import fsops
+
+if TYPE_CHECKING:
+    from projectpruner.core.index import ScanIndex
+
+# Directories modified this close to the scan may still be changing within
+# the same mtime tick, so their signature is not trusted on the next run.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass
+class ScanResult:
+    """Aggregated statistics for a directory tree."""
+
+    path: Path
+    size: int = 0
+    newest_mtime: Optional[float] = None
+    file_count: int = 0
+    dir_count: int = 0
+    complete: bool = True
+
+    def add_file(self, size: int, mtime: float) -> None:
+        """Account for a single regular file."""
+        self.size += size
+        self.file_count += 1
+        if self.newest_mtime is None or mtime > self.newest_mtime:
+            self.newest_mtime = mtime
+
+    def reached(self, newer_than: Optional[float]) -> bool:
+        """Check whether a file modified at or after NEWER_THAN was seen."""
+        return (
+            newer_than is not None
+            and self.newest_mtime is not None
+            and self.newest_mtime >= newer_than
+        )
+
+
+@dataclass
+class DirectoryRecord:
+    """Signature and direct-file totals of a single directory."""
+
+    mtime_ns: int
+    inode: int
+    size: int = 0
+    newest_mtime: Optional[float] = None
+    file_count: int = 0
+    subdirs: List[str] = field(default_factory=list)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Check whether the directory is unchanged since it was recorded."""
+        return self.mtime_ns == stat.st_mtime_ns and self.inode == stat.st_ino
+
+
+def scan_directory(
+    path: Path,
+    index: Optional["ScanIndex"] = None,
+    stop_newer_than: Optional[float] = None,
+) -> ScanResult:
+    """Walk a directory tree once and collect size, mtime and entry counts.
+
+    The walk uses ``os.scandir`` so the file type comes from the cached
+    ``DirEntry`` data and each regular file costs a single ``lstat``.
+    Symbolic links are neither followed nor counted, and unreadable
+    subdirectories are skipped.
+
+    With an ``index``, directories whose mtime and inode match the stored
+    signature reuse their recorded totals and are not listed again, so an
+    unchanged tree costs one ``lstat`` per directory.
+
+    The walk stops early once a file modified at or after ``stop_newer_than``
+    (a timestamp) is seen. The result then only covers the part of the tree
+    walked so far and has ``complete`` set to False; it is not stored in the
+    index.
+    """
+    if index is not None:
+        return _scan_with_index(path, index, stop_newer_than)
+
+    result = ScanResult(path=path)
+    stack: List[str] = [os.fspath(path)]
+
+    while stack:
+        current = stack.pop()
+        try:
+            with fsops.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            result.dir_count += 1
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = fsops.entry_stat(entry)
+                            result.add_file(stat.st_size, stat.st_mtime)
+                            if result.reached(stop_newer_than):
+                                result.complete = False
+                                return result
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+    return result
+
+
+def _scan_with_index(
+    path: Path,
+    index: "ScanIndex",
+    stop_newer_than: Optional[float] = None,
+) -> ScanResult:
+    """Scan a tree, re-listing only directories whose signature changed."""
+    root = os.path.abspath(path)
+    previous = index.load(root)
+    records: Dict[str, DirectoryRecord] = {}
+    result = ScanResult(path=path)
+    racy_after = time.time_ns() - RACY_WINDOW_NS
+    stack: List[Tuple[str, str]] = [("", root)]
+
+    while stack:
+        rel, current = stack.pop()
+        try:
+            stat = fsops.lstat(current)
+        except OSError:
+            continue
+
+        record = previous.get(rel)
+        if record is None or not record.matches(stat):
+            fresh = _list_directory(current, stat)
+            if fresh is None:
+                continue
+            record = fresh
+            if stat.st_mtime_ns >= racy_after:
+                record.mtime_ns = -1
+
+        records[rel] = record
+        result.size += record.size
+        result.file_count += record.file_count
+        result.dir_count += len(record.subdirs)
+        if record.newest_mtime is not None and (
+            result.newest_mtime is None or record.newest_mtime > result.newest_mtime
+        ):
+            result.newest_mtime = record.newest_mtime
+        if result.reached(stop_newer_than):
+            # Partial totals must not replace the stored ones
+            result.complete = False
+            return result
+
+        for name in record.subdirs:
+            stack.append(
+                (f"{rel}/{name}" if rel else name, os.path.join(current, name))
+            )
+
+    index.store(root, result, records)
+    return result
+
+
+def _list_directory(path: str, stat: os.stat_result) -> Optional[DirectoryRecord]:
+    """List one directory and total its direct files."""
+    record = DirectoryRecord(mtime_ns=stat.st_mtime_ns, inode=stat.st_ino)
+    try:
+        with fsops.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        record.subdirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        file_stat = fsops.entry_stat(entry)
+                        record.size += file_stat.st_size
+                        record.file_count += 1
+                        if (
+                            record.newest_mtime is None
+                            or file_stat.st_mtime > record.newest_mtime
+                        ):
+                            record.newest_mtime = file_stat.st_mtime
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return record
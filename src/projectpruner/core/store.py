@@ -0,0 +1,500 @@
+"""
+Content-addressed chunk store for deduplicating archives across projects.
+"""
+
+import hashlib
+import os
+import sqlite3
+import stat
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    IO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from projectpruner.core.extractor import _target_path
+from projectpruner.core.manifest import (
+    ManifestEntry,
+    ManifestSummary,
+    ManifestWriter,
+    iter_entries,
+    read_summary,
+)
+from projectpruner.core.matcher import PatternMatcher
+from projectpruner.models.plan import SourceListing
+from projectpruner.utils import fsops
+from projectpruner.utils.filesystem import exclusive_lock
+from projectpruner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_SUFFIX = ".snapshot"
+STORE_CODEC = "store"
+CHUNK_SIZE = 1 << 20
+PACK_SIZE = 64 << 20
+LOCK_NAME = "lock"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    pack INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_pack ON chunks (pack);
+"""
+
+
+@dataclass
+class StoreResult:
+    """Outcome of adding a project to the store."""
+
+    snapshot: Path
+    files: int = 0
+    bytes: int = 0
+    chunks: int = 0
+    new_chunks: int = 0
+    bytes_stored: int = 0
+    bytes_written: int = 0
+
+
+@dataclass
+class GCResult:
+    """Outcome of a garbage collection run."""
+
+    chunks_removed: int = 0
+    packs_removed: int = 0
+    packs_rewritten: int = 0
+    bytes_reclaimed: int = 0
+
+
+class ChunkStore:
+    """Stores file contents once, as compressed chunks addressed by SHA-256.
+
+    Files are cut into fixed-size chunks. Each chunk not already in the
+    store is deflated and appended to a pack file, and a SQLite index maps
+    its hash to its location. A project is recorded as a snapshot: a
+    manifest whose file entries list chunk hashes instead of data.
+
+    New chunks only become visible once their pack is synced to disk, and
+    a snapshot is written only after its chunks are indexed, so a crash
+    can leave unreferenced pack bytes behind but never a snapshot pointing
+    at missing data. ``gc`` reclaims both deleted snapshots' chunks and such
+    leftovers.
+
+    Writers and ``gc`` hold an exclusive lock on the store, so a collection
+    never drops chunks that a snapshot being written has just reused.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        level: int = 6,
+        chunk_size: int = CHUNK_SIZE,
+        pack_size: int = PACK_SIZE,
+    ):
+        """Open (and create if needed) the store at ROOT."""
+        self.root = Path(root)
+        self.level = level
+        self.chunk_size = chunk_size
+        self.pack_size = pack_size
+        self.packs_dir = self.root / "packs"
+        self.packs_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite"))
+        self._conn.executescript(SCHEMA)
+        self._readers: Dict[int, IO[bytes]] = {}
+        self._locked = False
+
+    @contextmanager
+    def locked(self, blocking: bool = True) -> Iterator[None]:
+        """Hold the store's exclusive lock, waiting for it unless not BLOCKING.
+
+        Raises RuntimeError when not blocking and another writer holds it.
+        Nested calls on the same store reuse the lock already held.
+        """
+        if self._locked:
+            yield
+            return
+        with exclusive_lock(self.root / LOCK_NAME, blocking) as acquired:
+            if not acquired:
+                raise RuntimeError(
+                    f"Chunk store is in use by another process: {self.root}"
+                )
+            self._locked = True
+            try:
+                yield
+            finally:
+                self._locked = False
+
+    def add(
+        self,
+        project_path: Path,
+        snapshot_path: Path,
+        exclude: Optional[PatternMatcher] = None,
+        listing: Optional[SourceListing] = None,
+    ) -> StoreResult:
+        """Store a project's contents and write its snapshot.
+
+        Paths matching ``exclude`` are skipped; ``listing`` collects the
+        paths walked, as for tar archives.
+        """
+        with self.locked():
+            result = StoreResult(snapshot=snapshot_path)
+            writer = ManifestWriter(snapshot_path)
+            packer = _PackWriter(self.packs_dir, self._next_pack(), self.pack_size)
+            pending: Dict[str, Tuple[int, int, int, int]] = {}
+            try:
+                for path, name, st in _walk(
+                    project_path, project_path.name, exclude, listing
+                ):
+                    entry = ManifestEntry(
+                        name=name,
+                        type="other",
+                        size=0,
+                        mode=stat.S_IMODE(st.st_mode),
+                        mtime=int(st.st_mtime),
+                    )
+                    if stat.S_ISDIR(st.st_mode):
+                        entry.type = "dir"
+                    elif stat.S_ISLNK(st.st_mode):
+                        entry.type = "symlink"
+                        entry.linkname = os.readlink(path)
+                    elif stat.S_ISREG(st.st_mode):
+                        entry.type = "file"
+                        self._add_file(path, entry, packer, pending, result)
+                    else:
+                        logger.debug(f"Skipping unsupported file type: {path}")
+                        continue
+                    writer.add(entry)
+
+                packer.close()
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO chunks VALUES (?, ?, ?, ?, ?)",
+                        ((digest, *location) for digest, location in pending.items()),
+                    )
+                writer.commit(
+                    snapshot_path,
+                    project_path,
+                    STORE_CODEC,
+                    result.bytes,
+                    compressed_size=result.bytes_written,
+                    stored_size=result.bytes_stored,
+                )
+            except BaseException:
+                writer.abort()
+                packer.close()
+                raise
+            return result
+
+    def restore(
+        self,
+        snapshot_path: Path,
+        destination: Path,
+        select: Optional[Callable[[str], bool]] = None,
+    ) -> List[str]:
+        """Rebuild a snapshot's tree below DESTINATION.
+
+        Only entries accepted by ``select`` are restored when it is given.
+        Every file is checked against its recorded SHA-256. Returns the
+        names of the restored entries.
+        """
+        root = os.fspath(destination)
+        os.makedirs(root, exist_ok=True)
+        directories: List[Tuple[str, ManifestEntry]] = []
+        symlinks: Set[str] = set()
+        names = []
+
+        for entry in iter_entries(snapshot_path):
+            if select is not None and not select(entry.name):
+                continue
+            names.append(entry.name)
+            target = _target_path(root, entry.name, symlinks)
+            if entry.type == "dir":
+                os.makedirs(target, 0o700, exist_ok=True)
+                directories.append((target, entry))
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if entry.type == "symlink":
+                os.symlink(entry.linkname or "", target)
+                symlinks.add(target)
+            elif entry.type == "file":
+                self._restore_file(target, entry)
+
+        for target, entry in reversed(directories):
+            os.chmod(target, entry.mode)
+            os.utime(target, (entry.mtime, entry.mtime))
+        return names
+
+    def verify(self, snapshot_path: Path, full: bool = False) -> List[str]:
+        """Check that every chunk a snapshot refers to is in the store.
+
+        With ``full``, every file is also reassembled and checked against
+        its recorded SHA-256. Returns a description of each problem found.
+        """
+        errors = []
+        for entry in iter_entries(snapshot_path):
+            if entry.type != "file":
+                continue
+            file_hash = hashlib.sha256()
+            try:
+                for digest in entry.chunks or []:
+                    if not full:
+                        if self._location(digest) is None:
+                            raise RuntimeError(f"Chunk missing from store: {digest}")
+                        continue
+                    file_hash.update(self._read_chunk(digest))
+            except (OSError, RuntimeError, zlib.error) as e:
+                errors.append(f"{entry.name}: {str(e)}")
+                continue
+            if full and entry.sha256 not in (None, file_hash.hexdigest()):
+                errors.append(f"{entry.name}: checksum mismatch")
+        return errors
+
+    def gc(self, referenced: Iterable[str], dry_run: bool = False) -> GCResult:
+        """Drop every chunk not in REFERENCED and compact the packs holding them.
+
+        Refuses to run while another process is writing to the store.
+        """
+        with self.locked(blocking=False):
+            return self._gc(set(referenced), dry_run)
+
+    def _gc(self, live: Set[str], dry_run: bool) -> GCResult:
+        """Collect garbage while holding the store lock."""
+        result = GCResult()
+        rows = self._conn.execute(
+            "SELECT hash, pack, offset, length FROM chunks ORDER BY pack, offset"
+        ).fetchall()
+
+        by_pack: Dict[int, List[Tuple[str, int, int]]] = {}
+        for digest, pack, offset, length in rows:
+            by_pack.setdefault(pack, []).append((digest, offset, length))
+
+        for pack_path in sorted(self.packs_dir.glob("*.pack")):
+            pack = int(pack_path.stem)
+            chunks = by_pack.get(pack, [])
+            keep = [chunk for chunk in chunks if chunk[0] in live]
+            live_bytes = sum(length for _, _, length in keep)
+            pack_size = pack_path.stat().st_size
+            if live_bytes == pack_size:
+                continue
+
+            result.chunks_removed += len(chunks) - len(keep)
+            result.bytes_reclaimed += pack_size - live_bytes
+            if dry_run:
+                continue
+            if keep:
+                self._rewrite_pack(pack, keep)
+                result.packs_rewritten += 1
+            else:
+                with self._conn:
+                    self._conn.execute("DELETE FROM chunks WHERE pack = ?", (pack,))
+                self._forget_reader(pack)
+                pack_path.unlink()
+                result.packs_removed += 1
+        return result
+
+    def close(self) -> None:
+        """Close open pack files and the index."""
+        for pack in list(self._readers):
+            self._forget_reader(pack)
+        self._conn.close()
+
+    def __enter__(self) -> "ChunkStore":
+        """Use the store as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the store when leaving the context."""
+        self.close()
+
+    def _add_file(
+        self,
+        path: str,
+        entry: ManifestEntry,
+        packer: "_PackWriter",
+        pending: Dict[str, Tuple[int, int, int, int]],
+        result: StoreResult,
+    ) -> None:
+        """Chunk one file into the store and fill in its entry."""
+        file_hash = hashlib.sha256()
+        chunks: List[str] = []
+        fsops.count("open")
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                file_hash.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                chunks.append(digest)
+                entry.size += len(data)
+                if digest in pending or self._location(digest) is not None:
+                    continue
+                compressed = zlib.compress(data, self.level)
+                pack, offset = packer.append(compressed)
+                pending[digest] = (pack, offset, len(compressed), len(data))
+                result.new_chunks += 1
+                result.bytes_stored += len(data)
+                result.bytes_written += len(compressed)
+
+        entry.sha256 = file_hash.hexdigest()
+        entry.chunks = chunks
+        result.files += 1
+        result.bytes += entry.size
+        result.chunks += len(chunks)
+
+    def _restore_file(self, target: str, entry: ManifestEntry) -> None:
+        """Reassemble a file from its chunks and verify its hash."""
+        file_hash = hashlib.sha256()
+        with open(target, "xb") as f:
+            for digest in entry.chunks or []:
+                data = self._read_chunk(digest)
+                file_hash.update(data)
+                f.write(data)
+        if entry.sha256 is not None and file_hash.hexdigest() != entry.sha256:
+            raise RuntimeError(f"Checksum mismatch restoring {entry.name}")
+        os.chmod(target, entry.mode)
+        os.utime(target, (entry.mtime, entry.mtime))
+
+    def _location(self, digest: str) -> Optional[Tuple[int, int, int, int]]:
+        """Pack, offset, stored length and size of a chunk, if it is stored."""
+        row = self._conn.execute(
+            "SELECT pack, offset, length, size FROM chunks WHERE hash = ?", (digest,)
+        ).fetchone()
+        return None if row is None else (row[0], row[1], row[2], row[3])
+
+    def _read_chunk(self, digest: str) -> bytes:
+        """Load and decompress one chunk."""
+        location = self._location(digest)
+        if location is None:
+            raise RuntimeError(f"Chunk missing from store: {digest}")
+        pack, offset, length, _ = location
+        reader = self._readers.get(pack)
+        if reader is None:
+            reader = self._readers[pack] = open(self._pack_path(pack), "rb")
+        reader.seek(offset)
+        return zlib.decompress(reader.read(length))
+
+    def _rewrite_pack(self, pack: int, keep: List[Tuple[str, int, int]]) -> None:
+        """Copy a pack's live chunks into a new pack and drop the old one."""
+        packer = _PackWriter(self.packs_dir, self._next_pack(), self.pack_size)
+        moved = []
+        with open(self._pack_path(pack), "rb") as source:
+            for digest, offset, length in keep:
+                source.seek(offset)
+                new_pack, new_offset = packer.append(source.read(length))
+                moved.append((new_pack, new_offset, digest))
+        packer.close()
+
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE chunks SET pack = ?, offset = ? WHERE hash = ?", moved
+            )
+            # Live chunks have moved, so whatever still points here is dead
+            self._conn.execute("DELETE FROM chunks WHERE pack = ?", (pack,))
+        self._forget_reader(pack)
+        self._pack_path(pack).unlink()
+
+    def _next_pack(self) -> int:
+        """Number for a new pack, above every existing pack."""
+        numbers = [int(path.stem) for path in self.packs_dir.glob("*.pack")]
+        return max(numbers, default=0) + 1
+
+    def _pack_path(self, pack: int) -> Path:
+        """Location of a pack file."""
+        return self.packs_dir / f"{pack:08d}.pack"
+
+    def _forget_reader(self, pack: int) -> None:
+        """Close the cached reader of a pack."""
+        reader = self._readers.pop(pack, None)
+        if reader is not None:
+            reader.close()
+
+
+class _PackWriter:
+    """Appends chunks to new pack files, starting another once one is full."""
+
+    def __init__(self, directory: Path, first_pack: int, pack_size: int):
+        """Initialize the writer; no file is created until a chunk arrives."""
+        self.directory = directory
+        self.pack = first_pack - 1
+        self.pack_size = pack_size
+        self._file: Optional[IO[bytes]] = None
+        self._offset = 0
+
+    def append(self, data: bytes) -> Tuple[int, int]:
+        """Write a chunk, returning its pack number and offset."""
+        if self._file is None or self._offset + len(data) > self.pack_size:
+            self._rotate()
+        assert self._file is not None
+        offset = self._offset
+        self._file.write(data)
+        self._offset += len(data)
+        return self.pack, offset
+
+    def close(self) -> None:
+        """Sync and close the current pack."""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def _rotate(self) -> None:
+        """Finish the current pack and start the next one."""
+        self.close()
+        self.pack += 1
+        self._file = open(self.directory / f"{self.pack:08d}.pack", "xb")
+        self._offset = 0
+
+
+def _walk(
+    root: Path,
+    arcname: str,
+    exclude: Optional[PatternMatcher] = None,
+    listing: Optional[SourceListing] = None,
+) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Walk a tree top-down in sorted order without following symlinks."""
+    prefix = len(arcname) + 1
+    stack: List[Tuple[str, str]] = [(os.fspath(root), arcname)]
+    while stack:
+        path, name = stack.pop()
+        if exclude is not None and name != arcname and exclude.matches(name[prefix:]):
+            if listing is not None:
+                listing.artifacts.append(path)
+            continue
+        st = fsops.lstat(path)
+        if listing is not None:
+            if stat.S_ISDIR(st.st_mode):
+                listing.directories.append(path)
+            else:
+                listing.files.append(path)
+                if stat.S_ISREG(st.st_mode):
+                    listing.bytes += st.st_size
+        yield path, name, st
+        if stat.S_ISDIR(st.st_mode):
+            children = sorted(fsops.listdir(path), reverse=True)
+            stack.extend(
+                (os.path.join(path, child), f"{name}/{child}") for child in children
+            )
+
+
+def read_snapshot(snapshot_path: Path) -> Optional[ManifestSummary]:
+    """Read the summary of a snapshot, or None if it is not one."""
+    summary = read_summary(snapshot_path)
+    if summary is None or summary.codec != STORE_CODEC:
+        return None
+    return summary
@@ -0,0 +1,322 @@
+"""
+Trash staging for instant cleaning with deferred reclaim.
+"""
+
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from projectpruner.core.remover import RemovalResult, Remover
+from projectpruner.utils.filesystem import exclusive_lock
+from projectpruner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PAYLOAD_NAME = "payload"
+META_NAME = "meta.json"
+RECLAIMING_SUFFIX = ".reclaiming"
+RESTORING_SUFFIX = ".restoring"
+LOCK_NAME = ".lock"
+
+# Called with each item reclaimed and the outcome of deleting its payload
+ReclaimCallback = Callable[["TrashItem", RemovalResult], None]
+
+
+@dataclass
+class TrashItem:
+    """A path moved into a trash staging directory."""
+
+    directory: Path
+    original: Path
+    size: int
+    file_count: int
+    trashed_at: float
+
+    @property
+    def payload(self) -> Path:
+        """Location of the trashed file or directory."""
+        return self.directory / PAYLOAD_NAME
+
+    @property
+    def reclaiming(self) -> bool:
+        """Whether a reclaim has already started deleting this item."""
+        return self.directory.name.endswith(RECLAIMING_SUFFIX)
+
+
+class Trash:
+    """Moves paths into per-filesystem staging directories for later reclaim.
+
+    Every trashed path gets its own item directory holding the renamed
+    payload and a ``meta.json`` written before the rename. An item's state
+    lives in its directory name: reclaim and restore first rename the item
+    directory to claim it, so an interrupted reclaim is resumed by the next
+    one and a half-deleted item can never be restored. Reclaims hold a lock
+    on each staging root, so only one of them resumes an interrupted claim.
+    """
+
+    DEFAULT_HOME = Path.home() / ".projectpruner" / "trash"
+    DEFAULT_REGISTRY = Path.home() / ".projectpruner" / "trash_roots"
+
+    def __init__(self, home: Optional[Path] = None, registry: Optional[Path] = None):
+        """Initialize the Trash with its home staging root and registry file."""
+        self.home = Path(home) if home is not None else self.DEFAULT_HOME
+        self.registry = (
+            Path(registry) if registry is not None else self.DEFAULT_REGISTRY
+        )
+        self._roots: Dict[int, Optional[Path]] = {}
+
+    def move(
+        self,
+        path: Path,
+        device: Optional[int] = None,
+        size: int = 0,
+        file_count: int = 0,
+    ) -> Optional[TrashItem]:
+        """Atomically move a path into the trash on its own filesystem.
+
+        Returns None when no staging directory is available on that
+        filesystem; the caller should then delete the path directly.
+        """
+        if device is None:
+            device = os.stat(path, follow_symlinks=False).st_dev
+        root = self._staging_root(Path(path), device)
+        if root is None:
+            return None
+
+        item = TrashItem(
+            directory=root / f"{int(time.time())}-{uuid.uuid4().hex[:12]}",
+            original=Path(os.path.abspath(path)),
+            size=size,
+            file_count=file_count,
+            trashed_at=time.time(),
+        )
+        item.directory.mkdir()
+        try:
+            _write_meta(item)
+            os.rename(path, item.payload)
+        except OSError as e:
+            logger.debug(f"Cannot stage {path} in {root}: {str(e)}")
+            _discard(item.directory)
+            return None
+        return item
+
+    def items(self) -> List[TrashItem]:
+        """List all items in every known staging root, oldest first."""
+        items = []
+        for root in self.roots():
+            try:
+                directories = [entry for entry in root.iterdir() if entry.is_dir()]
+            except OSError:
+                continue
+            for directory in directories:
+                item = _read_meta(directory)
+                if item is not None:
+                    items.append(item)
+        return sorted(items, key=lambda item: item.trashed_at)
+
+    def reclaim(
+        self,
+        jobs: Optional[int] = None,
+        on_reclaimed: Optional[ReclaimCallback] = None,
+    ) -> List[RemovalResult]:
+        """Delete every trashed item, resuming any interrupted reclaim.
+
+        Staging roots another reclaim is working on are skipped.
+        ``on_reclaimed`` is called for every item whose payload was deleted.
+        """
+        results: List[RemovalResult] = []
+        with Remover(jobs=jobs) as remover:
+            for root in self.roots():
+                try:
+                    with exclusive_lock(root / LOCK_NAME, blocking=False) as locked:
+                        if not locked:
+                            logger.info(f"Another reclaim is running in {root}")
+                            continue
+                        results.extend(self._reclaim_root(root, remover, on_reclaimed))
+                except OSError as e:
+                    logger.error(f"Error reclaiming {root}: {str(e)}")
+        return results
+
+    def restore(self, item: TrashItem) -> Path:
+        """Move a trashed item back to its original location."""
+        if item.reclaiming:
+            raise ValueError(f"Item is already being reclaimed: {item.original}")
+        if item.directory.name.endswith(RESTORING_SUFFIX):
+            raise ValueError(f"Item is already being restored: {item.original}")
+        if os.path.lexists(item.original):
+            raise ValueError(f"Original path already exists: {item.original}")
+
+        claimed = self._claim(item.directory, RESTORING_SUFFIX)
+        if claimed is None:
+            raise ValueError(f"Item is no longer in the trash: {item.original}")
+
+        try:
+            item.original.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(claimed / PAYLOAD_NAME, item.original)
+        except OSError:
+            os.rename(claimed, item.directory)
+            raise
+        _discard(claimed)
+        return item.original
+
+    def _reclaim_root(
+        self,
+        root: Path,
+        remover: Remover,
+        on_reclaimed: Optional[ReclaimCallback] = None,
+    ) -> List[RemovalResult]:
+        """Delete the items of one staging root while holding its lock."""
+        results = []
+        for directory in _list_dirs(root):
+            if directory.name.endswith(RESTORING_SUFFIX):
+                # Finish the bookkeeping of a restore that was cut short
+                if not os.path.lexists(directory / PAYLOAD_NAME):
+                    _discard(directory)
+                continue
+            if directory.name.endswith(RECLAIMING_SUFFIX):
+                # Left by an interrupted reclaim; the lock makes it ours
+                claimed: Optional[Path] = directory
+            else:
+                claimed = self._claim(directory, RECLAIMING_SUFFIX)
+            if claimed is None:
+                continue
+            payload = claimed / PAYLOAD_NAME
+            if os.path.lexists(payload):
+                result = remover.remove(payload)
+                results.append(result)
+                item = _read_meta(claimed)
+                if on_reclaimed is not None and item is not None:
+                    on_reclaimed(item, result)
+                if not result.ok:
+                    for path, error in result.errors:
+                        logger.error(f"Error reclaiming {path}: {error}")
+                    continue
+            _discard(claimed)
+        return results
+
+    def roots(self) -> List[Path]:
+        """List the staging roots recorded in the registry."""
+        try:
+            lines = self.registry.read_text().splitlines()
+        except OSError:
+            return []
+        return [Path(line) for line in dict.fromkeys(lines) if line]
+
+    def _staging_root(self, path: Path, device: int) -> Optional[Path]:
+        """Find (and register) a writable staging root on DEVICE."""
+        if device in self._roots:
+            return self._roots[device]
+
+        root = None
+        for candidate in (self.home, _mount_point(path, device) / _trash_name()):
+            try:
+                candidate.mkdir(parents=True, exist_ok=True)
+                if os.stat(candidate).st_dev == device:
+                    root = candidate
+                    break
+            except OSError:
+                continue
+
+        if root is not None:
+            self._register(root)
+        self._roots[device] = root
+        return root
+
+    def _register(self, root: Path) -> None:
+        """Record a staging root so that reclaim can find it later."""
+        if root in self.roots():
+            return
+        self.registry.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.registry, "a") as f:
+            f.write(f"{root}\n")
+
+    def _claim(self, directory: Path, suffix: str) -> Optional[Path]:
+        """Claim an item directory by renaming it, or None if already gone."""
+        if directory.name.endswith((RECLAIMING_SUFFIX, RESTORING_SUFFIX)):
+            return None
+        claimed = directory.with_name(directory.name + suffix)
+        try:
+            os.rename(directory, claimed)
+        except OSError:
+            return None
+        return claimed
+
+
+def _trash_name() -> str:
+    """Name of the staging directory created at a mount point."""
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return f".projectpruner-trash-{uid}"
+
+
+def _mount_point(path: Path, device: int) -> Path:
+    """Walk up from PATH to the topmost directory still on DEVICE."""
+    current = Path(os.path.abspath(path)).parent
+    while current.parent != current:
+        try:
+            if os.stat(current.parent).st_dev != device:
+                break
+        except OSError:
+            break
+        current = current.parent
+    return current
+
+
+def _write_meta(item: TrashItem) -> None:
+    """Durably write an item's metadata before its payload is moved."""
+    meta = {
+        "original": str(item.original),
+        "size": item.size,
+        "file_count": item.file_count,
+        "trashed_at": item.trashed_at,
+    }
+    tmp_path = item.directory / f"{META_NAME}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, item.directory / META_NAME)
+
+
+def _read_meta(directory: Path) -> Optional[TrashItem]:
+    """Load an item from its directory, or None if it is incomplete."""
+    try:
+        with open(directory / META_NAME) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return TrashItem(
+        directory=directory,
+        original=Path(meta["original"]),
+        size=meta.get("size", 0),
+        file_count=meta.get("file_count", 0),
+        trashed_at=meta.get("trashed_at", 0.0),
+    )
+
+
+def _list_dirs(root: Path) -> List[Path]:
+    """List the item directories of a staging root."""
+    try:
+        return sorted(entry for entry in root.iterdir() if entry.is_dir())
+    except OSError:
+        return []
+
+
+def _discard(directory: Path) -> None:
+    """Remove an item directory's bookkeeping files and the directory itself.
+
+    A reclaim and a restore may both tidy up after the same item, so parts
+    that are already gone are not an error.
+    """
+    for name in (META_NAME, f"{META_NAME}.tmp"):
+        try:
+            os.unlink(directory / name)
+        except FileNotFoundError:
+            pass
+    try:
+        os.rmdir(directory)
+    except FileNotFoundError:
+        pass
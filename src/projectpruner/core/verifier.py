@@ -0,0 +1,104 @@
+"""
+Archive verification against the checksums recorded while archiving.
+"""
+
+import hashlib
+import lzma
+import tarfile
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from projectpruner.core.manifest import iter_entries, manifest_path, read_summary
+from projectpruner.utils.filesystem import hash_file
+
+READ_SIZE = 1 << 20
+
+
+@dataclass
+class VerifyResult:
+    """Outcome of verifying one archive."""
+
+    archive: Path
+    errors: List[str] = field(default_factory=list)
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether no problem was found."""
+        return not self.errors
+
+
+def verify_tar(archive_path: Path, full: bool = False) -> VerifyResult:
+    """Verify a tar archive against its manifest.
+
+    The archive's size and the SHA-256 of its compressed bytes are compared
+    with the values recorded while it was written, which needs no
+    decompression. With ``full``, the archive is also decompressed and
+    every file it stores is checked against its recorded SHA-256.
+    """
+    result = VerifyResult(archive=archive_path)
+    started = time.monotonic()
+    manifest = manifest_path(archive_path)
+    summary = read_summary(manifest)
+    if summary is None:
+        result.errors.append("No manifest to verify against")
+        return result
+
+    size = archive_path.stat().st_size
+    if size != summary.compressed_size:
+        result.errors.append(
+            f"Size is {size} bytes, expected {summary.compressed_size}"
+        )
+    elif summary.sha256 is not None:
+        if hash_file(archive_path, READ_SIZE) != summary.sha256:
+            result.errors.append("Archive checksum mismatch")
+        result.bytes += size
+    elif not full:
+        result.errors.append("No archive checksum recorded; a full check is needed")
+
+    if full and not result.errors:
+        _verify_members(archive_path, manifest, result)
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def _verify_members(archive_path: Path, manifest: Path, result: VerifyResult) -> None:
+    """Decompress an archive and check each stored file's SHA-256."""
+    # Unchanged files of an incremental archive are held by earlier ones
+    expected: Dict[str, str] = {
+        entry.name: entry.sha256
+        for entry in iter_entries(manifest)
+        if entry.type == "file" and entry.archive is None and entry.sha256
+    }
+    try:
+        with tarfile.open(archive_path, "r:*") as tar:
+            while True:
+                member = tar.next()
+                if member is None:
+                    break
+                tar.members = []  # type: ignore[attr-defined]
+                sha256 = expected.pop(member.name, None)
+                if not member.isreg() or sha256 is None:
+                    continue
+                source = tar.extractfile(member)
+                if source is None:
+                    continue
+                file_hash = hashlib.sha256()
+                while True:
+                    data = source.read(READ_SIZE)
+                    if not data:
+                        break
+                    file_hash.update(data)
+                result.files += 1
+                result.bytes += member.size
+                if file_hash.hexdigest() != sha256:
+                    result.errors.append(f"{member.name}: checksum mismatch")
+    except (OSError, EOFError, lzma.LZMAError, zlib.error, tarfile.TarError) as e:
+        result.errors.append(f"Archive is unreadable: {str(e)}")
+        return
+    result.errors.extend(f"{name}: missing from archive" for name in expected)
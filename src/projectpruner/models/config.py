@@ -15,6 +15,15 @@ class ArchiveConfig:
     compression_level: int = 3
     archive_dir: Path = Path.home() / ".projectpruner" / "archives"
     date_format: str = "%Y-%m-%d"
+    threads: int = 0  # 0 = one per CPU
+    backend: str = "tar"  # "tar" or "store" (deduplicating chunk store)
+    # Workers per stage of the multi-project archive pipeline
+    scan_workers: int = 2
+    archive_workers: int = 1
+    remove_workers: int = 1
+    queue_size: int = 2  # Projects waiting between two stages
+    cpu_budget: int = 0  # Cores shared by all archives and codecs (0 = all)
+    verify: bool = False  # Check each archive's checksum before removing sources
 
 
 @dataclass
@@ -38,6 +47,7 @@ class CleanConfig:
 
     exclude_patterns: List[str] = field(default_factory=list)
     min_size: int = 1024  # 1KB
+    trash: bool = False
 
 
 @dataclass
@@ -50,6 +60,8 @@ class Config:
     exclude_paths: List[Path] = field(default_factory=list)
     log_level: str = "INFO"
     log_file: Optional[Path] = None
+    # Prometheus textfile updated after every clean, archive and restore run
+    metrics_file: Optional[Path] = None
 
     @classmethod
     def from_dict(cls, data: Dict) -> "Config":
@@ -71,6 +83,11 @@ class Config:
             log_file=(
                 Path(data["log_file"]).expanduser() if "log_file" in data else None
             ),
+            metrics_file=(
+                Path(data["metrics_file"]).expanduser()
+                if data.get("metrics_file")
+                else None
+            ),
         )
 
     def to_dict(self) -> Dict:
@@ -81,14 +98,24 @@ class Config:
                 "compression_level": self.archive.compression_level,
                 "archive_dir": str(self.archive.archive_dir),
                 "date_format": self.archive.date_format,
+                "threads": self.archive.threads,
+                "backend": self.archive.backend,
+                "scan_workers": self.archive.scan_workers,
+                "archive_workers": self.archive.archive_workers,
+                "remove_workers": self.archive.remove_workers,
+                "queue_size": self.archive.queue_size,
+                "cpu_budget": self.archive.cpu_budget,
+                "verify": self.archive.verify,
             },
             "clean": {
                 "patterns": self.clean.patterns,
                 "exclude_patterns": self.clean.exclude_patterns,
                 "min_size": self.clean.min_size,
+                "trash": self.clean.trash,
             },
             "search_paths": [str(p) for p in self.search_paths],
             "exclude_paths": [str(p) for p in self.exclude_paths],
             "log_level": self.log_level,
             "log_file": str(self.log_file) if self.log_file else None,
+            "metrics_file": str(self.metrics_file) if self.metrics_file else None,
         }
@@ -0,0 +1,72 @@
+"""
+Clean plan model describing artifacts selected for removal.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List
+
+
+@dataclass
+class PlanEntry:
+    """A single file or directory selected for removal."""
+
+    path: Path
+    is_dir: bool
+    size: int
+    file_count: int
+    device: int
+    # Moved to the trash by the clean rather than deleted
+    trashed: bool = False
+
+
+@dataclass
+class CleanPlan:
+    """Artifacts found in a project, sized during discovery."""
+
+    project_path: Path
+    entries: List[PlanEntry] = field(default_factory=list)
+
+    @property
+    def total_size(self) -> int:
+        """Total bytes held by all entries."""
+        return sum(entry.size for entry in self.entries)
+
+    @property
+    def file_count(self) -> int:
+        """Total number of files held by all entries."""
+        return sum(entry.file_count for entry in self.entries)
+
+    @property
+    def trashed_size(self) -> int:
+        """Bytes held by the entries moved to the trash."""
+        return sum(entry.size for entry in self.entries if entry.trashed)
+
+    @property
+    def trashed_file_count(self) -> int:
+        """Number of files held by the entries moved to the trash."""
+        return sum(entry.file_count for entry in self.entries if entry.trashed)
+
+    def __len__(self) -> int:
+        """Number of entries in the plan."""
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[PlanEntry]:
+        """Iterate over the plan entries."""
+        return iter(self.entries)
+
+
+@dataclass
+class SourceListing:
+    """Paths recorded while archiving a project, to remove it without a rescan.
+
+    ``files`` and ``directories`` went into the archive (directories in
+    walk order, parents first); ``artifacts`` matched a clean pattern and
+    were left out of it. ``bytes`` is the size of the regular files.
+    """
+
+    root: Path
+    files: List[str] = field(default_factory=list)
+    directories: List[str] = field(default_factory=list)
+    artifacts: List[str] = field(default_factory=list)
+    bytes: int = 0
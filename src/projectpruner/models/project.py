@@ -5,7 +5,12 @@ Project model for representing development projects.
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+from projectpruner.core.scanner import scan_directory
+
+if TYPE_CHECKING:
+    from projectpruner.core.index import ScanIndex
 
 
 @dataclass
@@ -17,29 +22,46 @@ class Project:
     size: int
     last_modified: datetime
     type: Optional[str] = None
+    file_count: int = 0
+    dir_count: int = 0
+    complete: bool = True
 
     @classmethod
-    def from_path(cls, path: Path) -> "Project":
-        """Create a Project instance from a path."""
+    def from_path(
+        cls,
+        path: Path,
+        index: Optional["ScanIndex"] = None,
+        stop_newer_than: Optional[float] = None,
+    ) -> "Project":
+        """Create a Project instance from a path.
+
+        When a scan index is given, unchanged directories are answered from it.
+        ``stop_newer_than`` ends the scan early as in ``scan_directory``; the
+        project is then marked incomplete and only its totals so far are set.
+        """
         if not path.exists():
             raise ValueError(f"Path does not exist: {path}")
 
         if not path.is_dir():
             raise ValueError(f"Path is not a directory: {path}")
 
-        # Calculate total size
-        total_size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
-
-        # Get last modified time
-        last_modified = datetime.fromtimestamp(
-            max(f.stat().st_mtime for f in path.rglob("*") if f.is_file())
+        # Collect size, newest mtime and counts in a single traversal
+        scan = scan_directory(
+            path,
+            index=index,
+            stop_newer_than=stop_newer_than,
         )
+        if scan.newest_mtime is None:
+            raise ValueError(f"Path contains no files: {path}")
 
         return cls(
             path=path,
             name=path.name,
-            size=total_size,
-            last_modified=last_modified,
+            size=scan.size,
+            last_modified=datetime.fromtimestamp(scan.newest_mtime),
+            file_count=scan.file_count,
+            dir_count=scan.dir_count,
+            complete=scan.complete,
         )
 
     def __str__(self) -> str:
@@ -54,6 +76,8 @@ class Project:
             f"name={self.name}, "
             f"size={self.size}, "
             f"last_modified={self.last_modified}, "
-            f"type={self.type}"
+            f"type={self.type}, "
+            f"file_count={self.file_count}, "
+            f"dir_count={self.dir_count}"
             f")"
         )
@@ -91,4 +91,8 @@ class ConfigManager:
         if log_file := os.getenv("PROJECTPRUNER_LOG_FILE"):
             data["log_file"] = log_file
 
+        # Metrics settings
+        if metrics_file := os.getenv("PROJECTPRUNER_METRICS_FILE"):
+            data["metrics_file"] = metrics_file
+
         return Config.from_dict(data)
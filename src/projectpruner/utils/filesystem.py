@@ -2,21 +2,27 @@
 Filesystem utility module for file operations.
 """
 
+import hashlib
 import os
 import shutil
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator, List, Optional
+from typing import Iterator, List, Optional, Union
+
+from projectpruner.core.scanner import scan_directory
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None  # type: ignore[assignment]
+
+# Whether exclusive_lock actually excludes other processes
+LOCKING_SUPPORTED = fcntl is not None
 
 
 def get_directory_size(path: Path) -> int:
     """Calculate the total size of a directory in bytes."""
-    total_size = 0
-    for dirpath, _, filenames in os.walk(path):
-        for filename in filenames:
-            file_path = Path(dirpath) / filename
-            if file_path.is_file():
-                total_size += file_path.stat().st_size
-    return total_size
+    return scan_directory(path).size
 
 
 def get_file_count(path: Path) -> int:
@@ -64,3 +70,78 @@ def is_empty_directory(path: Path) -> bool:
     if not path.is_dir():
         return False
     return not any(path.iterdir())
+
+
+def is_rotational(path: Path) -> Optional[bool]:
+    """Check whether a path lives on a rotational disk.
+
+    Returns None when the storage type cannot be determined, e.g. on
+    platforms without ``/sys`` or for network and virtual filesystems.
+    """
+    try:
+        device = os.stat(path).st_dev
+        block = Path(
+            os.path.realpath(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+        )
+    except (OSError, AttributeError):
+        return None
+
+    # Partitions keep their queue settings on the parent device
+    for candidate in (block, block.parent):
+        flag = candidate / "queue" / "rotational"
+        try:
+            return flag.read_text().strip() == "1"
+        except OSError:
+            continue
+    return None
+
+
+def default_jobs(path: Path) -> int:
+    """Pick a worker count for metadata-heavy scans under a path."""
+    cpus = os.cpu_count() or 1
+    rotational = is_rotational(path)
+    if rotational:
+        # Concurrent seeks on spinning disks hurt more than they help
+        return 2
+    if rotational is None:
+        return min(8, cpus)
+    return min(32, cpus * 4)
+
+
+def format_size(size_bytes: float) -> str:
+    """Format size in bytes to human-readable format."""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size_bytes < 1024:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024
+    return f"{size_bytes:.1f} TB"
+
+
+def hash_file(path: Union[str, Path], bufsize: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(bufsize), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def exclusive_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive advisory lock on the file at PATH, creating it.
+
+    Yields whether the lock was taken: without ``blocking``, False when
+    another process holds it. Without ``fcntl`` the lock is always granted.
+    """
+    with open(path, "ab") as lock_file:
+        if fcntl is None:
+            yield True
+            return
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file.fileno(), flags)
+        except BlockingIOError:
+            yield False
+            return
+        # Closing the file releases the lock
+        yield True
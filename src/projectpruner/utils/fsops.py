@@ -0,0 +1,142 @@
+"""
+Counted wrappers around the filesystem primitives used by the core walks.
+
+Most of the pruner's time goes to metadata operations, so the walks call
+these wrappers instead of ``os`` directly. While counting is enabled
+(``--profile``, or ``counting()`` in tests), every call is tallied by
+operation; otherwise a wrapper costs one flag check on top of the call.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Union
+
+if TYPE_CHECKING:
+    from os import DirEntry, _ScandirIterator
+
+# Operations counted, in report order
+OPERATIONS = ("scandir", "listdir", "stat", "open", "unlink", "rmdir")
+
+_local = threading.local()
+_counters: List[Dict[str, int]] = []
+_lock = threading.Lock()
+_enabled = 0
+
+
+def count(operation: str, n: int = 1) -> None:
+    """Tally OPERATION done by code that cannot use a wrapper (e.g. tarfile)."""
+    if not _enabled:
+        return
+    counter = getattr(_local, "counter", None)
+    if counter is None:
+        # Each thread counts into its own dict, with every key present up
+        # front, so snapshots can read them while other threads count
+        counter = dict.fromkeys(OPERATIONS, 0)
+        with _lock:
+            _counters.append(counter)
+        _local.counter = counter
+    counter[operation] += n
+
+
+def snapshot() -> Dict[str, int]:
+    """Operations counted so far across all threads."""
+    totals = dict.fromkeys(OPERATIONS, 0)
+    with _lock:
+        counters = list(_counters)
+    for counter in counters:
+        for operation in OPERATIONS:
+            totals[operation] += counter[operation]
+    return totals
+
+
+def difference(after: Dict[str, int], before: Dict[str, int]) -> Dict[str, int]:
+    """Operations counted between two snapshots, leaving out zero counts."""
+    return {
+        operation: after[operation] - before[operation]
+        for operation in OPERATIONS
+        if after[operation] != before[operation]
+    }
+
+
+def enable() -> None:
+    """Start counting; calls nest and each must be matched by ``disable``."""
+    global _enabled
+    with _lock:
+        _enabled += 1
+
+
+def disable() -> None:
+    """Undo one ``enable``."""
+    global _enabled
+    with _lock:
+        _enabled = max(0, _enabled - 1)
+
+
+@contextmanager
+def counting() -> Iterator[Dict[str, int]]:
+    """Count the operations done inside the block.
+
+    The yielded dict is filled in when the block exits, with an entry for
+    every operation. Operations of other threads running at the same time
+    are included.
+    """
+    counts: Dict[str, int] = {}
+    enable()
+    before = snapshot()
+    try:
+        yield counts
+    finally:
+        after = snapshot()
+        disable()
+        counts.update(
+            {operation: after[operation] - before[operation] for operation in after}
+        )
+
+
+def scandir(path: Union[str, int]) -> "_ScandirIterator[str]":
+    """``os.scandir``, counted."""
+    count("scandir")
+    return os.scandir(path)  # type: ignore[arg-type]
+
+
+def listdir(path: str) -> List[str]:
+    """``os.listdir``, counted."""
+    count("listdir")
+    return os.listdir(path)
+
+
+def lstat(path: str, dir_fd: Optional[int] = None) -> os.stat_result:
+    """``os.lstat``, counted."""
+    count("stat")
+    return os.lstat(path, dir_fd=dir_fd)
+
+
+def entry_stat(entry: "DirEntry[str]") -> os.stat_result:
+    """Stat a directory entry without following symlinks, counted."""
+    count("stat")
+    return entry.stat(follow_symlinks=False)
+
+
+def fstat(fd: int) -> os.stat_result:
+    """``os.fstat``, counted."""
+    count("stat")
+    return os.fstat(fd)
+
+
+def open_fd(path: str, flags: int, dir_fd: Optional[int] = None) -> int:
+    """``os.open``, counted."""
+    count("open")
+    return os.open(path, flags, dir_fd=dir_fd)
+
+
+def unlink(path: str, dir_fd: Optional[int] = None) -> None:
+    """``os.unlink``, counted."""
+    count("unlink")
+    os.unlink(path, dir_fd=dir_fd)
+
+
+def rmdir(path: str, dir_fd: Optional[int] = None) -> None:
+    """``os.rmdir``, counted."""
+    count("rmdir")
+    os.rmdir(path, dir_fd=dir_fd)
@@ -0,0 +1,281 @@
+"""
+Prometheus textfile export of what scheduled runs did.
+
+Each ``clean``, ``archive`` and ``restore`` run updates one file in the
+text exposition format, meant for the node exporter's textfile collector.
+Counters and histograms carry on from the values already in the file, so
+they keep growing across runs; gauges describe the latest run of each
+command.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from projectpruner.utils.profiler import Profiler
+
+RATIO_BUCKETS = (1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 20.0)
+THROUGHPUT_BUCKETS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+
+@dataclass
+class _Family:
+    """A metric family: its type, help text and histogram buckets."""
+
+    name: str
+    type: str
+    help: str
+    buckets: Tuple[float, ...] = ()
+
+
+FAMILIES = [
+    _Family("projectpruner_runs_total", "counter", "Runs by command and status."),
+    _Family(
+        "projectpruner_last_run_timestamp_seconds",
+        "gauge",
+        "When the latest run of a command finished.",
+    ),
+    _Family(
+        "projectpruner_last_run_duration_seconds",
+        "gauge",
+        "How long the latest run of a command took.",
+    ),
+    _Family(
+        "projectpruner_last_run_success",
+        "gauge",
+        "Whether the latest run of a command completed without failures.",
+    ),
+    _Family(
+        "projectpruner_projects_total",
+        "counter",
+        "Projects handled, by command and outcome.",
+    ),
+    _Family(
+        "projectpruner_freed_bytes_total",
+        "counter",
+        "Bytes removed from projects.",
+    ),
+    _Family(
+        "projectpruner_trashed_bytes_total",
+        "counter",
+        "Bytes moved to the trash, to be freed by a later reclaim.",
+    ),
+    _Family(
+        "projectpruner_removed_files_total",
+        "counter",
+        "Files removed from projects.",
+    ),
+    _Family(
+        "projectpruner_archived_bytes_total",
+        "counter",
+        "Bytes of project files stored in archives.",
+    ),
+    _Family(
+        "projectpruner_archive_written_bytes_total",
+        "counter",
+        "Bytes of archives written.",
+    ),
+    _Family(
+        "projectpruner_compression_ratio",
+        "histogram",
+        "Size of the archived files over the size of their archive.",
+        RATIO_BUCKETS,
+    ),
+    _Family(
+        "projectpruner_phase_seconds_total",
+        "counter",
+        "Wall time spent per phase.",
+    ),
+    _Family(
+        "projectpruner_phase_throughput_mb_per_second",
+        "histogram",
+        "Megabytes per second of each project's run through a phase.",
+        THROUGHPUT_BUCKETS,
+    ),
+]
+
+_FAMILIES = {family.name: family for family in FAMILIES}
+_SUFFIXES = ("_bucket", "_sum", "_count")
+
+
+class RunMetrics:
+    """What one run of a command did, to be written with ``write_textfile``."""
+
+    def __init__(self, command: str):
+        """Initialize the metrics of a COMMAND run starting now."""
+        self.command = command
+        self.started = time.time()
+        self.failed = False
+        self.outcomes: Dict[str, int] = {}
+        self.freed_bytes = 0
+        self.trashed_bytes = 0
+        self.removed_files = 0
+        self.archived_bytes = 0
+        self.written_bytes = 0
+        self.ratios: List[float] = []
+
+    def project(self, outcome: str) -> None:
+        """Count a project that ended with OUTCOME (archived, failed, ...)."""
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if outcome == "failed":
+            self.failed = True
+
+    def removed(self, size: int, files: int) -> None:
+        """Count SIZE bytes in FILES files removed from a project."""
+        self.freed_bytes += size
+        self.removed_files += files
+
+    def trashed(self, size: int) -> None:
+        """Count SIZE bytes moved to the trash instead of being removed."""
+        self.trashed_bytes += size
+
+    def archived(self, size: int, archive_size: int) -> None:
+        """Count SIZE bytes of files stored in an archive of ARCHIVE_SIZE bytes."""
+        self.archived_bytes += size
+        self.written_bytes += archive_size
+        if archive_size:
+            self.ratios.append(size / archive_size)
+
+    def samples(
+        self, profiler: Optional[Profiler] = None, now: Optional[float] = None
+    ) -> Dict[str, Tuple[str, float]]:
+        """This run's samples, keyed by series, with their family names."""
+        now = time.time() if now is None else now
+        command = {"command": self.command}
+        status = "failed" if self.failed else "ok"
+        samples: Dict[str, Tuple[str, float]] = {}
+
+        def add(family: str, value: float, **labels: str) -> None:
+            samples[_series(family, dict(command, **labels))] = (family, value)
+
+        def observe(family: str, values: List[float], **labels: str) -> None:
+            labels = dict(command, **labels)
+            for bound in _FAMILIES[family].buckets + (float("inf"),):
+                key = _series(f"{family}_bucket", dict(labels, le=_number(bound)))
+                samples[key] = (family, sum(1 for v in values if v <= bound))
+            samples[_series(f"{family}_sum", labels)] = (family, sum(values))
+            samples[_series(f"{family}_count", labels)] = (family, len(values))
+
+        add("projectpruner_runs_total", 1, status=status)
+        add("projectpruner_last_run_timestamp_seconds", now)
+        add("projectpruner_last_run_duration_seconds", now - self.started)
+        add("projectpruner_last_run_success", 0 if self.failed else 1)
+        for outcome, count in self.outcomes.items():
+            add("projectpruner_projects_total", count, outcome=outcome)
+        add("projectpruner_freed_bytes_total", self.freed_bytes)
+        add("projectpruner_removed_files_total", self.removed_files)
+        if self.command == "clean":
+            add("projectpruner_trashed_bytes_total", self.trashed_bytes)
+        if self.command == "archive":
+            add("projectpruner_archived_bytes_total", self.archived_bytes)
+            add("projectpruner_archive_written_bytes_total", self.written_bytes)
+            observe("projectpruner_compression_ratio", self.ratios)
+
+        if profiler is not None:
+            throughput: Dict[str, List[float]] = {}
+            for record in profiler.records:
+                if record.wall > 0 and record.bytes:
+                    throughput.setdefault(record.phase, []).append(
+                        record.bytes / record.wall / 1e6
+                    )
+            for total in profiler.totals():
+                add("projectpruner_phase_seconds_total", total.wall, phase=total.phase)
+                observe(
+                    "projectpruner_phase_throughput_mb_per_second",
+                    throughput.get(total.phase, []),
+                    phase=total.phase,
+                )
+        return samples
+
+
+def write_textfile(
+    path: Path, metrics: RunMetrics, profiler: Optional[Profiler] = None
+) -> None:
+    """Merge a run's metrics into the textfile at PATH.
+
+    Counter and histogram series are added to their previous values, gauges
+    replace them, and series of other commands are kept. The file is
+    replaced atomically, so the collector never reads a partial one.
+    """
+    merged = read_textfile(path)
+    for key, (name, value) in metrics.samples(profiler).items():
+        previous = merged.get(key)
+        if previous is not None and _FAMILIES[name].type != "gauge":
+            value += previous[1]
+        merged[key] = (name, value)
+
+    lines: List[str] = []
+    for family in FAMILIES:
+        series = [
+            (key, value) for key, (name, value) in merged.items() if name == family.name
+        ]
+        if not series:
+            continue
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        lines.extend(f"{key} {_number(value)}" for key, value in series)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def read_textfile(path: Path) -> Dict[str, Tuple[str, float]]:
+    """Series in a textfile written earlier, keyed by series, with their family.
+
+    Lines that do not belong to a known family are dropped.
+    """
+    samples: Dict[str, Tuple[str, float]] = {}
+    try:
+        text = path.read_text()
+    except FileNotFoundError:
+        return samples
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        key, _, value = line.rpartition(" ")
+        name = key.split("{", 1)[0]
+        family = _family_of(name)
+        if family is None:
+            continue
+        try:
+            samples[key] = (family, float(value))
+        except ValueError:
+            continue
+    return samples
+
+
+def _family_of(name: str) -> Optional[str]:
+    """Family a sample name belongs to, if it is a known one."""
+    if name in _FAMILIES:
+        return name
+    for suffix in _SUFFIXES:
+        base = name[: -len(suffix)]
+        if name.endswith(suffix) and base in _FAMILIES:
+            return base
+    return None
+
+
+def _series(name: str, labels: Dict[str, str]) -> str:
+    """A series as written in the textfile: ``name{label="value",...}``."""
+    rendered = ",".join(
+        f'{label}="{_escape(value)}"' for label, value in sorted(labels.items())
+    )
+    return f"{name}{{{rendered}}}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Format a sample value or bucket bound."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,290 @@
+"""
+Per-phase profiling of a run: wall time, CPU time, bytes and file counts.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import ContextManager, Dict, List, Optional, Type
+
+from rich.console import Console
+from rich.table import Table
+
+from projectpruner.utils import fsops
+from projectpruner.utils.filesystem import format_size
+
+# Phases whose Python code is profiled when a cProfile dump is requested
+HOT_PHASES = ("scan", "plan", "archive", "remove")
+
+# Slowest project phases listed below the per-phase totals
+SLOWEST_SHOWN = 10
+
+
+@dataclass
+class PhaseRecord:
+    """One phase run for one project.
+
+    ``cpu`` is the process's CPU time over the phase, and ``ops`` the
+    filesystem operations counted by ``fsops`` during it. Both include the
+    helper threads a phase starts (compression, deletion workers) but also
+    any phase running alongside it in the archive pipeline.
+    """
+
+    phase: str
+    project: Optional[str] = None
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes: int = 0
+    files: int = 0
+    ops: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class PhaseTotals:
+    """All runs of one phase added up."""
+
+    phase: str
+    runs: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes: int = 0
+    files: int = 0
+    ops: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mb_per_second(self) -> float:
+        """Megabytes handled per second of wall time."""
+        return self.bytes / self.wall / 1e6 if self.wall else 0.0
+
+
+class _Phase:
+    """Measures one phase while its ``with`` block runs."""
+
+    def __init__(self, profiler: "Profiler", record: PhaseRecord):
+        self.profiler = profiler
+        self.record = record
+        self._wall = 0.0
+        self._cpu = 0.0
+        self._ops: Dict[str, int] = {}
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def __enter__(self) -> PhaseRecord:
+        if self.profiler.collect_stats and self.record.phase in HOT_PHASES:
+            self._cprofile = self.profiler._start_cprofile()
+        self._ops = fsops.snapshot()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self.record
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.record.wall = time.perf_counter() - self._wall
+        self.record.cpu = time.process_time() - self._cpu
+        self.record.ops = fsops.difference(fsops.snapshot(), self._ops)
+        if self._cprofile is not None:
+            self.profiler._stop_cprofile(self._cprofile)
+        self.profiler._add(self.record)
+
+
+class _NullPhase:
+    """Stand-in for a phase while profiling is off; measures nothing."""
+
+    def __enter__(self) -> PhaseRecord:
+        # Callers may fill in counts; nobody reads this record back
+        return PhaseRecord(phase="")
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class Profiler:
+    """Collects a PhaseRecord for every phase of every project.
+
+    Phases are timed with ``with profiler.phase("archive", path) as
+    record:``, and the block fills in ``record.bytes`` and
+    ``record.files``. A disabled profiler hands out a shared no-op context,
+    so instrumented code costs next to nothing when ``--profile`` is off.
+    With ``collect_stats``, the hot phases are also run under cProfile,
+    one thread at a time, and their stats merged for ``dump_stats``.
+    """
+
+    def __init__(self, enabled: bool = False, collect_stats: bool = False):
+        """Initialize the Profiler."""
+        self.enabled = enabled
+        self.collect_stats = enabled and collect_stats
+        self.records: List[PhaseRecord] = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+        self._stats: Optional[pstats.Stats] = None
+
+    def phase(
+        self, name: str, project: Optional[Path] = None
+    ) -> ContextManager[PhaseRecord]:
+        """Context measuring phase NAME, optionally for one PROJECT."""
+        if not self.enabled:
+            return _NULL_PHASE
+        record = PhaseRecord(
+            phase=name, project=os.fspath(project) if project is not None else None
+        )
+        return _Phase(self, record)
+
+    def totals(self) -> List[PhaseTotals]:
+        """Per-phase totals, in the order phases first ran."""
+        totals: Dict[str, PhaseTotals] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            total = totals.setdefault(record.phase, PhaseTotals(phase=record.phase))
+            total.runs += 1
+            total.wall += record.wall
+            total.cpu += record.cpu
+            total.bytes += record.bytes
+            total.files += record.files
+            for operation, n in record.ops.items():
+                total.ops[operation] = total.ops.get(operation, 0) + n
+        return list(totals.values())
+
+    def report(self) -> Dict[str, object]:
+        """The whole profile as JSON-ready data."""
+        with self._lock:
+            records = list(self.records)
+        return {
+            "wall": time.perf_counter() - self.started,
+            "phases": [
+                dict(asdict(total), mb_per_second=total.mb_per_second)
+                for total in self.totals()
+            ],
+            "records": [asdict(record) for record in records],
+        }
+
+    def write_json(self, path: Path) -> None:
+        """Write the JSON report to PATH."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2) + "\n")
+
+    def dump_stats(self, path: Path) -> bool:
+        """Write the merged cProfile stats to PATH, if any were collected."""
+        if self._stats is None:
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._stats.dump_stats(os.fspath(path))
+        return True
+
+    def print_table(self, console: Console) -> None:
+        """Print per-phase totals and the slowest project phases."""
+        table = Table(title="Profile")
+        for column in ("Phase", "Runs", "Wall s", "CPU s", "Files", "Size", "MB/s"):
+            table.add_column(column, justify="left" if column == "Phase" else "right")
+        table.add_column("FS ops")
+        for total in self.totals():
+            table.add_row(
+                total.phase,
+                str(total.runs),
+                f"{total.wall:.3f}",
+                f"{total.cpu:.3f}",
+                str(total.files),
+                format_size(total.bytes),
+                f"{total.mb_per_second:.1f}",
+                _format_ops(total.ops),
+            )
+        console.print(table)
+
+        with self._lock:
+            slowest = sorted(self.records, key=lambda r: r.wall, reverse=True)
+        slowest = [record for record in slowest if record.project][:SLOWEST_SHOWN]
+        if not slowest:
+            return
+        table = Table(title="Slowest projects")
+        for column in ("Phase", "Project", "Wall s", "CPU s", "Files", "Size"):
+            table.add_column(
+                column, justify="left" if column in ("Phase", "Project") else "right"
+            )
+        for record in slowest:
+            table.add_row(
+                record.phase,
+                str(record.project),
+                f"{record.wall:.3f}",
+                f"{record.cpu:.3f}",
+                str(record.files),
+                format_size(record.bytes),
+            )
+        console.print(table)
+
+    def _add(self, record: PhaseRecord) -> None:
+        """Keep a finished phase's record."""
+        with self._lock:
+            self.records.append(record)
+
+    def _start_cprofile(self) -> Optional[cProfile.Profile]:
+        """Start profiling the calling thread, unless another phase already is."""
+        if not self._cprofile_lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, coverage) owns the hooks
+            self._cprofile_lock.release()
+            return None
+        return profile
+
+    def _stop_cprofile(self, profile: cProfile.Profile) -> None:
+        """Stop a phase's cProfile and merge its stats."""
+        profile.disable()
+        try:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+        finally:
+            self._cprofile_lock.release()
+
+
+_profiler = Profiler()
+
+
+def _format_ops(ops: Dict[str, int]) -> str:
+    """Filesystem operation counts as ``stat 120, unlink 80``."""
+    return ", ".join(
+        f"{operation} {ops[operation]}"
+        for operation in fsops.OPERATIONS
+        if ops.get(operation)
+    )
+
+
+def get_profiler() -> Profiler:
+    """The profiler instrumented code reports to."""
+    return _profiler
+
+
+def set_profiler(profiler: Optional[Profiler]) -> Profiler:
+    """Make PROFILER the active one (None: a disabled one) and return it.
+
+    Filesystem operations are counted while an enabled profiler is active.
+    """
+    global _profiler
+    if _profiler.enabled:
+        fsops.disable()
+    _profiler = profiler if profiler is not None else Profiler()
+    if _profiler.enabled:
+        fsops.enable()
+    return _profiler
+
+
+def phase(name: str, project: Optional[Path] = None) -> ContextManager[PhaseRecord]:
+    """Measure phase NAME with the active profiler (see ``Profiler.phase``)."""
+    return _profiler.phase(name, project)
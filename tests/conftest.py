@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import pytest
+
+from projectpruner.core.archiver import Archiver
+from projectpruner.models.config import ArchiveConfig, Config
+
+# Contents by path relative to the project root
+ProjectFiles = Dict[str, Union[str, bytes]]
+
+# One source file and one node_modules artifact
+PROJECT_FILES: ProjectFiles = {
+    "src/main.py": "print('hello')\n" * 200,
+    "node_modules/dep/index.js": "x" * 300,
+}
+
+
+def create_project(root: Path, files: Optional[ProjectFiles] = None) -> Path:
+    """Create a project at ROOT holding FILES (PROJECT_FILES by default)."""
+    root.mkdir(parents=True, exist_ok=True)
+    for name, content in (PROJECT_FILES if files is None else files).items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+    return root
+
+
+@pytest.fixture
+def make_project() -> Callable[..., Path]:
+    """Factory for projects built from a mapping of paths to contents."""
+    return create_project
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """Create a small project to archive."""
+    return create_project(
+        tmp_path / "myproject",
+        {"src/main.py": "print('hello')\n" * 1000, "data.bin": os.urandom(200_000)},
+    )
+
+
+@pytest.fixture
+def make_archiver(tmp_path: Path) -> Callable[..., Archiver]:
+    """Factory for Archivers writing into ``archives`` under a directory."""
+
+    def make(root: Optional[Path] = None, **options: Any) -> Archiver:
+        root = tmp_path if root is None else root
+        archive = ArchiveConfig(archive_dir=root / "archives", **options)
+        return Archiver(Config(archive=archive))
+
+    return make
+
+
+@pytest.fixture
+def archiver(make_archiver: Callable[..., Archiver]) -> Archiver:
+    """Create an Archiver writing into the temporary archive directory."""
+    return make_archiver()
@@ -0,0 +1,342 @@
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import random
+import shutil
+import subprocess
+import tarfile
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+import pytest
+
+import projectpruner.core.archiver as archiver_module
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.compression import (
+    ParallelGzipWriter,
+    ParallelXZWriter,
+    XZBlockReader,
+    split_cpu_budget,
+)
+from projectpruner.core.manifest import iter_entries, manifest_path, read_summary
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_parallel_xz_writer_multi_block(threads: int) -> None:
+    """Test that the writer produces one valid stream with many blocks."""
+    data = os.urandom(50_000) + b"abcdefgh" * 100_000
+    buffer = io.BytesIO()
+    with ParallelXZWriter(
+        buffer, preset=1, threads=threads, block_size=64 * 1024
+    ) as writer:
+        for start in range(0, len(data), 10_000):
+            writer.write(data[start : start + 10_000])
+        assert writer.tell() == len(data)
+
+    assert len(writer.blocks) == -(-len(data) // (64 * 1024))
+    assert lzma.decompress(buffer.getvalue()) == data
+
+
+@pytest.mark.parametrize(
+    "workers, threads, budget, expected",
+    [(1, None, 8, (1, 8)), (3, None, 8, (3, 2)), (4, 6, 8, (4, 2)), (16, 2, 8, (8, 1))],
+)
+def test_split_cpu_budget(
+    workers: int, threads: Optional[int], budget: int, expected: Tuple[int, int]
+) -> None:
+    """Test that parallel archives and their codec threads stay within budget."""
+    assert split_cpu_budget(workers, threads, budget) == expected
+
+
+def test_parallel_xz_writer_empty_stream() -> None:
+    """Test that an empty stream is still a valid xz file."""
+    buffer = io.BytesIO()
+    ParallelXZWriter(buffer).close()
+    assert lzma.decompress(buffer.getvalue()) == b""
+
+
+@pytest.mark.skipif(shutil.which("xz") is None, reason="xz is not installed")
+def test_parallel_xz_readable_by_xz_tool(tmp_path: Path) -> None:
+    """Test that the standard xz tool accepts the multi-block stream."""
+    target = tmp_path / "data.xz"
+    with open(target, "wb") as raw, ParallelXZWriter(
+        raw, preset=2, threads=2, block_size=4096
+    ) as writer:
+        writer.write(b"0123456789" * 5000)
+    result = subprocess.run(["xz", "-dc", str(target)], capture_output=True)
+    assert result.returncode == 0
+    assert result.stdout == b"0123456789" * 5000
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+@pytest.mark.parametrize("level", [0, 1, 9])
+def test_parallel_gzip_writer_single_member(threads: int, level: int) -> None:
+    """Test that primed chunks join into one valid gzip member."""
+    data = b"".join(b"line %d of the payload\n" % i for i in range(20_000))
+    buffer = io.BytesIO()
+    with ParallelGzipWriter(
+        buffer, level, threads=threads, block_size=16 * 1024
+    ) as writer:
+        writer.write(data)
+
+    output = buffer.getvalue()
+    assert gzip.decompress(output) == data
+    assert zlib.decompressobj(wbits=31).decompress(output) == data
+    if level:
+        # Priming with the previous tail keeps the ratio near plain gzip
+        assert len(output) < len(gzip.compress(data, level)) * 1.1
+
+
+@pytest.mark.parametrize("compress", ["xz", "gz"])
+def test_archive_round_trip(
+    tmp_path: Path, project: Path, compress: str, archiver: Archiver
+) -> None:
+    """Test that archives from both codecs restore to the same content."""
+    archive_path = archiver.archive(
+        project, compress=compress, threads=2  # type: ignore[arg-type]
+    )
+    assert archive_path.name.endswith(f".tar.{compress}")
+
+    restored = archiver.restore(archive_path, destination=tmp_path / "restored")
+    assert (restored / "myproject" / "data.bin").read_bytes() == (
+        project / "data.bin"
+    ).read_bytes()
+    with tarfile.open(archive_path, "r:*") as tar:
+        assert "myproject/src/main.py" in tar.getnames()
+
+
+def test_archive_honors_compression_level(
+    tmp_path: Path, project: Path, make_archiver: Callable[..., Archiver]
+) -> None:
+    """Test that the configured compression level changes the output."""
+    words = random.Random(0).choices(["alpha", "beta", "gamma", "delta"], k=50_000)
+    (project / "data.bin").write_text(" ".join(words))
+    fast = make_archiver(tmp_path / "fast", compression_level=0).archive(project)
+    best = make_archiver(tmp_path / "best", compression_level=9).archive(project)
+    assert fast.stat().st_size != best.stat().st_size
+
+    with pytest.raises(ValueError):
+        make_archiver(tmp_path / "bad", compression_level=12).archive(project)
+
+
+def test_archive_writes_manifest(project: Path, archiver: Archiver) -> None:
+    """Test that archive info is answered from the manifest sidecar."""
+    (project / "link").symlink_to("data.bin")
+    archive_path = archiver.archive(project)
+
+    sidecar = manifest_path(archive_path)
+    assert sidecar.name.endswith(".xz.manifest")
+    assert archiver.list_archives() == [archive_path]
+
+    entries = {entry.name: entry for entry in iter_entries(sidecar)}
+    data = entries["myproject/data.bin"]
+    assert data.type == "file"
+    assert data.size == 200_000
+    assert (
+        data.sha256 == hashlib.sha256((project / "data.bin").read_bytes()).hexdigest()
+    )
+    assert entries["myproject/link"].type == "symlink"
+    assert entries["myproject/src"].type == "dir"
+
+    with tarfile.open(archive_path, "r:*") as tar:
+        assert tar.getnames() == list(entries)
+
+    info = archiver.get_archive_info(archive_path)
+    assert info["source"] == project
+    assert info["codec"] == "xz"
+    assert info["file_count"] == len(entries)
+    assert info["total_size"] == 200_000 + (project / "src" / "main.py").stat().st_size
+
+    # Without the sidecar the same answer is computed by streaming
+    sidecar.unlink()
+    legacy = archiver.get_archive_info(archive_path)
+    for key in ("file_count", "total_size", "uncompressed_size", "size"):
+        assert legacy[key] == info[key]
+    assert legacy["source"] is None
+
+
+def test_failed_archive_leaves_no_manifest(
+    tmp_path: Path, project: Path, monkeypatch: pytest.MonkeyPatch, archiver: Archiver
+) -> None:
+    """Test that a failed archive removes the archive and its manifest."""
+
+    def fail(*args: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr("projectpruner.core.archiver._add_tree", fail)
+    with pytest.raises(RuntimeError):
+        archiver.archive(project)
+    assert list((tmp_path / "archives").iterdir()) == []
+
+
+def test_archive_written_under_partial_name(
+    tmp_path: Path, project: Path, monkeypatch: pytest.MonkeyPatch, archiver: Archiver
+) -> None:
+    """Test that an archive only gets its real name once it is complete."""
+    seen = []
+    add_tree = archiver_module._add_tree
+
+    def spy(*args: Any, **kwargs: Any) -> int:
+        seen.extend(path.name for path in (tmp_path / "archives").iterdir())
+        return add_tree(*args, **kwargs)
+
+    monkeypatch.setattr(archiver_module, "_add_tree", spy)
+    archive_path = archiver.archive(project)
+
+    assert any(name.endswith(".xz.part") for name in seen)
+    assert not any(".tar." in name for name in seen)
+    assert archiver.is_intact(archive_path)
+    assert archiver.find_archive(project) == archive_path
+    archive_path.write_bytes(b"truncated")
+    assert not archiver.is_intact(archive_path)
+    assert archiver.find_archive(project) is None
+
+
+def test_random_access_restore(
+    tmp_path: Path, project: Path, make_archiver: Callable[..., Archiver]
+) -> None:
+    """Test that a single file is restored from only the blocks it needs."""
+    (project / ".env").write_text("SECRET=1\n")
+    (project / "big.bin").write_bytes(os.urandom(3_000_000))
+    archiver = make_archiver(compression_level=0)
+    archive_path = archiver.archive(project)
+
+    with open(archive_path, "rb") as raw:
+        reader = XZBlockReader(raw)
+        assert len(reader.blocks) > 2
+        entries = {
+            entry.name: entry for entry in iter_entries(manifest_path(archive_path))
+        }
+        reader.seek(entries["myproject/.env"].offset or 0)
+        with tarfile.TarFile(fileobj=reader) as tar:  # type: ignore[arg-type]
+            assert tar.next().name == "myproject/.env"  # type: ignore[union-attr]
+        assert reader.blocks_read == 1
+
+    names = archiver.extract(archive_path, [".env"], tmp_path / "out")
+    assert names == ["myproject/.env"]
+    assert (tmp_path / "out" / "myproject" / ".env").read_text() == "SECRET=1\n"
+    assert not (tmp_path / "out" / "myproject" / "big.bin").exists()
+
+    # Existing files are not overwritten, and a directory brings its subtree
+    with pytest.raises(ValueError):
+        archiver.extract(archive_path, [".env"], tmp_path / "out")
+    archiver.restore(archive_path, destination=tmp_path / "out", paths=["src"])
+    assert (tmp_path / "out" / "myproject" / "src" / "main.py").exists()
+
+
+@pytest.mark.parametrize("compress", ["xz", "gz"])
+def test_selective_restore_streaming_fallback(
+    tmp_path: Path, project: Path, compress: str, archiver: Archiver
+) -> None:
+    """Test that archives without a manifest are filtered while streaming."""
+    archive_path = archiver.archive(project, compress=compress)  # type: ignore[arg-type]
+    manifest_path(archive_path).unlink()
+
+    names = archiver.extract(archive_path, ["**/*.py"], tmp_path / "out")
+    assert names == ["myproject/src/main.py"]
+    with pytest.raises(ValueError):
+        archiver.extract(archive_path, ["missing"], tmp_path / "none")
+    assert not (tmp_path / "none").exists()
+
+
+def test_failed_restore_removes_destination(
+    tmp_path: Path, project: Path, archiver: Archiver
+) -> None:
+    """Test that a restore that fails halfway leaves no partial destination."""
+    archive_path = archiver.archive(project, compress="gz")  # type: ignore[arg-type]
+    data = archive_path.read_bytes()
+    archive_path.write_bytes(data[: len(data) // 2])
+
+    with pytest.raises(RuntimeError):
+        archiver.restore(archive_path, destination=tmp_path / "restored", jobs=2)
+    assert not (tmp_path / "restored").exists()
+
+
+def test_incremental_archive_chain(
+    tmp_path: Path, project: Path, archiver: Archiver
+) -> None:
+    """Test that deltas store only changes and restore replays the chain."""
+    full = archiver.archive(project, incremental=True)
+    assert read_summary(manifest_path(full)).base is None  # type: ignore[union-attr]
+    assert archiver.archive(project, incremental=True) == full
+
+    (project / "src" / "main.py").write_text("print('changed')\n")
+    (project / "src" / "new.py").write_text("x = 1\n")
+    (project / "data.bin").unlink()
+    (project / "docs").mkdir()
+    delta = archiver.archive(project, incremental=True)
+
+    summary = read_summary(manifest_path(delta))
+    assert summary is not None
+    assert summary.base == full.name
+    assert delta.name == full.name.replace(".tar.xz", "-2.tar.xz")
+    assert summary.deleted == ["myproject/data.bin"]
+    with tarfile.open(delta, "r:*") as tar:
+        names = tar.getnames()
+    assert "myproject/src/new.py" in names
+    assert "myproject/docs" in names
+
+    (project / "src" / "extra.py").write_text("y = 2\n")
+    latest = archiver.archive(project, compress="gz", incremental=True)
+    with tarfile.open(latest, "r:*") as tar:
+        assert [name for name in tar.getnames() if name.endswith(".py")] == [
+            "myproject/src/extra.py"
+        ]
+    entries = {entry.name: entry for entry in iter_entries(manifest_path(latest))}
+    assert entries["myproject/src/main.py"].archive == delta.name
+
+    restored = archiver.restore(latest, destination=tmp_path / "restored", jobs=2)
+    for path in project.rglob("*"):
+        target = restored / "myproject" / path.relative_to(project)
+        assert target.exists()
+        if path.is_file():
+            assert target.read_bytes() == path.read_bytes()
+    assert not (restored / "myproject" / "data.bin").exists()
+
+    names = archiver.extract(latest, ["src/*.py"], tmp_path / "partial")
+    assert sorted(names) == [
+        "myproject/src/extra.py",
+        "myproject/src/main.py",
+        "myproject/src/new.py",
+    ]
+
+    delta.unlink()
+    with pytest.raises(ValueError):
+        archiver.restore(latest, destination=tmp_path / "broken")
+    assert not (tmp_path / "broken").exists()
+
+
+def test_incremental_compare_hash(project: Path, archiver: Archiver) -> None:
+    """Test that hash comparison catches edits that keep size and mtime."""
+    full = archiver.archive(project, incremental=True)
+    main = project / "src" / "main.py"
+    stat = main.stat()
+    main.write_text(main.read_text().replace("hello", "HELLO"))
+    os.utime(main, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert archiver.archive(project, incremental=True) == full
+    delta = archiver.archive(project, incremental=True, compare_hash=True)
+    assert delta != full
+
+
+@pytest.mark.parametrize("backend", ["tar", "store"])
+def test_archive_and_remove(
+    tmp_path: Path, project: Path, backend: str, archiver: Archiver
+) -> None:
+    """Test that artifacts are left out of the archive and the project removed."""
+    (project / "node_modules" / "pkg").mkdir(parents=True)
+    (project / "node_modules" / "pkg" / "index.js").write_text("x")
+    (project / "src" / "__pycache__").mkdir()
+    (project / "src" / "__pycache__" / "main.pyc").write_bytes(b"\0")
+
+    archive_path, result = archiver.archive_and_remove(project, backend=backend)
+
+    assert result.ok
+    assert not project.exists()
+    restored = archiver.restore(archive_path, tmp_path / "restored")
+    root = restored / project.name
+    names = {p.relative_to(root).as_posix() for p in root.rglob("*")}
+    assert names == {"src", "src/main.py", "data.bin"}
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+
+from projectpruner.core.cleaner import Cleaner
+from projectpruner.core.matcher import PatternMatcher
+from projectpruner.models.config import CleanConfig, Config
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """Create a project with nested artifacts."""
+    project = tmp_path / "project"
+    files = [
+        "src/app.py",
+        "src/__pycache__/app.cpython-311.pyc",
+        "lib/helper.pyc",
+        "node_modules/left-pad/index.js",
+        "node_modules/left-pad/node_modules/dep/index.js",
+        "packages/ui/node_modules/react/index.js",
+        "packages/ui/dist/bundle.js",
+        "vendor/bin/tool",
+        ".DS_Store",
+    ]
+    for name in files:
+        path = project / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("content")
+    return project
+
+
+@pytest.mark.parametrize(
+    "pattern, path, expected",
+    [
+        ("**/node_modules", "node_modules", True),
+        ("**/node_modules", "a/b/node_modules", True),
+        ("**/node_modules", "node_modules_old", False),
+        ("**/*.pyc", "pkg/mod.pyc", True),
+        ("**/*.pyc", "pkg/mod.pyc/inner", False),
+        ("build", "build", True),
+        ("build", "src/build", False),
+        ("src/*/cache", "src/pkg/cache", True),
+        ("src/*/cache", "src/a/b/cache", False),
+        ("*.log[0-9]", "app.log1", True),
+        ("*.log[!0-9]", "app.log1", False),
+    ],
+)
+def test_pattern_matcher(pattern: str, path: str, expected: bool) -> None:
+    """Test glob semantics of the compiled matcher."""
+    assert PatternMatcher([pattern]).matches(path) is expected
+
+
+def test_exclude_patterns_match_from_the_right() -> None:
+    """Test that exclude patterns behave like Path.match."""
+    matcher = PatternMatcher(["**/bin", "**/cache"], ["**/vendor/bin", "cache"])
+    assert matcher.matches("tools/bin")
+    assert not matcher.matches("vendor/bin")
+    assert not matcher.matches("a/vendor/bin")
+    assert not matcher.matches("deep/cache")
+
+
+def test_plan_prunes_matched_directories(project: Path) -> None:
+    """Test that one walk finds artifacts without descending into them."""
+    cleaner = Cleaner(Config(clean=CleanConfig(exclude_patterns=["**/vendor/bin"])))
+    found = {
+        entry.path.relative_to(project).as_posix() for entry in cleaner.plan(project)
+    }
+    assert found == {
+        "src/__pycache__",
+        "lib/helper.pyc",
+        "node_modules",
+        "packages/ui/node_modules",
+        "packages/ui/dist",
+        "vendor",
+        ".DS_Store",
+    }
+
+
+def test_plan_carries_sizes(project: Path) -> None:
+    """Test that plan entries are sized during discovery."""
+    plan = Cleaner(Config()).plan(project)
+    entries = {entry.path.relative_to(project).as_posix(): entry for entry in plan}
+    assert entries["node_modules"].is_dir
+    assert entries["node_modules"].file_count == 2
+    assert entries["node_modules"].size == 14
+    assert not entries["lib/helper.pyc"].is_dir
+    assert entries["lib/helper.pyc"].size == 7
+    assert plan.file_count == 8
+    assert plan.total_size == 56
+    assert {entry.device for entry in plan} == {project.stat().st_dev}
+
+
+def test_clean_dry_run_keeps_files(project: Path) -> None:
+    """Test that a dry run reports the plan without removing anything."""
+    plan = Cleaner(Config()).clean(project, dry_run=True)
+    assert len(plan) == 7
+    assert (project / "node_modules").exists()
+
+
+def test_clean_removes_artifacts(project: Path) -> None:
+    """Test that clean removes matched paths and keeps sources."""
+    Cleaner(Config()).clean(project)
+    assert (project / "src" / "app.py").exists()
+    assert not (project / "node_modules").exists()
+    assert not (project / "packages" / "ui" / "dist").exists()
+    assert not (project / "lib" / "helper.pyc").exists()
@@ -1,12 +1,23 @@
+import os
 import shutil
+import subprocess
+import sys
 import tarfile
 import time
 from pathlib import Path
+from typing import Callable, List, Tuple
 
-from click.testing import CliRunner
+import pytest
+from click.testing import CliRunner, Result
 
 # Import the CLI function directly
 from projectpruner.cli import main
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.journal import VERIFIED, Journal, journal_path
+from projectpruner.core.store import ChunkStore
+from projectpruner.core.trash import Trash
+from projectpruner.models.config import ArchiveConfig, Config
+from projectpruner.utils.filesystem import LOCKING_SUPPORTED
 
 
 def test_cli_help() -> None:
@@ -17,6 +28,19 @@ def test_cli_help() -> None:
     assert "Usage:" in result.output
 
 
+def test_cli_import_is_lazy() -> None:
+    """Test that importing the CLI leaves heavy dependencies unloaded."""
+    heavy = ["rich", "yaml", "lzma", "tarfile", "projectpruner.core.archiver"]
+    code = (
+        "import sys, projectpruner.cli; "
+        f"print([name for name in {heavy!r} if name in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
 def test_init_config(tmp_path: Path) -> None:
     """Test the init-config command."""
     config_path = tmp_path / "config.yaml"
@@ -177,3 +201,120 @@ clean:
     assert result.exit_code == 0, "Clean command should succeed"
     assert not (project_dir / "node_modules").exists(), "node_modules should be removed"
     assert (project_dir / "file.txt").exists(), "Regular files should not be removed"
+
+
+ParentFactory = Callable[[List[str]], Tuple[Path, Path]]
+
+
+@pytest.fixture
+def make_parent(tmp_path: Path, make_project: Callable[..., Path]) -> ParentFactory:
+    """Factory for node_modules projects under one parent, plus a config file."""
+
+    def make(names: List[str]) -> Tuple[Path, Path]:
+        parent = tmp_path / "projects"
+        for name in names:
+            make_project(parent / name, {"node_modules/dep.js": "dep", "main.py": name})
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(f"archive:\n  archive_dir: {tmp_path / 'archives'}\n")
+        return parent, config_path
+
+    return make
+
+
+def test_clean_trash_untrash_and_reclaim(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, make_parent: ParentFactory
+) -> None:
+    """Test that trashed artifacts can be listed, put back and reclaimed."""
+    monkeypatch.setattr(Trash, "DEFAULT_HOME", tmp_path / "trash")
+    monkeypatch.setattr(Trash, "DEFAULT_REGISTRY", tmp_path / "trash_roots")
+    parent, config_path = make_parent(["app", "lib"])
+    runner = CliRunner()
+
+    def run(*args: str) -> str:
+        result = runner.invoke(main, ["--config", str(config_path), *args])
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    clean = ["clean", str(parent), "-u", "0d", "--no-cache", "--trash", "--keep-trash"]
+    run(*clean)
+    assert not list(parent.glob("*/node_modules"))
+    assert len(list(parent.glob("*/main.py"))) == 2
+    assert run("reclaim", "--list").count("1 files, 3 bytes") == 2
+
+    run("untrash", str(parent / "app"))
+    assert (parent / "app" / "node_modules" / "dep.js").read_text() == "dep"
+    assert not (parent / "lib" / "node_modules").exists()
+
+    run(*clean)
+    assert "Reclaimed 2 items (2 files)" in run("reclaim")
+    assert run("reclaim", "--list").strip() == ""
+    run("untrash")
+    assert not list(parent.glob("*/node_modules"))
+    assert (parent / "app" / "main.py").exists()
+
+
+def test_gc_command(tmp_path: Path, make_parent: ParentFactory) -> None:
+    """Test that gc reclaims released snapshots and refuses a busy store."""
+    parent, config_path = make_parent(["app", "lib"])
+    (parent / "app" / "data.bin").write_bytes(os.urandom(50_000))
+    runner = CliRunner()
+
+    def run(*args: str) -> Result:
+        return runner.invoke(main, ["--config", str(config_path), *args])
+
+    result = run("archive", str(parent), "-u", "0d", "--no-cache", "--backend", "store")
+    assert result.exit_code == 0, result.output
+    assert list(parent.iterdir()) == []
+    archive_dir = tmp_path / "archives"
+    (snapshot,) = archive_dir.glob("app_*.snapshot")
+    snapshot.unlink()
+
+    store = ChunkStore(archive_dir / "store")
+    if LOCKING_SUPPORTED:
+        with store, store.locked():
+            result = run("gc")
+        assert result.exit_code == 1
+        assert "in use" in result.output
+
+    packs = archive_dir / "store" / "packs"
+    size_before = sum(path.stat().st_size for path in packs.iterdir())
+    result = run("gc")
+    assert result.exit_code == 0, result.output
+    assert sum(path.stat().st_size for path in packs.iterdir()) < size_before
+    (restored,) = archive_dir.glob("lib_*.snapshot")
+    result = run("restore", str(restored), "-d", str(tmp_path / "restored"))
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "restored" / "lib" / "main.py").read_text() == "lib"
+
+
+def test_archive_resume_command(tmp_path: Path, make_parent: ParentFactory) -> None:
+    """Test that archive --resume finishes an interrupted run without redoing it."""
+    parent, config_path = make_parent(["archived", "fresh"])
+    archiver = Archiver(
+        Config(archive=ArchiveConfig(archive_dir=tmp_path / "archives"))
+    )
+    journal = Journal(journal_path(archiver.archive_dir, parent))
+    verified = archiver.archive(parent / "archived")
+    journal.record(parent / "archived", VERIFIED, verified)
+    journal.close()
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "--config",
+            str(config_path),
+            "archive",
+            str(parent),
+            "-u",
+            "0d",
+            "--no-cache",
+            "--resume",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert list(parent.iterdir()) == []
+    archives = sorted(archiver.archive_dir.glob("*.tar.xz"))
+    assert [path.name.split("_")[0] for path in archives] == ["archived", "fresh"]
+    assert archives[0] == verified
+    assert not journal.path.exists()
@@ -0,0 +1,90 @@
+import io
+import os
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from projectpruner.core import extractor
+from projectpruner.core.extractor import Extractor, extract_archive
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    """Create an archive with files, links and directory metadata."""
+    project = tmp_path / "project"
+    (project / "src" / "pkg").mkdir(parents=True)
+    for index in range(50):
+        (project / "src" / "pkg" / f"module{index}.py").write_text(f"x = {index}\n")
+    (project / "big.bin").write_bytes(os.urandom(300_000))
+    (project / "run.sh").write_text("#!/bin/sh\n")
+    (project / "run.sh").chmod(0o755)
+    (project / "link").symlink_to("run.sh")
+    os.link(project / "run.sh", project / "hardlink.sh")
+    os.utime(project / "src", (1_000_000_000, 1_000_000_000))
+
+    archive_path = tmp_path / "project.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as tar:
+        tar.add(project, arcname="project")
+    return archive_path
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_extract_matches_tarfile(
+    tmp_path: Path, archive: Path, jobs: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that parallel extraction restores contents and metadata."""
+    # Exercise both the writer pool and the inline path for large files
+    monkeypatch.setattr(extractor, "INLINE_FILE_SIZE", 100_000)
+    result = Extractor(jobs=jobs).extract(archive, tmp_path / "out")
+    with tarfile.open(archive) as tar:
+        tar.extractall(tmp_path / "expected")
+
+    out = tmp_path / "out" / "project"
+    expected = tmp_path / "expected" / "project"
+    for path in expected.rglob("*"):
+        restored = out / path.relative_to(expected)
+        assert os.lstat(restored).st_mode == os.lstat(path).st_mode
+        if path.is_file() and not path.is_symlink():
+            assert restored.read_bytes() == path.read_bytes()
+    assert os.readlink(out / "link") == "run.sh"
+    assert (out / "src").stat().st_mtime == 1_000_000_000
+    assert (out / "hardlink.sh").stat().st_ino == (out / "run.sh").stat().st_ino
+
+    assert result.dirs == 3
+    assert result.files == 54
+    assert result.bytes == sum(
+        path.stat().st_size
+        for path in expected.rglob("*")
+        if path.is_file() and not path.is_symlink() and path.name != "hardlink.sh"
+    )
+    assert result.files_per_second > 0
+
+
+def add_member(tar: tarfile.TarFile, name: str, **attrs: object) -> None:
+    """Add a small member with the given attributes to an archive."""
+    info = tarfile.TarInfo(name)
+    for key, value in attrs.items():
+        setattr(info, key, value)
+    tar.addfile(info, io.BytesIO(b"x" * info.size))
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        [("../evil.txt", {"size": 1})],
+        [("/tmp/evil.txt", {"size": 1})],
+        [("escape", {"type": tarfile.SYMTYPE, "linkname": "/tmp"}), ("escape/x", {})],
+        [("hard", {"type": tarfile.LNKTYPE, "linkname": "../../etc/passwd"})],
+    ],
+)
+def test_extract_rejects_escaping_members(tmp_path: Path, members: list) -> None:
+    """Test that members cannot be written outside the destination."""
+    archive_path = tmp_path / "evil.tar"
+    with tarfile.open(archive_path, "w") as tar:
+        for name, attrs in members:
+            add_member(tar, name, **attrs)
+
+    with pytest.raises(ValueError):
+        extract_archive(archive_path, tmp_path / "out", jobs=2)
+    assert not (tmp_path / "evil.txt").exists()
@@ -0,0 +1,121 @@
+import os
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from projectpruner.core.finder import ProjectFinder
+from projectpruner.core.index import ScanIndex
+from projectpruner.models.config import Config
+
+
+@pytest.fixture
+def make_projects(make_project: Callable[..., Path]) -> Callable[[Path, int], None]:
+    """Factory for small projects of growing size beside non-projects."""
+
+    def make(parent: Path, count: int) -> None:
+        for index in range(count):
+            make_project(
+                parent / f"project{index:02d}", {"main.py": b"x" * (index + 1)}
+            )
+        (parent / "empty").mkdir()
+        (parent / "notes.txt").write_text("not a project")
+
+    return make
+
+
+def test_scan_projects_keeps_order(
+    tmp_path: Path, make_projects: Callable[[Path, int], None]
+) -> None:
+    """Test that concurrent scanning returns projects in a stable order."""
+    make_projects(tmp_path, 12)
+    finder = ProjectFinder(Config())
+    candidates = finder.list_candidates(tmp_path)
+    serial = finder.scan_projects(candidates, jobs=1)
+    parallel = finder.scan_projects(candidates, jobs=8)
+    assert [p.path for p in parallel] == [p.path for p in serial]
+    assert [p.name for p in parallel] == [f"project{i:02d}" for i in range(12)]
+    assert [p.size for p in parallel] == list(range(1, 13))
+
+
+def test_find_uses_parallel_scan(
+    tmp_path: Path, make_projects: Callable[[Path, int], None]
+) -> None:
+    """Test that find applies criteria to concurrently scanned projects."""
+    make_projects(tmp_path, 5)
+    config = Config(search_paths=[tmp_path])
+    projects = ProjectFinder(config).find(larger_than="0KB", jobs=4)
+    assert [p.name for p in projects] == [f"project{i:02d}" for i in range(5)]
+    assert ProjectFinder(config).find(pattern="project03", jobs=4)[0].size == 4
+
+
+def test_find_filters_by_age_and_size(
+    tmp_path: Path, make_projects: Callable[[Path, int], None]
+) -> None:
+    """Test that age and size filters agree with full scans."""
+    make_projects(tmp_path, 4)
+    for index in (0, 1):
+        main = tmp_path / f"project{index:02d}" / "main.py"
+        os.utime(main, (1_000_000, 1_000_000))
+    finder = ProjectFinder(Config(search_paths=[tmp_path]))
+
+    old = finder.find(older_than="1y", jobs=2)
+    assert [p.name for p in old] == ["project00", "project01"]
+    assert all(p.complete for p in old)
+    assert [p.name for p in finder.find(older_than="1y", larger_than="0KB")] == [
+        "project00",
+        "project01",
+    ]
+    assert finder.find(older_than="1y", pattern="project03") == []
+
+
+def test_stale_index_does_not_select_edited_project(
+    tmp_path: Path, make_projects: Callable[[Path, int], None]
+) -> None:
+    """Test that a file rewritten in place keeps its project from selection."""
+    parent = tmp_path / "projects"
+    make_projects(parent, 1)
+    project = parent / "project00"
+    main = project / "main.py"
+    os.utime(main, (1_000_000, 1_000_000))
+    os.utime(project, (1_000_000, 1_000_000))
+
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        finder = ProjectFinder(Config(), index=index)
+        candidates = finder.list_candidates(parent)
+        assert len(finder.scan_projects(candidates, older_than="1y")) == 1
+
+        # Rewriting in place leaves the directory's mtime and inode as stored
+        main.write_bytes(b"edited")
+        os.utime(project, (1_000_000, 1_000_000))
+        assert finder.scan_projects(candidates, older_than="1y") == []
+
+
+def test_age_selection_does_not_read_index(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    make_projects: Callable[[Path, int], None],
+) -> None:
+    """Test that selecting by age scans projects without the index."""
+    make_projects(tmp_path, 2)
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        finder = ProjectFinder(Config(), index=index)
+        candidates = finder.list_candidates(tmp_path)
+        finder.scan_projects(candidates)
+
+        def load(root: str) -> None:
+            raise AssertionError(f"index read for {root}")
+
+        monkeypatch.setattr(index, "load", load)
+        assert finder.scan_projects(candidates, older_than="1y") == []
+
+
+def test_find_larger_than_reports_full_size(
+    tmp_path: Path, make_project: Callable[..., Path]
+) -> None:
+    """Test that a size filter never returns a partly scanned project."""
+    make_project(tmp_path / "big", {f"file{i}.bin": b"x" * 4096 for i in range(50)})
+
+    (found,) = ProjectFinder(Config(search_paths=[tmp_path])).find(larger_than="10KB")
+    assert found.complete
+    assert (found.size, found.file_count) == (204800, 50)
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.cleaner import Cleaner
+from projectpruner.core.finder import ProjectFinder
+from projectpruner.core.remover import FD_SUPPORTED, Remover
+from projectpruner.models.config import ArchiveConfig, Config
+from projectpruner.models.project import Project
+from projectpruner.utils import fsops
+from projectpruner.utils.profiler import Profiler, set_profiler
+
+SOURCE_DIRS = 20
+ARTIFACT_DIRS = 30
+FILES_PER_DIR = 50
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Tuple[Path, int, int]:
+    """Create a project of 2500 files; return it with its file and dir counts."""
+    project = tmp_path / "project"
+    for index in range(SOURCE_DIRS):
+        directory = project / "src" / f"mod{index}"
+        directory.mkdir(parents=True)
+        for name in range(FILES_PER_DIR):
+            (directory / f"file{name}.py").write_text("x")
+    for index in range(ARTIFACT_DIRS):
+        directory = project / "node_modules" / f"pkg{index}"
+        directory.mkdir(parents=True)
+        for name in range(FILES_PER_DIR):
+            (directory / f"file{name}.js").write_text("y")
+    files = (SOURCE_DIRS + ARTIFACT_DIRS) * FILES_PER_DIR
+    dirs = SOURCE_DIRS + ARTIFACT_DIRS + 2  # plus src/ and node_modules/
+    return project, files, dirs
+
+
+def test_counting_disabled_by_default() -> None:
+    """Test that nothing is counted outside a counting block."""
+    before = fsops.snapshot()
+    fsops.count("stat")
+    assert fsops.snapshot() == before
+
+
+def test_scan_stat_budget(tree: Tuple[Path, int, int]) -> None:
+    """Test that scanning a project stats each file once and lists each dir once."""
+    project, files, dirs = tree
+    with fsops.counting() as ops:
+        Project.from_path(project)
+    assert ops["stat"] <= files
+    assert ops["scandir"] <= dirs + 1
+
+
+def test_recent_project_scan_stops_at_first_file(tree: Tuple[Path, int, int]) -> None:
+    """Test that the age filter rejects a recent project after one stat."""
+    project, files, dirs = tree
+    finder = ProjectFinder(Config())
+    cutoff = datetime.now() - timedelta(days=1)
+    with fsops.counting() as ops:
+        assert finder._load_matching(project, cutoff, None) is None
+    assert ops["stat"] == 1
+    assert ops["scandir"] < dirs
+
+
+def test_plan_stat_budget(tree: Tuple[Path, int, int]) -> None:
+    """Test that planning a clean only stats what it removes."""
+    project, files, dirs = tree
+    with fsops.counting() as ops:
+        plan = Cleaner(Config()).plan(project)
+    assert plan.file_count == ARTIFACT_DIRS * FILES_PER_DIR
+    # One stat for the matched node_modules, one per file below it
+    assert ops["stat"] <= plan.file_count + 1
+    # Source files are matched by name only, never stat'ed
+    assert ops["scandir"] <= dirs + 1
+
+
+@pytest.mark.skipif(not FD_SUPPORTED, reason="fd-relative removal is POSIX-only")
+def test_remove_budget(tree: Tuple[Path, int, int]) -> None:
+    """Test that removing a tree unlinks each file and removes each dir once."""
+    project, files, dirs = tree
+    with fsops.counting() as ops, Remover(jobs=4) as remover:
+        remover.remove(project)
+    assert ops["unlink"] == files
+    assert ops["rmdir"] == dirs + 1
+    # Each subdirectory is checked to be the one listed before entering it
+    assert ops["stat"] == 2 * dirs
+
+
+def test_archive_counts_recorded_by_profiler(
+    tmp_path: Path, tree: Tuple[Path, int, int]
+) -> None:
+    """Test that --profile phases carry their filesystem operation counts."""
+    project, files, dirs = tree
+    archiver = Archiver(Config(archive=ArchiveConfig(archive_dir=tmp_path / "out")))
+    profiler = set_profiler(Profiler(enabled=True))
+    try:
+        archiver.archive_and_remove(project, jobs=2)
+    finally:
+        set_profiler(None)
+
+    ops = {record.phase: record.ops for record in profiler.records}
+    kept_files = SOURCE_DIRS * FILES_PER_DIR
+    # node_modules is excluded by name, so nothing below it is visited
+    assert ops["archive"]["stat"] <= kept_files + SOURCE_DIRS + 2
+    assert ops["archive"]["open"] == kept_files
+    assert ops["remove"]["unlink"] == files
+    assert not project.exists()
@@ -0,0 +1,148 @@
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+import pytest
+
+from projectpruner.cli import _archive_projects
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.journal import (
+    ARCHIVING,
+    REMOVED,
+    SCANNED,
+    VERIFIED,
+    Journal,
+    journal_path,
+)
+from projectpruner.core.manifest import ManifestWriter
+from projectpruner.models.config import ArchiveConfig, Config
+
+
+def test_journal_keeps_latest_state(tmp_path: Path) -> None:
+    """Test that the last state per project wins and torn lines are ignored."""
+    journal = Journal(tmp_path / "run.journal")
+    journal.record(tmp_path / "one", SCANNED)
+    journal.record(tmp_path / "one", VERIFIED, tmp_path / "one.tar.xz")
+    journal.record(tmp_path / "two", SCANNED)
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('{"project": "/torn", "sta')
+
+    entries = Journal(journal.path).entries()
+    assert sorted(entries) == [str(tmp_path / "one"), str(tmp_path / "two")]
+    assert entries[str(tmp_path / "one")].archive == str(tmp_path / "one.tar.xz")
+    assert not entries[str(tmp_path / "one")].done
+
+
+def test_resume_continues_from_journal(tmp_path: Path) -> None:
+    """Test that a resumed run only does the work the journal lacks."""
+    parent = tmp_path / "projects"
+    for name in ("archived", "finished", "removed", "fresh"):
+        (parent / name).mkdir(parents=True)
+        (parent / name / "main.py").write_text(name)
+    config = Config(archive=ArchiveConfig(archive_dir=tmp_path / "archives"))
+    archiver = Archiver(config)
+
+    # State left behind by a run that was killed part way through
+    journal = Journal(journal_path(archiver.archive_dir, parent))
+    verified = archiver.archive(parent / "archived")
+    journal.record(parent / "archived", VERIFIED, verified)
+    journal.record(parent / "finished", ARCHIVING)
+    time.sleep(0.01)
+    finished = archiver.archive(parent / "finished")
+    journal.record(parent / "removed", REMOVED)
+    journal.close()
+
+    results = _archive_projects(
+        config, parent, "0d", None, jobs=None, no_cache=True, resume=True
+    )
+
+    by_name = {result.item.name: result for result in results}
+    assert by_name["archived"].value[0] == verified
+    assert by_name["finished"].value[0] == finished
+    assert by_name["removed"].skipped
+    assert by_name["fresh"].ok
+    # Nothing was archived twice, and the journal is gone once all is done
+    assert len(list(archiver.archive_dir.glob("*.tar.xz"))) == 3
+    assert [path.name for path in parent.iterdir()] == ["removed"]
+    assert not journal.path.exists()
+
+
+def test_resume_after_crash_between_manifest_and_rename(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a run killed between manifest and rename can be resumed."""
+    parent = tmp_path / "projects"
+    (parent / "project").mkdir(parents=True)
+    (parent / "project" / "main.py").write_text("data")
+    config = Config(archive=ArchiveConfig(archive_dir=tmp_path / "archives"))
+    archiver = Archiver(config)
+    journal = Journal(journal_path(archiver.archive_dir, parent))
+    journal.record(parent / "project", ARCHIVING)
+    journal.close()
+
+    # Stop the run between writing the manifest and renaming the archive,
+    # whichever of the two comes second
+    replace, commit = os.replace, ManifestWriter.commit
+    steps: List[str] = []
+
+    def step(name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        def run(*args: Any, **kwargs: Any) -> Any:
+            if steps:
+                raise KeyboardInterrupt
+            steps.append(name)
+            return function(*args, **kwargs)
+
+        return run
+
+    def rename(source: Any, target: Any) -> Any:
+        if not str(source).endswith(".part"):
+            return replace(source, target)
+        return step("rename", replace)(source, target)
+
+    monkeypatch.setattr(os, "replace", rename)
+    monkeypatch.setattr(ManifestWriter, "commit", step("manifest", commit))
+    with pytest.raises(KeyboardInterrupt):
+        archiver.archive(parent / "project")
+    monkeypatch.undo()
+    assert archiver.find_archive(parent / "project") is None
+
+    (result,) = _archive_projects(
+        config, parent, "0d", None, jobs=None, no_cache=True, resume=True
+    )
+
+    assert result.ok, result.error
+    archive = result.value[0]
+    assert archiver.is_intact(archive)
+    assert archiver.find_archive(parent / "project") == archive
+    assert not (parent / "project").exists()
+
+
+@pytest.mark.parametrize("resume", [True, False])
+def test_rerun_discards_unfinished_files_from_earlier_days(
+    tmp_path: Path, resume: bool
+) -> None:
+    """Test that a rerun on a later day removes what the interrupted run left."""
+    parent = tmp_path / "projects"
+    (parent / "app").mkdir(parents=True)
+    (parent / "app" / "main.py").write_text("data")
+    config = Config(archive=ArchiveConfig(archive_dir=tmp_path / "archives"))
+    archiver = Archiver(config)
+    journal = Journal(journal_path(archiver.archive_dir, parent))
+    journal.record(parent / "app", ARCHIVING)
+    journal.close()
+    leftovers = ["app_2020-01-01.xz.part", "app_2020-01-01-2.xz.manifest.body.tmp"]
+    kept = ["app_old_2020-01-01.xz.part", "other_2020-01-01.xz.part"]
+    for name in leftovers + kept:
+        (archiver.archive_dir / name).write_text("partial")
+
+    (result,) = _archive_projects(
+        config, parent, "0d", None, jobs=None, no_cache=True, resume=resume
+    )
+
+    assert result.ok, result.error
+    names = sorted(path.name for path in archiver.archive_dir.iterdir())
+    assert not any(name in names for name in leftovers)
+    assert all(name in names for name in kept)
+    assert "journal" not in names
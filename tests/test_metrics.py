@@ -0,0 +1,149 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from click.testing import CliRunner
+
+from projectpruner.cli import _record_archive_results, main
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.manifest import manifest_path
+from projectpruner.core.pipeline import PipelineResult
+from projectpruner.core.remover import RemovalResult
+from projectpruner.core.trash import Trash
+from projectpruner.utils.metrics import RunMetrics, read_textfile, write_textfile
+from projectpruner.utils.profiler import get_profiler
+
+SAMPLE = re.compile(r'^[a-z_]+(\{([a-z]+="[^"]*",?)*\})? [0-9.e+-]+|\+Inf$')
+
+
+def test_textfile_merges_runs(tmp_path: Path) -> None:
+    """Test that counters add up across runs while gauges are replaced."""
+    path = tmp_path / "metrics" / "projectpruner.prom"
+    clean = RunMetrics("clean")
+    clean.project("cleaned")
+    clean.removed(1000, 10)
+    write_textfile(path, clean)
+
+    archive = RunMetrics("archive")
+    archive.project("archived")
+    archive.project("failed")
+    archive.archived(3000, 1000)
+    write_textfile(path, archive)
+    clean = RunMetrics("clean")
+    clean.removed(500, 5)
+    write_textfile(path, clean)
+
+    text = path.read_text()
+    for line in text.splitlines():
+        assert line.startswith("# ") or SAMPLE.match(line), line
+    assert text.count("# TYPE projectpruner_freed_bytes_total counter") == 1
+
+    samples = {key: value for key, (_, value) in read_textfile(path).items()}
+    assert samples['projectpruner_freed_bytes_total{command="clean"}'] == 1500
+    assert samples['projectpruner_runs_total{command="clean",status="ok"}'] == 2
+    assert samples['projectpruner_runs_total{command="archive",status="failed"}'] == 1
+    assert samples['projectpruner_last_run_success{command="archive"}'] == 0
+    assert samples['projectpruner_last_run_success{command="clean"}'] == 1
+    ratio = 'projectpruner_compression_ratio_bucket{command="archive",le="%s"}'
+    assert samples[ratio % "2"] == 0 and samples[ratio % "3"] == 1
+    assert samples[ratio % "+Inf"] == 1
+    assert not list(path.parent.glob(".*.tmp"))
+
+
+def test_commands_write_metrics(
+    tmp_path: Path, make_project: Callable[..., Path]
+) -> None:
+    """Test that clean and archive runs update the configured textfile."""
+    parent = tmp_path / "projects"
+    make_project(parent / "one")
+    make_project(parent / "two")
+    metrics_file = tmp_path / "projectpruner.prom"
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        f"archive:\n  archive_dir: {tmp_path / 'archives'}\n"
+        f"metrics_file: {metrics_file}\n"
+    )
+    runner = CliRunner()
+
+    result = runner.invoke(
+        main,
+        ["--config", str(config_path), "clean", str(parent), "-u", "0d"],
+    )
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(
+        main,
+        ["--config", str(config_path), "archive", str(parent), "-u", "0d"],
+    )
+    assert result.exit_code == 0, result.output
+
+    samples = {key: value for key, (_, value) in read_textfile(metrics_file).items()}
+    assert samples['projectpruner_freed_bytes_total{command="clean"}'] == 600
+    outcome = 'projectpruner_projects_total{command="archive",outcome="archived"}'
+    assert samples[outcome] == 2
+    assert samples['projectpruner_compression_ratio_count{command="archive"}'] == 2
+    assert samples['projectpruner_removed_files_total{command="archive"}'] == 2
+    throughput = (
+        "projectpruner_phase_throughput_mb_per_second_count"
+        '{command="archive",phase="archive"}'
+    )
+    assert samples[throughput] == 2
+    assert not get_profiler().enabled
+
+
+def test_trash_counts_bytes_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, make_project: Callable[..., Path]
+) -> None:
+    """Test that trashed bytes count as freed only when reclaim deletes them."""
+    monkeypatch.setattr(Trash, "DEFAULT_HOME", tmp_path / "trash")
+    monkeypatch.setattr(Trash, "DEFAULT_REGISTRY", tmp_path / "trash_roots")
+    parent = tmp_path / "projects"
+    make_project(parent / "one")
+    make_project(parent / "two")
+    metrics_file = tmp_path / "projectpruner.prom"
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(f"metrics_file: {metrics_file}\n")
+    runner = CliRunner()
+
+    clean = ["clean", str(parent), "-u", "0d", "--trash", "--keep-trash"]
+    result = runner.invoke(main, ["--config", str(config_path), *clean])
+    assert result.exit_code == 0, result.output
+    samples = {key: value for key, (_, value) in read_textfile(metrics_file).items()}
+    assert samples['projectpruner_trashed_bytes_total{command="clean"}'] == 600
+    assert samples['projectpruner_freed_bytes_total{command="clean"}'] == 0
+
+    result = runner.invoke(main, ["--config", str(config_path), "reclaim"])
+    assert result.exit_code == 0, result.output
+    samples = {key: value for key, (_, value) in read_textfile(metrics_file).items()}
+    assert samples['projectpruner_freed_bytes_total{command="reclaim"}'] == 600
+    assert samples['projectpruner_removed_files_total{command="reclaim"}'] == 2
+
+
+def test_delta_archive_counts_stored_bytes(
+    tmp_path: Path, archiver: Archiver, make_project: Callable[..., Path]
+) -> None:
+    """Test that an incremental archive counts only the files it holds."""
+    make_project(tmp_path / "app")
+    project = tmp_path / "app"
+    (project / "src" / "data.bin").write_bytes(os.urandom(100_000))
+    archiver.archive(project, incremental=True)
+    (project / "src" / "main.py").write_text("print('changed')\n")
+    delta = archiver.archive(project, incremental=True)
+
+    info = archiver.get_archive_info(delta)
+    assert info["total_size"] > 100_000
+    assert info["stored_size"] == len("print('changed')\n")
+    metrics = RunMetrics("archive")
+    result = PipelineResult(project, (delta, RemovalResult(path=project)))
+    _record_archive_results(archiver, [result], metrics)
+    assert metrics.archived_bytes == info["stored_size"]
+    assert metrics.ratios == [info["stored_size"] / info["size"]]
+
+    # Manifests written before the stored size was recorded add it up
+    manifest = manifest_path(delta)
+    header, body = manifest.read_text().split("\n", 1)
+    legacy = {k: v for k, v in json.loads(header).items() if k != "stored_size"}
+    manifest.write_text(json.dumps(legacy) + "\n" + body)
+    assert archiver.get_archive_info(delta)["stored_size"] == info["stored_size"]
@@ -0,0 +1,100 @@
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+from projectpruner.cli import _archive_projects
+from projectpruner.core.pipeline import Pipeline, PipelineResult, Stage
+from projectpruner.models.config import ArchiveConfig, Config
+
+
+def test_pipeline_isolates_failures() -> None:
+    """Test that a failing or dropped item does not stop the others."""
+
+    def check(value: int) -> int:
+        if value == 3:
+            raise ValueError("bad item")
+        return value
+
+    pipeline = Pipeline(
+        [
+            Stage("filter", lambda value: value if value % 5 else None, workers=2),
+            Stage("check", check, workers=3),
+            Stage("double", lambda value: value * 2),
+        ],
+        queue_size=1,
+    )
+    seen: List[PipelineResult] = []
+    results = pipeline.run(range(10), on_result=seen.append)
+
+    assert [result.item for result in results] == list(range(10))
+    assert len(seen) == 10
+    values = [result.value for result in results if result.ok]
+    assert values == [2, 4, 8, 12, 14, 16, 18]
+    assert [result.item for result in results if result.skipped] == [0, 5]
+    failed = results[3]
+    assert failed.stage == "check" and failed.error == "bad item"
+
+
+def test_pipeline_overlaps_stages() -> None:
+    """Test that a later stage works on one item while an earlier one is busy."""
+    second_started = threading.Event()
+
+    def first(value: int) -> int:
+        # Item 1 is only let through once item 0 has reached the next stage
+        if value == 1:
+            assert second_started.wait(timeout=5)
+        return value
+
+    def second(value: int) -> int:
+        second_started.set()
+        return value
+
+    results = Pipeline([Stage("first", first), Stage("second", second)]).run([0, 1])
+    assert all(result.ok for result in results)
+
+
+def test_pipeline_requires_stages() -> None:
+    """Test that an empty pipeline is rejected."""
+    with pytest.raises(ValueError):
+        Pipeline([])
+
+
+@pytest.mark.parametrize("jobs", [None, 2])
+def test_archive_projects_pipeline(tmp_path: Path, jobs: Optional[int]) -> None:
+    """Test that every selected project is archived and removed."""
+    parent = tmp_path / "projects"
+    for name in ("one", "two", "three"):
+        (parent / name / "src").mkdir(parents=True)
+        (parent / name / "src" / "main.py").write_text(name * 100)
+    (parent / "two" / "node_modules").mkdir()
+    (parent / "two" / "node_modules" / "index.js").write_text("x")
+
+    # An archive left over from an earlier run makes this project fail
+    (parent / "taken").mkdir()
+    (parent / "taken" / "main.py").write_text("x")
+    (tmp_path / "archives").mkdir()
+    today = datetime.now().strftime("%Y-%m-%d")
+    (tmp_path / "archives" / f"taken_{today}.tar.xz").write_bytes(b"")
+
+    archive = ArchiveConfig(
+        archive_dir=tmp_path / "archives", archive_workers=2, cpu_budget=2
+    )
+    results = _archive_projects(
+        Config(archive=archive),
+        parent,
+        "0d",
+        None,
+        jobs=jobs,
+        no_cache=True,
+        verify=True,
+    )
+
+    assert [result.item.name for result in results] == ["one", "taken", "three", "two"]
+    assert [result.ok for result in results] == [True, False, True, True]
+    assert results[1].stage == "archive"
+    assert "already exists" in str(results[1].error)
+    assert [path.name for path in parent.iterdir()] == ["taken"]
+    assert len(list((tmp_path / "archives").glob("*.manifest"))) == 3
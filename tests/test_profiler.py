@@ -0,0 +1,86 @@
+import json
+import pstats
+from pathlib import Path
+from typing import Callable
+
+from click.testing import CliRunner
+
+from projectpruner.cli import main
+from projectpruner.core.cleaner import Cleaner
+from projectpruner.models.config import Config
+from projectpruner.utils.profiler import Profiler, get_profiler, set_profiler
+
+
+def test_profiler_records_phases(
+    tmp_path: Path, make_project: Callable[..., Path]
+) -> None:
+    """Test that instrumented phases report their files and bytes."""
+    make_project(tmp_path / "one")
+    profiler = set_profiler(Profiler(enabled=True, collect_stats=True))
+    try:
+        Cleaner(Config()).clean(tmp_path / "one")
+    finally:
+        set_profiler(None)
+
+    totals = {total.phase: total for total in profiler.totals()}
+    assert set(totals) == {"plan", "remove"}
+    assert totals["plan"].files == 1 and totals["plan"].bytes == 300
+    assert [record.project for record in profiler.records] == [
+        str(tmp_path / "one")
+    ] * 2
+    assert profiler.dump_stats(tmp_path / "out.pstats")
+    assert pstats.Stats(str(tmp_path / "out.pstats")).total_calls > 0
+
+
+def test_disabled_profiler_records_nothing(
+    tmp_path: Path, make_project: Callable[..., Path]
+) -> None:
+    """Test that nothing is recorded while profiling is off."""
+    make_project(tmp_path / "one")
+    assert not get_profiler().enabled
+    Cleaner(Config()).clean(tmp_path / "one")
+
+    profiler = Profiler()
+    with profiler.phase("plan", tmp_path) as record:
+        record.files = 3
+    assert profiler.records == []
+    assert not profiler.dump_stats(tmp_path / "out.pstats")
+
+
+def test_profile_flag(tmp_path: Path, make_project: Callable[..., Path]) -> None:
+    """Test that --profile prints a table and writes a JSON report."""
+    parent = tmp_path / "projects"
+    for name in ("one", "two"):
+        make_project(parent / name)
+    output = tmp_path / "profile.json"
+    stats = tmp_path / "profile.pstats"
+    runner = CliRunner()
+
+    result = runner.invoke(
+        main,
+        [
+            "--profile",
+            "--profile-output",
+            str(output),
+            "--profile-stats",
+            str(stats),
+            "clean",
+            str(parent),
+            "--until",
+            "0d",
+            "--no-cache",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Profile" in result.output
+    report = json.loads(output.read_text())
+    phases = {total["phase"]: total for total in report["phases"]}
+    assert phases["scan"]["runs"] == 2 and phases["scan"]["files"] == 4
+    assert phases["remove"]["bytes"] == 600
+    assert {record["project"] for record in report["records"]} == {
+        str(parent / "one"),
+        str(parent / "two"),
+    }
+    assert stats.exists()
+    assert not get_profiler().enabled
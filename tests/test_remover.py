@@ -0,0 +1,144 @@
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from projectpruner.core.remover import (
+    FD_SUPPORTED,
+    RemovalResult,
+    Remover,
+    remove_tree,
+)
+from projectpruner.models.plan import SourceListing
+
+
+def make_tree(root: Path, width: int = 4, depth: int = 3) -> int:
+    """Create a nested tree and return the number of files in it."""
+    count = 0
+    level = [root]
+    for _ in range(depth):
+        next_level = []
+        for directory in level:
+            directory.mkdir(parents=True, exist_ok=True)
+            for index in range(width):
+                (directory / f"file{index}.txt").write_text("data")
+                count += 1
+                next_level.append(directory / f"dir{index}")
+        level = next_level
+    return count
+
+
+def test_remove_tree_parallel(tmp_path: Path) -> None:
+    """Test that a nested tree is removed completely and counted."""
+    root = tmp_path / "node_modules"
+    files = make_tree(root)
+    (root / "link").symlink_to(tmp_path)
+    progress: List[int] = []
+
+    result = remove_tree(
+        root, jobs=4, on_progress=lambda r: progress.append(r.files_removed)
+    )
+
+    assert result.ok
+    assert result.files_removed == files + 1
+    assert result.dirs_removed == 1 + 4 + 16
+    assert not root.exists()
+    assert tmp_path.exists(), "symlink targets must not be followed"
+    assert progress and progress == sorted(progress)
+
+
+@pytest.mark.skipif(not FD_SUPPORTED, reason="fd-relative removal is POSIX-only")
+def test_remove_does_not_follow_swapped_directory(tmp_path: Path) -> None:
+    """Test that a directory swapped for a symlink mid-walk is not followed."""
+    root = tmp_path / "node_modules"
+    make_tree(root)
+    outside = tmp_path / "outside"
+    make_tree(outside)
+    levels: List[int] = []
+
+    def swap(result: RemovalResult) -> None:
+        levels.append(result.files_removed)
+        if len(levels) == 2:
+            # dir0 is already open; its children are listed but not yet entered
+            (root / "dir0").rename(tmp_path / "moved")
+            (root / "dir0").symlink_to(outside)
+
+    result = remove_tree(root, jobs=2, on_progress=swap)
+
+    assert not result.ok
+    assert len(list(outside.rglob("*.txt"))) == make_tree(tmp_path / "count")
+    assert list((tmp_path / "moved").iterdir()) == []
+
+
+def test_remove_single_file_and_missing_path(tmp_path: Path) -> None:
+    """Test removing plain files and reporting missing paths."""
+    target = tmp_path / "file.pyc"
+    target.write_text("x")
+    assert remove_tree(target).files_removed == 1
+    missing = remove_tree(tmp_path / "missing")
+    assert not missing.ok
+    assert missing.errors[0][0] == tmp_path / "missing"
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason="root ignores permissions")
+def test_remove_reports_errors_and_continues(tmp_path: Path) -> None:
+    """Test that failures are reported per path without stopping."""
+    root = tmp_path / "tree"
+    make_tree(root, width=2, depth=2)
+    locked = root / "dir0"
+    locked.chmod(0o500)
+    try:
+        with Remover(jobs=2) as remover:
+            result: RemovalResult = remover.remove(root)
+    finally:
+        locked.chmod(0o700)
+
+    assert not result.ok
+    assert {path for path, _ in result.errors} >= {locked / "file0.txt", root}
+    assert not (root / "dir1").exists()
+
+
+def test_remove_listed_keeps_unlisted_entries(tmp_path: Path) -> None:
+    """Test that only listed paths are removed and late arrivals are kept."""
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("data")
+    (root / "build").mkdir()
+    (root / "build" / "out.o").write_text("data")
+    listing = SourceListing(
+        root=root,
+        files=[str(root / "src" / "main.py")],
+        directories=[str(root), str(root / "src")],
+        artifacts=[str(root / "build")],
+    )
+    (root / "src" / "late.py").write_text("data")
+
+    result = Remover(jobs=2).remove_listed(listing)
+
+    assert result.files_removed == 2
+    assert sorted(p.name for p in root.rglob("*")) == ["late.py", "src"]
+    assert len(result.errors) == 2
+
+
+def test_remove_listed_does_not_follow_swapped_directory(tmp_path: Path) -> None:
+    """Test that a listed directory swapped for a symlink is not followed."""
+    root = tmp_path / "app"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "a.py").write_text("data")
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    (victim / "a.py").write_text("data")
+    listing = SourceListing(
+        root=root,
+        files=[str(root / "src" / "a.py")],
+        directories=[str(root), str(root / "src")],
+    )
+    (root / "src").rename(tmp_path / "moved")
+    (root / "src").symlink_to(victim)
+
+    result = Remover(jobs=2).remove_listed(listing)
+
+    assert not result.ok
+    assert (victim / "a.py").read_text() == "data"
+    assert (tmp_path / "moved" / "a.py").exists()
@@ -0,0 +1,127 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from projectpruner.core.cleaner import Cleaner
+from projectpruner.core.index import ScanIndex
+from projectpruner.core.scanner import scan_directory
+from projectpruner.models.config import Config
+from projectpruner.models.project import Project
+from projectpruner.utils.filesystem import get_directory_size
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    """Create a small project tree with known sizes and mtimes."""
+    project = tmp_path / "project"
+    (project / "src" / "pkg").mkdir(parents=True)
+    (project / "node_modules").mkdir()
+    (project / "README.md").write_bytes(b"x" * 10)
+    (project / "src" / "main.py").write_bytes(b"x" * 20)
+    (project / "src" / "pkg" / "mod.py").write_bytes(b"x" * 30)
+    (project / "node_modules" / "dep.js").write_bytes(b"x" * 40)
+    os.utime(project / "README.md", (1_000_000, 1_000_000))
+    os.utime(project / "src" / "main.py", (2_000_000, 2_000_000))
+    os.utime(project / "src" / "pkg" / "mod.py", (3_000_000, 3_000_000))
+    os.utime(project / "node_modules" / "dep.js", (1_500_000, 1_500_000))
+    return project
+
+
+def test_scan_directory_single_pass(tree: Path) -> None:
+    """Test that one scan collects size, newest mtime and counts."""
+    result = scan_directory(tree)
+    assert result.size == 100
+    assert result.newest_mtime == 3_000_000
+    assert result.file_count == 4
+    assert result.dir_count == 3
+
+
+def test_scan_directory_skips_symlinks(tree: Path) -> None:
+    """Test that symbolic links are neither followed nor counted."""
+    (tree / "link").symlink_to(tree / "src")
+    (tree / "file_link").symlink_to(tree / "README.md")
+    result = scan_directory(tree)
+    assert result.size == 100
+    assert result.file_count == 4
+
+
+def test_scan_users_agree(tree: Path) -> None:
+    """Test that Project, Cleaner and filesystem helpers share the engine."""
+    project = Project.from_path(tree)
+    assert project.size == 100
+    assert project.last_modified.timestamp() == 3_000_000
+    assert project.file_count == 4
+    assert project.dir_count == 3
+    assert Cleaner(Config())._get_dir_size(tree / "node_modules") == 40
+    assert get_directory_size(tree / "src") == 50
+
+
+def test_project_without_files(tmp_path: Path) -> None:
+    """Test that a directory without files is not treated as a project."""
+    (tmp_path / "empty" / "nested").mkdir(parents=True)
+    with pytest.raises(ValueError):
+        Project.from_path(tmp_path / "empty")
+
+
+def age_directories(root: Path) -> None:
+    """Push directory mtimes out of the racy window."""
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (4_000_000, 4_000_000))
+
+
+def test_scan_index_reuses_unchanged_directories(tree: Path, tmp_path: Path) -> None:
+    """Test that an indexed rescan only re-lists changed directories."""
+    age_directories(tree)
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        first = scan_directory(tree, index=index)
+        assert (first.size, first.file_count, first.dir_count) == (100, 4, 3)
+
+        # An in-place rewrite leaves directory signatures untouched
+        (tree / "src" / "main.py").write_bytes(b"x" * 25)
+        assert scan_directory(tree, index=index).size == 100
+
+        # Adding a file changes the directory mtime and forces a re-list
+        (tree / "src" / "pkg" / "new.py").write_bytes(b"x" * 7)
+        second = scan_directory(tree, index=index)
+        assert second.size == 107
+        assert second.file_count == 5
+
+        index.clear()
+        assert scan_directory(tree, index=index).size == 112
+
+
+def test_project_from_path_with_index(tree: Path, tmp_path: Path) -> None:
+    """Test that indexed and plain scans agree."""
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        indexed = Project.from_path(tree, index=index)
+        again = Project.from_path(tree, index=index)
+    plain = Project.from_path(tree)
+    assert indexed.size == again.size == plain.size
+    assert indexed.last_modified == again.last_modified == plain.last_modified
+    assert indexed.dir_count == plain.dir_count
+
+
+def test_scan_directory_stops_early(tree: Path) -> None:
+    """Test that the walk stops once a file is too new."""
+    recent = scan_directory(tree, stop_newer_than=2_000_000)
+    assert not recent.complete
+    assert recent.newest_mtime is not None and recent.newest_mtime >= 2_000_000
+
+    full = scan_directory(tree, stop_newer_than=3_000_001)
+    assert full.complete
+    assert (full.size, full.file_count, full.dir_count) == (100, 4, 3)
+
+
+def test_partial_scan_not_indexed(tree: Path, tmp_path: Path) -> None:
+    """Test that a scan stopped early leaves the index untouched."""
+    root = os.path.abspath(tree)
+    with ScanIndex(tmp_path / "index.sqlite") as index:
+        partial = scan_directory(tree, index=index, stop_newer_than=0)
+        assert not partial.complete
+        assert index.load(root) == {}
+
+        scan_directory(tree, index=index)
+        stored = index.load(root)
+        scan_directory(tree, index=index, stop_newer_than=0)
+        assert index.load(root) == stored
@@ -0,0 +1,131 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.store import ChunkStore
+from projectpruner.utils.filesystem import LOCKING_SUPPORTED
+
+
+@pytest.fixture
+def make_shared(make_project: Callable[..., Path]) -> Callable[[Path, bytes], Path]:
+    """Factory for projects holding a shared library and some unique files."""
+
+    def make(root: Path, shared: bytes) -> Path:
+        files = {"vendor/lib/shared.js": shared, "main.py": os.urandom(5_000)}
+        make_project(root, files)
+        (root / "link").symlink_to("main.py")
+        return root
+
+    return make
+
+
+@pytest.fixture
+def archiver(make_archiver: Callable[..., Archiver]) -> Archiver:
+    """Create an Archiver using the chunk store backend."""
+    return make_archiver(backend="store")
+
+
+def test_store_deduplicates_across_projects(
+    tmp_path: Path, archiver: Archiver, make_shared: Callable[[Path, bytes], Path]
+) -> None:
+    """Test that shared contents are written to the store only once."""
+    shared = os.urandom(300_000)
+    first = archiver.archive(make_shared(tmp_path / "first", shared))
+    second = archiver.archive(make_shared(tmp_path / "second", shared))
+    assert first.suffix == second.suffix == ".snapshot"
+    assert archiver.list_archives() == [first, second]
+
+    first_info = archiver.get_archive_info(first)
+    second_info = archiver.get_archive_info(second)
+    assert first_info["total_size"] == second_info["total_size"] == 305_000
+    assert first_info["size"] > 300_000
+    assert second_info["size"] < 10_000
+
+    restored = archiver.restore(second, destination=tmp_path / "restored")
+    project = restored / "second"
+    assert (project / "vendor" / "lib" / "shared.js").read_bytes() == shared
+    assert (project / "main.py").read_bytes() == (
+        tmp_path / "second" / "main.py"
+    ).read_bytes()
+    assert os.readlink(project / "link") == "main.py"
+
+    partial = archiver.restore(second, destination=tmp_path / "partial", paths=["*.py"])
+    assert [path.name for path in (partial / "second").iterdir()] == ["main.py"]
+
+
+def test_gc_drops_unreferenced_chunks(
+    tmp_path: Path, archiver: Archiver, make_shared: Callable[[Path, bytes], Path]
+) -> None:
+    """Test that gc keeps shared chunks and reclaims released ones."""
+    shared = os.urandom(200_000)
+    first = archiver.archive(make_shared(tmp_path / "first", shared))
+    second = archiver.archive(make_shared(tmp_path / "second", shared))
+    packs = archiver.store_dir / "packs"
+    size_before = sum(path.stat().st_size for path in packs.iterdir())
+
+    assert archiver.gc().chunks_removed == 0
+    first.unlink()
+    assert archiver.gc(dry_run=True).chunks_removed == 1
+    result = archiver.gc()
+    assert result.chunks_removed == 1
+    assert result.packs_rewritten == 1
+    assert sum(path.stat().st_size for path in packs.iterdir()) < size_before
+
+    archiver.restore(second, destination=tmp_path / "restored")
+    assert (
+        tmp_path / "restored" / "second" / "vendor" / "lib" / "shared.js"
+    ).read_bytes() == shared
+
+    second.unlink()
+    assert archiver.gc().packs_removed == 2
+    assert list(packs.iterdir()) == []
+
+
+@pytest.mark.skipif(not LOCKING_SUPPORTED, reason="store locking needs flock")
+def test_gc_refuses_while_store_is_written(
+    tmp_path: Path, archiver: Archiver, make_shared: Callable[[Path, bytes], Path]
+) -> None:
+    """Test that gc and writers exclude each other through the store lock."""
+    archiver.archive(make_shared(tmp_path / "first", os.urandom(10_000)))
+    added = threading.Event()
+
+    with ChunkStore(archiver.store_dir) as writer, writer.locked():
+        with pytest.raises(RuntimeError, match="in use"):
+            archiver.gc()
+
+        # A second writer waits until the lock is released
+        def add() -> None:
+            archiver.archive(make_shared(tmp_path / "second", b"x"))
+            added.set()
+
+        thread = threading.Thread(target=add)
+        thread.start()
+        assert not added.wait(0.3)
+    thread.join()
+    assert added.is_set()
+    assert archiver.gc().chunks_removed == 0
+
+
+def test_store_rotates_packs_and_detects_missing_chunks(tmp_path: Path) -> None:
+    """Test that large projects span several packs and restore checks chunks."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "data.bin").write_bytes(os.urandom(50_000))
+    snapshot = tmp_path / "project.snapshot"
+
+    with ChunkStore(tmp_path / "store", chunk_size=8_192, pack_size=16_384) as store:
+        result = store.add(project, snapshot)
+        assert result.new_chunks == 7
+        assert len(list(store.packs_dir.iterdir())) >= 3
+        store.restore(snapshot, tmp_path / "out")
+        assert (tmp_path / "out" / "project" / "data.bin").read_bytes() == (
+            project / "data.bin"
+        ).read_bytes()
+
+        store.gc([])
+        with pytest.raises(RuntimeError):
+            store.restore(snapshot, tmp_path / "again")
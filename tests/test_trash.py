@@ -0,0 +1,87 @@
+import os
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from projectpruner.core.cleaner import Cleaner
+from projectpruner.core.trash import LOCK_NAME, RECLAIMING_SUFFIX, Trash, _discard
+from projectpruner.models.config import Config
+from projectpruner.utils.filesystem import LOCKING_SUPPORTED, exclusive_lock
+
+
+@pytest.fixture
+def trash(tmp_path: Path) -> Trash:
+    """Create a trash rooted in the temporary directory."""
+    return Trash(home=tmp_path / "trash", registry=tmp_path / "trash_roots")
+
+
+@pytest.fixture
+def project(tmp_path: Path, make_project: Callable[..., Path]) -> Path:
+    """Create a project with a node_modules directory."""
+    return make_project(tmp_path / "project")
+
+
+def test_clean_moves_artifacts_to_trash(trash: Trash, project: Path) -> None:
+    """Test that cleaning with a trash renames artifacts instead of deleting."""
+    Cleaner(Config(), trash=trash).clean(project)
+
+    assert not (project / "node_modules").exists()
+    items = trash.items()
+    assert [item.original for item in items] == [project / "node_modules"]
+    assert items[0].file_count == 1
+    assert (items[0].payload / "dep" / "index.js").exists()
+    assert trash.roots() == [trash.home]
+
+
+def test_restore_from_trash(trash: Trash, project: Path) -> None:
+    """Test that a trashed item can be moved back before reclaim."""
+    item = trash.move(project / "node_modules")
+    assert item is not None
+    (project / "node_modules").mkdir()
+    with pytest.raises(ValueError):
+        trash.restore(item)
+    (project / "node_modules").rmdir()
+
+    assert trash.restore(item) == project / "node_modules"
+    assert (project / "node_modules" / "dep" / "index.js").exists()
+    assert trash.items() == []
+
+
+def test_reclaim_resumes_interrupted_run(trash: Trash, project: Path) -> None:
+    """Test that reclaim finishes items left behind by an interrupted run."""
+    first = trash.move(project / "node_modules")
+    second = trash.move(project / "src")
+    assert first is not None and second is not None
+
+    # Simulate a reclaim that claimed the first item and then died
+    interrupted = first.directory.with_name(first.directory.name + RECLAIMING_SUFFIX)
+    os.rename(first.directory, interrupted)
+    os.unlink(interrupted / "payload" / "dep" / "index.js")
+    claimed = [item for item in trash.items() if item.reclaiming]
+    assert len(claimed) == 1
+    with pytest.raises(ValueError):
+        trash.restore(claimed[0])
+
+    results = trash.reclaim(jobs=2)
+    assert all(result.ok for result in results)
+    assert trash.items() == []
+    assert [path.name for path in trash.home.iterdir()] == [LOCK_NAME]
+
+
+@pytest.mark.skipif(not LOCKING_SUPPORTED, reason="reclaim locking needs flock")
+def test_concurrent_reclaims_do_not_share_items(trash: Trash, project: Path) -> None:
+    """Test that a reclaim skips a staging root another reclaim holds."""
+    item = trash.move(project / "node_modules")
+    assert item is not None
+    interrupted = item.directory.with_name(item.directory.name + RECLAIMING_SUFFIX)
+    os.rename(item.directory, interrupted)
+
+    with exclusive_lock(trash.home / LOCK_NAME):
+        assert trash.reclaim() == []
+        assert interrupted.exists()
+    assert [result.ok for result in trash.reclaim()] == [True]
+    assert not interrupted.exists()
+
+    # Tidying up after an item another process already removed is harmless
+    _discard(interrupted)
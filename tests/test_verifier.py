@@ -0,0 +1,78 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from projectpruner.cli import main
+from projectpruner.core.archiver import Archiver
+from projectpruner.core.manifest import manifest_path, read_summary
+from projectpruner.utils.filesystem import hash_file
+
+
+def corrupt(path: Path) -> None:
+    """Flip one byte in the middle of a file without changing its size."""
+    with open(path, "r+b") as f:
+        f.seek(path.stat().st_size // 2)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+
+def test_checksum_recorded_while_writing(project: Path, archiver: Archiver) -> None:
+    """Test that the manifest holds the hash of the compressed archive."""
+    archive_path = archiver.archive(project)
+    summary = read_summary(manifest_path(archive_path))
+    assert summary is not None
+    assert summary.sha256 == hash_file(archive_path)
+
+
+@pytest.mark.parametrize("full", [False, True])
+def test_verify_detects_corruption(
+    project: Path, full: bool, archiver: Archiver
+) -> None:
+    """Test that a flipped byte fails verification and a clean archive passes."""
+    good = archiver.archive(project, compress="gz")
+    bad = archiver.archive(project, compress="xz")
+    corrupt(bad)
+    if full:
+        # As if written before archive checksums were recorded, so only the
+        # member check can catch it
+        lines = manifest_path(bad).read_text().splitlines(keepends=True)
+        header = json.loads(lines[0])
+        header["sha256"] = None
+        manifest_path(bad).write_text(json.dumps(header) + "\n" + "".join(lines[1:]))
+
+    good_result, bad_result = archiver.verify([good, bad], full=full, jobs=2)
+
+    assert good_result.ok
+    assert good_result.files == (2 if full else 0)
+    assert not bad_result.ok
+
+
+def test_verify_snapshot(project: Path, archiver: Archiver) -> None:
+    """Test that a snapshot fails verification once its chunks are gone."""
+    snapshot = archiver.archive(project, backend="store")
+    assert archiver.verify_archive(snapshot, full=True).ok
+
+    for pack in (archiver.store_dir / "packs").iterdir():
+        corrupt(pack)
+    assert not archiver.verify_archive(snapshot, full=True).ok
+
+
+def test_verify_command(tmp_path: Path, project: Path, archiver: Archiver) -> None:
+    """Test that the verify command checks every archive and fails on errors."""
+    archive_path = archiver.archive(project)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(f"archive:\n  archive_dir: {archiver.archive_dir}\n")
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["--config", str(config_path), "verify"])
+    assert result.exit_code == 0
+    assert "OK" in result.output
+
+    corrupt(archive_path)
+    result = runner.invoke(main, ["--config", str(config_path), "verify"])
+    assert result.exit_code == 1
+    assert "checksum mismatch" in result.output